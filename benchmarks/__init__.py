@@ -0,0 +1,4 @@
+"""
+Benchmarks do solver: geradores sintéticos (benchmarks.generators) e a
+execução com comparação contra uma linha de base (python -m benchmarks.run).
+"""
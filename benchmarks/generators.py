@@ -0,0 +1,202 @@
+"""
+Geradores reprodutíveis de malhas viárias sintéticas (semente fixa).
+
+- grid: grade rows x cols com pesos em metros (quarteirões de ~100 m).
+- random_geometric: n pontos num quadrado, ligados quando a distância é
+  menor que o raio que dá o grau médio pedido (maior componente).
+- osm_like: grade com ruas removidas, vias subdivididas em trechos (nós de
+  grau 2, como quebras de polilinha do OSM) e ruas sem saída em árvore.
+
+Todas devolvem uma Instance; with_odd(inst, k) ajusta o número de vértices
+ímpares para exatamente k, ligando pares próximos da mesma paridade (duas
+pontas ímpares viram pares; duas pares viram ímpares), sem arestas repetidas.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import math
+import numpy as np
+
+Edge = Tuple[str, str, float]
+
+
+class Instance:
+    """Arestas (u, v, w) em metros, posições (x, y) em metros e parâmetros."""
+
+    __slots__ = ("name", "edges", "pos", "params")
+
+    def __init__(self, name: str, edges: List[Edge], pos: Dict[str, Tuple[float, float]], params: Dict):
+        self.name = name
+        self.edges = edges
+        self.pos = pos
+        self.params = params
+
+    @property
+    def n(self) -> int:
+        return len({x for u, v, _ in self.edges for x in (u, v)})
+
+    @property
+    def m(self) -> int:
+        return len(self.edges)
+
+    def odd(self) -> List[str]:
+        deg: Dict[str, int] = {}
+        for u, v, _ in self.edges:
+            deg[u] = deg.get(u, 0) + 1
+            deg[v] = deg.get(v, 0) + 1
+        return [x for x, d in deg.items() if d % 2 == 1]
+
+    @property
+    def k(self) -> int:
+        return len(self.odd())
+
+
+def grid(rows: int, cols: int, seed: int = 0, block_m: float = 100.0) -> Instance:
+    rng = np.random.default_rng(seed)
+    pos = {f"{r}_{c}": (c * block_m, r * block_m) for r in range(rows) for c in range(cols)}
+    edges: List[Edge] = []
+    for r in range(rows):
+        for c in range(cols):
+            if c + 1 < cols:
+                edges.append((f"{r}_{c}", f"{r}_{c + 1}", 0.0))
+            if r + 1 < rows:
+                edges.append((f"{r}_{c}", f"{r + 1}_{c}", 0.0))
+    w = block_m * rng.uniform(0.8, 1.2, size=len(edges))
+    edges = [(u, v, round(float(x), 1)) for (u, v, _), x in zip(edges, w)]
+    return Instance(f"grid_{rows}x{cols}", edges, pos, {"rows": rows, "cols": cols, "seed": seed})
+
+
+def random_geometric(n: int, avg_degree: float = 6.0, seed: int = 0, side_m: float = 5000.0) -> Instance:
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0.0, side_m, size=(n, 2))
+    radius = side_m * math.sqrt(avg_degree / (math.pi * n))
+    # Hash em grade de lado = raio: cada ponto só olha as 3x3 células vizinhas.
+    cell = np.floor(xy / radius).astype(np.int64)
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    for i, (cx, cy) in enumerate(cell.tolist()):
+        buckets.setdefault((cx, cy), []).append(i)
+    edges: List[Edge] = []
+    for (cx, cy), members in buckets.items():
+        near = [j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in buckets.get((cx + dx, cy + dy), ())]
+        nb = np.asarray(near, dtype=np.int64)
+        for i in members:
+            cand = nb[nb > i]
+            d = np.hypot(*(xy[cand] - xy[i]).T)
+            for j, dij in zip(cand[d <= radius].tolist(), d[d <= radius].tolist()):
+                edges.append((f"p{i}", f"p{j}", round(dij, 1)))
+    pos = {f"p{i}": (float(x), float(y)) for i, (x, y) in enumerate(xy.tolist())}
+    edges = _largest_component(edges)
+    return Instance(f"rgg_{n}", edges, pos, {"n": n, "avg_degree": avg_degree, "seed": seed})
+
+
+def osm_like(rows: int, cols: int, seed: int = 0, drop: float = 0.15, subdivide: float = 0.3,
+             culdesacs: int = 0, block_m: float = 100.0) -> Instance:
+    rng = np.random.default_rng(seed)
+    base = grid(rows, cols, seed, block_m)
+    pos = dict(base.pos)
+    edges: List[Edge] = []
+    for u, v, w in base.edges:
+        if rng.random() < drop:
+            continue
+        if rng.random() < subdivide:
+            # Via em 2-4 trechos com nós intermediários de grau 2.
+            parts = int(rng.integers(2, 5))
+            (x0, y0), (x1, y1) = pos[u], pos[v]
+            prev = u
+            for t in range(1, parts):
+                mid = f"{u}~{v}~{t}"
+                pos[mid] = (x0 + (x1 - x0) * t / parts, y0 + (y1 - y0) * t / parts)
+                edges.append((prev, mid, round(w / parts, 1)))
+                prev = mid
+            edges.append((prev, v, round(w - (parts - 1) * round(w / parts, 1), 1)))
+        else:
+            edges.append((u, v, w))
+    edges = _largest_component(edges)
+    nodes = sorted({x for u, v, _ in edges for x in (u, v)})
+    for c in range(culdesacs):
+        # Rua sem saída: um caminho de 1-3 trechos (às vezes com bifurcação).
+        at = nodes[int(rng.integers(len(nodes)))]
+        x, y = pos[at]
+        prev = at
+        for t in range(int(rng.integers(1, 4))):
+            nid = f"cds{c}_{t}"
+            x, y = x + float(rng.uniform(-40, 40)), y + float(rng.uniform(-40, 40))
+            pos[nid] = (x, y)
+            edges.append((prev, nid, round(float(rng.uniform(20, 60)), 1)))
+            prev = nid
+            if rng.random() < 0.3:
+                fork = f"cds{c}_{t}f"
+                pos[fork] = (x + 20.0, y)
+                edges.append((nid, fork, round(float(rng.uniform(15, 40)), 1)))
+    pos = {x: pos[x] for u, v, _ in edges for x in (u, v)}
+    return Instance(f"osm_{rows}x{cols}", edges, pos,
+                    {"rows": rows, "cols": cols, "seed": seed, "drop": drop,
+                     "subdivide": subdivide, "culdesacs": culdesacs})
+
+
+def with_odd(inst: Instance, k: int, seed: int = 0) -> Instance:
+    """Cópia de inst com exatamente k vértices ímpares (k par)."""
+    if k % 2:
+        raise ValueError("k deve ser par.")
+    rng = np.random.default_rng(seed)
+    edges = list(inst.edges)
+    have = {(u, v) if u < v else (v, u) for u, v, _ in edges}
+    odd = set(inst.odd())
+    nodes = sorted({x for u, v, _ in edges for x in (u, v)})
+    names = np.asarray(nodes)
+    xy = np.asarray([inst.pos[x] for x in nodes], dtype=np.float64)
+    where = {x: i for i, x in enumerate(nodes)}
+    attempts = 0
+    while len(odd) != k:
+        if attempts > 50 * len(nodes):
+            raise ValueError(f"Não foi possível ajustar k para {k} (k atual {len(odd)}).")
+        attempts += 1
+        want_odd = len(odd) > k
+        pool = sorted(odd) if want_odd else [x for x in nodes if x not in odd]
+        if len(pool) < 2:
+            raise ValueError(f"k={k} inalcançável nesta instância.")
+        a = pool[int(rng.integers(len(pool)))]
+        # Parceiro mais próximo da mesma paridade, sem aresta já existente.
+        idx = np.asarray([where[x] for x in pool], dtype=np.int64)
+        d = np.hypot(*(xy[idx] - xy[where[a]]).T)
+        for j in np.argsort(d, kind="stable")[:12].tolist():
+            b = str(names[idx[j]])
+            key = (a, b) if a < b else (b, a)
+            if b != a and key not in have:
+                have.add(key)
+                edges.append((a, b, round(max(float(d[j]), 1.0) * 1.3, 1)))
+                odd ^= {a, b}
+                break
+    return Instance(f"{inst.name}_k{k}", edges, inst.pos, dict(inst.params, k=k))
+
+
+def _largest_component(edges: List[Edge]) -> List[Edge]:
+    parent: Dict[str, str] = {}
+
+    def find(x: str) -> str:
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u, v, _ in edges:
+        a, b = find(u), find(v)
+        if a != b:
+            parent[a] = b
+    size: Dict[str, int] = {}
+    for u, _, _ in edges:
+        r = find(u)
+        size[r] = size.get(r, 0) + 1
+    if not size:
+        return edges
+    best = max(size, key=lambda r: size[r])
+    return [e for e in edges if find(e[0]) == best]
+
+
+def instance_from_spec(spec: Dict) -> Instance:
+    """Instância a partir de um dicionário {"kind": ..., parâmetros, "k": opcional}."""
+    spec = dict(spec)
+    kind = spec.pop("kind")
+    k: Optional[int] = spec.pop("k", None)
+    make = {"grid": grid, "rgg": random_geometric, "osm": osm_like}[kind]
+    inst = make(**spec)
+    return with_odd(inst, k, seed=spec.get("seed", 0)) if k is not None else inst
@@ -0,0 +1,178 @@
+"""
+Executa as suítes de benchmark e compara com a linha de base guardada.
+
+  PYTHONPATH=src python -m benchmarks.run [--suite quick|full] [--out resultados.json]
+                           [--baseline benchmarks/baseline.json] [--update-baseline]
+
+Roda da raiz do repositório (benchmarks e cpp_solver.py vêm do diretório
+atual; pcc de src/ ou do pacote instalado).
+
+Cada caso é uma instância sintética (benchmarks.generators) de uma série de
+escala (em k, com a malha fixa, ou em m, com k fixo), resolvida por
+pcc.chinese_postman e, quando k é pequeno o bastante para o DP em Python
+puro, pelo cpp_solver.py. Cada solver roda `repeats` vezes e fica a execução
+mais rápida, com o tempo de cada fase (pcc.profiling) e os contadores. O
+resultado sai em JSON; a comparação marca casos mais lentos que a base além
+da tolerância ou com custo diferente (saída 1 nesses casos).
+"""
+from __future__ import annotations
+import argparse, json, os, platform, sys, time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from pcc.csr import CSRGraph
+from pcc.chinese_postman import solve_cpp_undirected
+from pcc.profiling import SolveStats
+from benchmarks.generators import Instance, instance_from_spec
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# DP do cpp_solver.py: dicionário com 2^(k-1) máscaras em Python puro.
+_CPP_SOLVER_MAX_K = 12
+
+SUITES: Dict[str, List[Dict]] = {
+    "quick": (
+        [{"series": "k", "kind": "grid", "rows": 30, "cols": 30, "k": k} for k in (8, 12, 32, 64, 128)]
+        + [{"series": "m", "kind": "grid", "rows": r, "cols": r, "k": 12} for r in (20, 40, 80)]
+        + [{"series": "rgg", "kind": "rgg", "n": 2000, "k": 64},
+           {"series": "osm", "kind": "osm", "rows": 30, "cols": 30, "culdesacs": 40, "k": 64}]
+    ),
+    "full": (
+        [{"series": "k", "kind": "grid", "rows": 60, "cols": 60, "k": k} for k in (8, 12, 32, 64, 128, 256, 512)]
+        + [{"series": "m", "kind": "grid", "rows": r, "cols": r, "k": 12} for r in (25, 50, 100, 200)]
+        + [{"series": "rgg", "kind": "rgg", "n": n, "k": 128} for n in (2000, 8000)]
+        + [{"series": "osm", "kind": "osm", "rows": r, "cols": r, "culdesacs": r * 2, "k": 128} for r in (30, 60)]
+    ),
+}
+
+
+def _time_pcc(inst: Instance, repeats: int) -> Dict:
+    g = CSRGraph.from_edges(inst.edges)
+    best = None
+    for _ in range(repeats):
+        prof = SolveStats()
+        t0 = time.perf_counter()
+        cost, _ = solve_cpp_undirected(g, profile=prof)
+        dt = time.perf_counter() - t0
+        if best is None or dt < best[0]:
+            best = (dt, cost, prof)
+    dt, cost, prof = best
+    return {"cost": cost, "total_s": dt,
+            "phases": {k: v["wall_s"] for k, v in prof.phases.items()}, "counters": prof.counters}
+
+
+def _time_cpp_solver(inst: Instance, repeats: int) -> Dict:
+    import cpp_solver
+    best = None
+    for _ in range(repeats):
+        g = cpp_solver.Graph()
+        for u, v, w in inst.edges:
+            g.add_edge(u, v, w)
+        prof = SolveStats()
+        t0 = time.perf_counter()
+        cost, _ = cpp_solver.chinese_postman_undirected(g, profile=prof)
+        dt = time.perf_counter() - t0
+        if best is None or dt < best[0]:
+            best = (dt, cost, prof)
+    dt, cost, prof = best
+    return {"cost": cost, "total_s": dt,
+            "phases": {k: v["wall_s"] for k, v in prof.phases.items()}, "counters": prof.counters}
+
+
+def run_suite(specs: List[Dict], repeats: int = 3, solvers=("pcc", "cpp_solver"), only: Optional[str] = None,
+              log=None) -> List[Dict]:
+    out: List[Dict] = []
+    for spec in specs:
+        params = {k: v for k, v in spec.items() if k != "series"}
+        inst = instance_from_spec(params)
+        if only and only not in inst.name:
+            continue
+        k = inst.k
+        for solver in solvers:
+            if solver == "cpp_solver" and k > _CPP_SOLVER_MAX_K:
+                continue
+            timer = _time_pcc if solver == "pcc" else _time_cpp_solver
+            rec = {"case": inst.name, "series": spec.get("series"), "solver": solver, "spec": params,
+                   "n": inst.n, "m": inst.m, "k": k}
+            rec.update(timer(inst, repeats))
+            out.append(rec)
+            if log is not None:
+                print(f"{rec['case']:<22} {solver:<10} n={rec['n']:<6} m={rec['m']:<6} k={k:<4} "
+                      f"{rec['total_s']:.4f} s", file=log)
+    return out
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float = 0.3, min_delta: float = 0.02) -> List[Dict]:
+    """
+    Uma linha por resultado: razão de tempo contra a base e status. Só conta
+    como mais lento/rápido se a razão passa da tolerância e a diferença
+    absoluta passa de min_delta segundos (casos de milissegundos são ruído).
+    """
+    base = {(r["case"], r["solver"]): r for r in baseline}
+    rows = []
+    for r in results:
+        b = base.get((r["case"], r["solver"]))
+        row = {"case": r["case"], "solver": r["solver"], "total_s": r["total_s"],
+               "base_s": None, "ratio": None, "status": "new"}
+        if b is not None:
+            ratio = r["total_s"] / b["total_s"] if b["total_s"] > 0 else float("inf")
+            row.update(base_s=b["total_s"], ratio=ratio)
+            noise = abs(r["total_s"] - b["total_s"]) <= min_delta
+            if abs(r["cost"] - b["cost"]) > 1e-6 * max(1.0, abs(b["cost"])):
+                row["status"] = "cost_mismatch"
+            elif noise:
+                row["status"] = "ok"
+            elif ratio > 1.0 + tolerance:
+                row["status"] = "slower"
+            elif ratio < 1.0 / (1.0 + tolerance):
+                row["status"] = "faster"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def _meta() -> Dict:
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmarks do CPP com comparação contra a linha de base.")
+    p.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    p.add_argument("--repeats", type=int, default=3, help="Execuções por caso (fica a mais rápida)")
+    p.add_argument("--solvers", default="pcc,cpp_solver", help="Lista separada por vírgulas: pcc, cpp_solver")
+    p.add_argument("--only", default=None, help="Só casos cujo nome contém este texto")
+    p.add_argument("--out", default=None, help="Arquivo JSON com os resultados (padrão: não grava)")
+    p.add_argument("--baseline", default=str(BASELINE), help="JSON da linha de base")
+    p.add_argument("--tolerance", type=float, default=0.3, help="Folga relativa antes de acusar lentidão")
+    p.add_argument("--min-delta", type=float, default=0.02, help="Diferença mínima em segundos para acusar mudança")
+    p.add_argument("--update-baseline", action="store_true", help="Grava os resultados como nova linha de base")
+    args = p.parse_args(argv)
+
+    specs = SUITES[args.suite]
+    solvers = tuple(s.strip() for s in args.solvers.split(",") if s.strip())
+    results = run_suite(specs, args.repeats, solvers, args.only, log=sys.stderr)
+    doc = {"meta": dict(_meta(), suite=args.suite, repeats=args.repeats), "results": results}
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(doc, indent=1) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        Path(args.baseline).write_text(json.dumps(doc, indent=1) + "\n", encoding="utf-8")
+        print(f"Linha de base gravada em {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"Sem linha de base em {args.baseline} (use --update-baseline).")
+        return 0
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+    rows = compare(results, baseline, args.tolerance, args.min_delta)
+    bad = 0
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        print(f"{row['case']:<22} {row['solver']:<10} {row['total_s']:.4f} s  base {ratio:>7}  {row['status']}")
+        bad += row["status"] in ("slower", "cost_mismatch")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
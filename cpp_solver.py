@@ -8,13 +8,20 @@ Etapas:
 2) Identifica vértices de grau ímpar.
 3) Dijkstra entre vértices ímpares.
 4) Emparelhamento perfeito mínimo (DP por bitmask).
-5) Duplica arestas ao longo dos caminhos mínimos.
+5) Duplica arestas ao longo dos caminhos mínimos (contagem de cópias por aresta).
 6) Constrói circuito euleriano (Hierholzer).
+
+Usa o pacote pcc (só stdlib nestes módulos): rode com
+`PYTHONPATH=src python cpp_solver.py` (ou com o pacote instalado).
 """
 
 from collections import defaultdict, deque
 import heapq
 
+# Motor de Hierholzer compartilhado com o pacote (src/pcc/euler.py).
+from pcc.euler import hierholzer
+from pcc.profiling import NO_STATS
+
 class Graph:
     def __init__(self):
         self.adj = defaultdict(list)   # u -> list of (v, w, edge_id)
@@ -82,27 +89,48 @@ class Graph:
         path.reverse()
         return dist[t], path
 
-def chinese_postman_undirected(g: Graph):
-    if not g.is_connected_ignoring_isolated():
-        raise ValueError("O grafo não é conexo (desconsidere vértices isolados).")
+def chinese_postman_undirected(g: Graph, profile=None):
+    # profile (pcc.profiling.SolveStats, opcional) mede as mesmas fases do
+    # pacote: connectivity, shortest_paths, matching, duplication, euler.
+    prof = profile if profile is not None else NO_STATS
+    with prof.phase("connectivity"):
+        if not g.is_connected_ignoring_isolated():
+            raise ValueError("O grafo não é conexo (desconsidere vértices isolados).")
 
     base_cost = sum(w for (_, _, w) in g.edges)
     odd = [u for u in g.vertices() if g.degree(u) % 2 == 1]
+    prof.set("k", len(odd))
     if len(odd) == 0:
-        tour = eulerian_circuit(g)
+        with prof.phase("euler"):
+            tour = eulerian_circuit(g)
         return base_cost, tour
 
     k = len(odd)
     pair_dist = [[0.0]*k for _ in range(k)]
     pair_path = [[[] for _ in range(k)] for _ in range(k)]
-    for i, u in enumerate(odd):
-        for j, v in enumerate(odd):
-            if i < j:
-                d, p = g.shortest_path(u, v)
-                pair_dist[i][j] = pair_dist[j][i] = d
-                pair_path[i][j] = pair_path[j][i] = p
+    with prof.phase("shortest_paths"):
+        for i, u in enumerate(odd):
+            for j, v in enumerate(odd):
+                if i < j:
+                    d, p = g.shortest_path(u, v)
+                    pair_dist[i][j] = pair_dist[j][i] = d
+                    pair_path[i][j] = pair_path[j][i] = p
+    with prof.phase("matching"):
+        added_cost, matched_pairs = _match_dp(odd, pair_dist)
+
+    # Duplicar arestas ao longo das menores rotas
+    with prof.phase("duplication"):
+        extra = duplicate_along_paths(g, matched_pairs, pair_path, odd)
+    prof.set("multigraph_edges", len(g.edges) + sum(extra))
+
+    with prof.phase("euler"):
+        tour = eulerian_circuit(g, extra)
+    total_cost = base_cost + added_cost
+    return total_cost, tour
 
+def _match_dp(odd, pair_dist):
     # DP por bitmask
+    k = len(odd)
     INF = 1e100
     dp = {0: 0.0}
     choice = {}
@@ -132,62 +160,32 @@ def chinese_postman_undirected(g: Graph):
         i, j, new_mask = choice[mask]
         matched_pairs.append((odd[i], odd[j]))
         mask = new_mask
-
-    # Duplicar arestas ao longo das menores rotas
-    multigraph = duplicate_along_paths(g, matched_pairs, pair_path, odd)
-
-    tour = eulerian_circuit(multigraph)
-    total_cost = base_cost + added_cost
-    return total_cost, tour
+    return added_cost, matched_pairs
 
 def duplicate_along_paths(g: Graph, matched_pairs, pair_path, odd_list):
-    mg = Graph()
-    for u, v, w in g.edges:
-        mg.add_edge(u, v, w)
+    # Em vez de copiar o grafo, conta quantas cópias extras cada aresta
+    # ganha (extra[eid]); a mais leve entre paralelas é a duplicada.
+    extra = [0] * len(g.edges)
     idx = {u: i for i, u in enumerate(odd_list)}
     for u, v in matched_pairs:
         i, j = idx[u], idx[v]
         path = pair_path[i][j]
         for a, b in zip(path, path[1:]):
-            w = min(w for x, w, _ in g.adj[a] if x == b)
-            mg.add_edge(a, b, w)
-    return mg
-
-def eulerian_circuit(g: Graph):
-    adj = {u: g.adj[u][:] for u in g.adj}
-    used = set()
-
-    def get_unused_edge(u):
-        while adj[u]:
-            v, w, eid = adj[u].pop()
-            if eid not in used:
-                used.add(eid)
-                for idx, (vv, ww, ee) in enumerate(adj[v]):
-                    if vv == u and ee == eid:
-                        adj[v].pop(idx)
-                        break
-                return v
-        return None
-
-    start = None
-    for u in adj:
-        if len(adj[u]) > 0:
-            start = u
-            break
-    if start is None:
+            _, eid = min((w, eid) for x, w, eid in g.adj[a] if x == b)
+            extra[eid] += 1
+    return extra
+
+def eulerian_circuit(g: Graph, extra=None):
+    # Hierholzer O(m) sobre os ids de arestas (pcc.euler): cursor por vértice
+    # e cópias restantes por aresta, sem busca linear pela meia-aresta reversa.
+    verts = [u for u in g.adj if g.adj[u]]
+    if not verts:
         return []
-
-    stack = [start]
-    circuit = []
-    while stack:
-        u = stack[-1]
-        v = get_unused_edge(u)
-        if v is not None:
-            stack.append(v)
-        else:
-            circuit.append(stack.pop())
-    circuit.reverse()
-    return circuit
+    idx = {u: i for i, u in enumerate(verts)}
+    eu = [idx[u] for u, _, _ in g.edges]
+    ev = [idx[v] for _, v, _ in g.edges]
+    mult = [1 + x for x in extra] if extra is not None else None
+    return [verts[i] for i in hierholzer(len(verts), eu, ev, start=0, mult=mult)]
 
 def example_graph():
     g = Graph()
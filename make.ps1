@@ -1,4 +1,4 @@
-param([ValidateSet('install','run','plot','real','real-basemap','real-atalaia-nome','real-atalaia-bbox','test','slides','clean')][string]$task='run')
+param([ValidateSet('install','run','plot','real','real-basemap','real-atalaia-nome','real-atalaia-bbox','test','bench','slides','clean')][string]$task='run')
 
 switch ($task) {
   'install' {
@@ -29,7 +29,7 @@ switch ($task) {
     $env:PYTHONPATH = 'src'
     python -m pcc.solve_cli --input data\real_edges.csv --nodes data\real_nodes.csv --largest-component --plot `
       --label-mode junctions --edge-labels --show-start --edge-alpha 0.32 --edge-width 2.9 --layout-k 1.0 --fig-width 12 --fig-height 9 --dpi 320 `
-      --save-plot out\real_solution.png --save-tour out\real_tour.txt `
+      --save-plot out\real_solution.png --save-tour out\real_tour.txt --cache out\cache `
       --save-geojson out\real_tour.geojson --save-gpx out\real_tour.gpx
     Copy-Item out\real_solution.png slides\img\real_solution.png -Force
   }
@@ -43,7 +43,7 @@ switch ($task) {
     python -m pcc.solve_cli --input data\real_edges.csv --nodes data\real_nodes.csv --largest-component --plot `
   --style tour --basemap --basemap-provider CartoDB.Positron --basemap-zoom 17 `
       --label-mode junctions --edge-labels --show-start --edge-alpha 0.55 --edge-width 3.4 --fig-width 13 --fig-height 9.5 --dpi 320 `
-      --save-plot out\real_solution_basemap.png --save-tour out\real_tour.txt `
+      --save-plot out\real_solution_basemap.png --save-tour out\real_tour.txt --cache out\cache `
       --save-geojson out\real_tour.geojson --save-gpx out\real_tour.gpx
     Copy-Item out\real_solution_basemap.png slides\img\real_solution_basemap.png -Force
   }
@@ -87,6 +87,11 @@ switch ($task) {
     python -m pytest -q
   }
 
+  'bench' {
+    $env:PYTHONPATH = 'src'
+    python -m benchmarks.run --out out\bench.json
+  }
+
   'slides' {
     if (-not (Test-Path slides\img)) { New-Item -ItemType Directory -Path slides\img | Out-Null }
     if (-not (Test-Path out\example.png)) { & $PSCommandPath plot }
@@ -109,6 +114,6 @@ switch ($task) {
   }
 
   default {
-    Write-Host "Uso: .\make.ps1 [install|run|plot|real|real-basemap|real-atalaia-nome|real-atalaia-bbox|test|slides|clean]" -ForegroundColor Yellow
+    Write-Host "Uso: .\make.ps1 [install|run|plot|real|real-basemap|real-atalaia-nome|real-atalaia-bbox|test|bench|slides|clean]" -ForegroundColor Yellow
   }
 }
\ No newline at end of file
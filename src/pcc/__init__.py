@@ -1,6 +1,24 @@
 """
-Pacote pcc: Implementação do Problema do Carteiro Chinês (CPP) – versão não dirigida.
+Pacote pcc: Implementação do Problema do Carteiro Chinês (CPP) – versões não dirigida e dirigida.
 """
-from .chinese_postman import solve_cpp_undirected, build_graph_from_edges
-__all__ = ["solve_cpp_undirected", "build_graph_from_edges"]
+from importlib import import_module
+
+# Exportações carregadas sob demanda: módulos leves (p.ex. pcc.euler, usado
+# pelo cpp_solver.py em Python puro) não devem puxar numpy/networkx.
+_EXPORTS = {
+    "solve_cpp_undirected": ".chinese_postman",
+    "solve_cpp_components": ".chinese_postman",
+    "build_graph_from_edges": ".chinese_postman",
+    "solve_cpp_directed": ".directed",
+    "DirectedGraph": ".directed",
+    "CSRGraph": ".csr",
+    "CPPSession": ".session",
+}
+__all__ = list(_EXPORTS)
 __version__ = "0.1.0"
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
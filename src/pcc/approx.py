@@ -0,0 +1,99 @@
+"""
+Emparelhamento aproximado "anytime" para re-roteamento com orçamento de tempo.
+
+1) Guloso: pares (i, j) em ordem crescente de D[i, j], aceitando cada par
+   cujos dois vértices ainda estão livres.
+2) 2-opt: para cada par (a, b), compara com todos os outros pares (c, d) as
+   trocas (a, c)(b, d) e (a, d)(b, c) de uma vez com NumPy e aplica a de maior
+   ganho; repete até não haver melhora ou o prazo acabar (checado por par).
+3) Limite inferior: subida dual na relaxação de LP do emparelhamento
+   (max sum y  s.a.  y_i + y_j <= D[i, j]), partindo de y_i = min_j D[i, j] / 2
+   e fazendo y_i = min_j (D[i, j] - y_j) em varreduras; qualquer y viável é um
+   limite válido para o custo ótimo.
+
+Custo: guloso O(k^2 log k); cada varredura do 2-opt e do dual O(k^2).
+"""
+from __future__ import annotations
+from typing import List, Optional, Tuple
+import time
+import numpy as np
+
+# Varreduras da subida dual (cada uma O(k^2)).
+_DUAL_PASSES = 2
+
+
+def greedy_matching(D: np.ndarray) -> List[Tuple[int, int]]:
+    """Emparelhamento guloso pelo par mais próximo (k par)."""
+    k = len(D)
+    iu, ju = np.triu_indices(k, 1)
+    order = np.argsort(D[iu, ju], kind="stable")
+    free = bytearray(b"\x01" * k)
+    pairs: List[Tuple[int, int]] = []
+    for i, j in zip(iu[order].tolist(), ju[order].tolist()):
+        if free[i] and free[j]:
+            free[i] = free[j] = 0
+            pairs.append((i, j))
+            if 2 * len(pairs) == k:
+                break
+    return pairs
+
+
+def improve_2opt(
+    D: np.ndarray, pairs: List[Tuple[int, int]], deadline: Optional[float] = None
+) -> Tuple[List[Tuple[int, int]], bool]:
+    """(pares melhorados, True se parou por causa do prazo)."""
+    if len(pairs) < 2:
+        return pairs, False
+    P = np.asarray(pairs, dtype=np.int64)
+    c, d = P[:, 0], P[:, 1]
+    tol = 1e-12 * max(1.0, float(D.max()))
+    improved = True
+    while improved:
+        improved = False
+        for p in range(len(P)):
+            if deadline is not None and time.perf_counter() >= deadline:
+                return _as_pairs(P), True
+            a, b = int(P[p, 0]), int(P[p, 1])
+            cur = D[a, b] + D[c, d]
+            g1 = cur - (D[a, c] + D[b, d])
+            g2 = cur - (D[a, d] + D[b, c])
+            g1[p] = g2[p] = -np.inf
+            q1, q2 = int(np.argmax(g1)), int(np.argmax(g2))
+            if max(g1[q1], g2[q2]) <= tol:
+                continue
+            if g1[q1] >= g2[q2]:
+                x, y = int(c[q1]), int(d[q1])
+                P[p], P[q1] = (a, x), (b, y)
+            else:
+                x, y = int(c[q2]), int(d[q2])
+                P[p], P[q2] = (a, y), (b, x)
+            improved = True
+    return _as_pairs(P), False
+
+
+def dual_lower_bound(D: np.ndarray) -> float:
+    """Limite inferior do emparelhamento perfeito mínimo (subida dual)."""
+    k = len(D)
+    if k == 0:
+        return 0.0
+    M = D.astype(np.float64, copy=True)
+    np.fill_diagonal(M, np.inf)
+    y = M.min(axis=1) / 2.0
+    for _ in range(_DUAL_PASSES):
+        for i in range(k):
+            y[i] = np.min(M[i] - y)
+    return float(y.sum())
+
+
+def approximate_matching(
+    D: np.ndarray, deadline: Optional[float] = None
+) -> Tuple[List[Tuple[int, int]], float, float, bool]:
+    """(pares, custo, limite inferior, parou pelo prazo): guloso + 2-opt."""
+    D = np.asarray(D, dtype=np.float64)
+    pairs, stopped = improve_2opt(D, greedy_matching(D), deadline)
+    cost = float(sum(D[i, j] for i, j in pairs))
+    return pairs, cost, min(dual_lower_bound(D), cost), stopped
+
+
+def _as_pairs(P: np.ndarray) -> List[Tuple[int, int]]:
+    return [(min(a, b), max(a, b)) for a, b in P.tolist()]
@@ -0,0 +1,133 @@
+"""
+CLI em lote: resolve muitas instâncias CSV u,v,w num único processo pai.
+
+Entrada: diretórios (todos os *.csv e *.pccg, ordenados), manifestos .txt (um
+caminho por linha, relativo ao manifesto; linhas vazias e '#' ignoradas) ou
+arquivos CSV/.pccg avulsos. As instâncias são distribuídas num pool de
+processos e cada resultado é emitido assim que fica pronto como uma linha
+JSON:
+
+  {"input": ..., "ok": true, "cost": ..., "tour_edges": ..., "n": ..., "m": ...,
+   "load_s": ..., "solve_s": ...}
+
+Falhas de uma instância viram {"input": ..., "ok": false, "error": ...} e não
+interrompem o lote. Não importa matplotlib/pyproj (só o núcleo do solver).
+"""
+from __future__ import annotations
+import argparse
+from typing import Dict, Iterator, List, Optional
+import os, sys, json, time
+import multiprocessing as mp
+from .graph_io import load_csr_graph
+from .chinese_postman import solve_cpp_undirected, solve_cpp_components, _resolve_workers
+from .cache import SolutionCache
+
+
+def expand_inputs(paths: List[str]) -> List[str]:
+    """Lista de instâncias a partir de diretórios, manifestos .txt ou arquivos."""
+    out: List[str] = []
+    for p in paths:
+        if os.path.isdir(p):
+            out.extend(os.path.join(p, f) for f in sorted(os.listdir(p)) if f.lower().endswith((".csv", ".pccg")))
+        elif p.lower().endswith(".txt"):
+            base = os.path.dirname(p)
+            with open(p, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        out.append(line if os.path.isabs(line) else os.path.join(base, line))
+        else:
+            out.append(p)
+    return out
+
+
+def solve_instance(
+    path: str,
+    candidates: int = 0,
+    components: bool = False,
+    with_tour: bool = False,
+    cache: Optional[SolutionCache] = None,
+) -> Dict:
+    """Resolve uma instância; qualquer exceção vira um registro com ok=False."""
+    rec: Dict = {"input": path}
+    try:
+        t0 = time.perf_counter()
+        g = load_csr_graph(path)
+        t1 = time.perf_counter()
+        if components:
+            cost, results = solve_cpp_components(g, candidates=candidates, cache=cache)
+            tours = [t for _, t in results]
+        else:
+            cost, tour = solve_cpp_undirected(g, candidates=candidates, cache=cache)
+            tours = [tour]
+        t2 = time.perf_counter()
+    except Exception as e:
+        rec.update(ok=False, error=f"{type(e).__name__}: {e}")
+        return rec
+    rec.update(ok=True, cost=float(cost), tour_edges=sum(max(0, len(t) - 1) for t in tours),
+               n=g.n, m=g.m, load_s=round(t1 - t0, 6), solve_s=round(t2 - t1, 6))
+    if components:
+        rec["routes"] = len(tours)
+    if with_tour:
+        rec["tour"] = tours if components else tours[0]
+    return rec
+
+
+def _solve_task(args) -> Dict:
+    return solve_instance(*args)
+
+
+def run_batch(
+    paths: List[str],
+    workers: int = 1,
+    candidates: int = 0,
+    components: bool = False,
+    with_tour: bool = False,
+    cache: Optional[SolutionCache] = None,
+) -> Iterator[Dict]:
+    """Gera os registros na ordem de conclusão (em ordem de entrada se workers == 1)."""
+    tasks = [(p, candidates, components, with_tour, cache) for p in paths]
+    workers = min(_resolve_workers(workers), len(tasks))
+    if workers <= 1:
+        for t in tasks:
+            yield _solve_task(t)
+        return
+    with mp.get_context().Pool(workers) as pool:
+        yield from pool.imap_unordered(_solve_task, tasks)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Resolver em lote várias instâncias CSV u,v,w (saída em JSON lines).")
+    p.add_argument("inputs", nargs="+", help="Diretórios, manifestos .txt (um caminho por linha) ou arquivos CSV/.pccg")
+    p.add_argument("--workers", type=int, default=1, help="Processos (uma instância por vez em cada; 0 = todos os núcleos)")
+    p.add_argument("--candidates", type=int, default=0, help="Modo esparso do matching (ver solve_cli)")
+    p.add_argument("--components", action="store_true", help="Resolver cada componente conexa separadamente")
+    p.add_argument("--with-tour", action="store_true", help="Incluir o tour (lista de vértices) em cada linha")
+    p.add_argument("--output", default=None, help="Arquivo .jsonl de saída (padrão: stdout)")
+    p.add_argument("--cache", default=os.environ.get("PCC_CACHE_DIR"),
+                   help="Diretório do cache de soluções (padrão: $PCC_CACHE_DIR; sem cache se ausente)")
+    p.add_argument("--cache-max-mb", type=float, default=256.0, help="Tamanho máximo do cache (LRU), em MB")
+    args = p.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    cache = SolutionCache(args.cache, int(args.cache_max_mb * (1 << 20))) if args.cache else None
+    out = sys.stdout
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        out = open(args.output, "w", encoding="utf-8")
+    failed = 0
+    t0 = time.perf_counter()
+    try:
+        for rec in run_batch(paths, args.workers, args.candidates, args.components, args.with_tour, cache):
+            failed += not rec["ok"]
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(paths)} instância(s), {failed} falha(s) em {time.perf_counter() - t0:.2f} s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
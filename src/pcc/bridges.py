@@ -0,0 +1,107 @@
+"""
+Decomposição por pontes (componentes 2-aresta-conexas) para o matching.
+
+No CPP, uma ponte e é duplicada exatamente quando um dos lados tem um número
+ímpar de vértices ímpares (todo T-join cruza o corte {e} uma vez; cruzar mais
+vezes só aumentaria o custo). Fixadas essas pontes, o restante da solução se
+separa por bloco 2-aresta-conexo B: basta um T_B-join mínimo dentro de B,
+com T_B = (ímpares de B) xor (extremos em B das pontes duplicadas). Caminhos
+mínimos entre vértices do mesmo bloco nunca usam pontes, então cada bloco é
+um emparelhamento independente e bem menor (em subúrbios arborescentes, k
+cai de centenas para poucos vértices por bloco, dentro do alcance do DP).
+
+Tarjan iterativo (lowlink por id de aresta: arestas paralelas não são
+pontes) sobre o CSR, O(n + m).
+"""
+from __future__ import annotations
+from typing import List, Optional, Tuple
+import numpy as np
+
+from .csr import CSRGraph
+
+
+def split_at_bridges(g: CSRGraph, odd: np.ndarray) -> Optional[Tuple[np.ndarray, List[np.ndarray]]]:
+    """
+    (ids das pontes a duplicar, [T_B de cada bloco com T_B não vazio]), com
+    os vértices de cada T_B em ordem crescente; None se g não tem pontes.
+    """
+    n = g.n
+    off = memoryview(g.offsets)
+    tgt = memoryview(g.targets)
+    eid = memoryview(g.edge_ids)
+    is_odd = np.zeros(n, dtype=np.int64)
+    is_odd[odd] = 1
+    sub = is_odd.tolist()          # ímpares na subárvore da DFS
+    disc = [-1] * n
+    low = [0] * n
+    via = [-1] * n                 # aresta da árvore DFS que chega ao vértice
+    bridges: List[int] = []
+    forced: List[int] = []
+    t = 0
+    for s in np.flatnonzero(g.degree() > 0).tolist():
+        if disc[s] != -1:
+            continue
+        disc[s] = low[s] = t
+        t += 1
+        stack = [s]
+        cursor = [off[s]]
+        while stack:
+            u = stack[-1]
+            c = cursor[-1]
+            if c < off[u + 1]:
+                cursor[-1] = c + 1
+                e = eid[c]
+                if e == via[u]:
+                    continue
+                v = tgt[c]
+                if disc[v] == -1:
+                    disc[v] = low[v] = t
+                    t += 1
+                    via[v] = e
+                    stack.append(v)
+                    cursor.append(off[v])
+                elif disc[v] < low[u]:
+                    low[u] = disc[v]
+                continue
+            stack.pop()
+            cursor.pop()
+            if stack:
+                p = stack[-1]
+                if low[u] < low[p]:
+                    low[p] = low[u]
+                sub[p] += sub[u]
+                if low[u] > disc[p]:
+                    bridges.append(via[u])
+                    if sub[u] % 2:
+                        forced.append(via[u])
+    if not bridges:
+        return None
+
+    # Blocos: componentes sem as pontes (rótulo = menor vértice do bloco).
+    cut = bytearray(g.m)
+    for e in bridges:
+        cut[e] = 1
+    block = [-1] * n
+    for s in range(n):
+        if block[s] != -1:
+            continue
+        block[s] = s
+        stack = [s]
+        while stack:
+            u = stack.pop()
+            for q in range(off[u], off[u + 1]):
+                v = tgt[q]
+                if block[v] == -1 and not cut[eid[q]]:
+                    block[v] = s
+                    stack.append(v)
+    forced_ids = np.asarray(forced, dtype=np.int64)
+    parity = is_odd.copy()
+    np.add.at(parity, g.eu[forced_ids], 1)
+    np.add.at(parity, g.ev[forced_ids], 1)
+    terminals = np.flatnonzero(parity % 2 == 1)
+    blk = np.asarray(block, dtype=np.int64)[terminals]
+    order = np.argsort(blk, kind="stable")
+    terminals, blk = terminals[order], blk[order]
+    cuts = np.flatnonzero(np.diff(blk)) + 1
+    groups = [x.astype(np.int32) for x in np.split(terminals, cuts) if x.size]
+    return forced_ids, groups
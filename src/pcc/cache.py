@@ -0,0 +1,147 @@
+"""
+Cache persistente de soluções do CPP, endereçado pelo conteúdo do grafo.
+
+Chave: SHA-256 da lista de arestas canônica (rótulos ordenados, extremos
+(min, max), arestas ordenadas, pesos float64) mais as opções do solver; a
+ordem das linhas do CSV e a numeração interna dos nós não mudam a chave.
+
+Cada entrada é um arquivo binário pequeno <chave>.pcs:
+  cabeçalho  '<4sHdIII'  magic b"PCCS", versão, custo, nº de rótulos,
+                         nº de pares, nº de vértices do tour
+  rótulos    UTF-8 separados por '\\0' (só os nós que aparecem no tour)
+  pares      int32 (2 por par emparelhado), índices na tabela de rótulos
+  tour       int32, índices na tabela de rótulos
+
+O tamanho total do diretório é limitado por max_bytes com despejo LRU: uma
+leitura atualiza o mtime do arquivo e a escrita remove os mais antigos.
+Escritas são atômicas (arquivo temporário + os.replace), então vários
+processos podem compartilhar o mesmo diretório.
+"""
+from __future__ import annotations
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import hashlib, json, os, struct, tempfile
+import numpy as np
+
+from .csr import CSRGraph
+
+_MAGIC = b"PCCS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHdIII")
+_SUFFIX = ".pcs"
+
+
+class CachedSolution(NamedTuple):
+    cost: float
+    tour: List
+    pairs: List[Tuple]
+
+
+def graph_key(g: CSRGraph, options: Optional[Dict] = None) -> str:
+    """Hash canônico (hex) do grafo com pesos e das opções do solver."""
+    labels = [str(x) for x in g.labels]
+    order = sorted(range(g.n), key=labels.__getitem__)
+    rank = np.empty(g.n, dtype=np.int64)
+    rank[order] = np.arange(g.n)
+    ru, rv = rank[g.eu], rank[g.ev]
+    a, b = np.minimum(ru, rv), np.maximum(ru, rv)
+    idx = np.lexsort((g.ew, b, a))
+    h = hashlib.sha256()
+    h.update(json.dumps(options or {}, sort_keys=True).encode())
+    h.update("\0".join(labels[x] for x in order).encode("utf-8"))
+    h.update(b"\1")
+    h.update(np.ascontiguousarray(a[idx], dtype="<i8").tobytes())
+    h.update(np.ascontiguousarray(b[idx], dtype="<i8").tobytes())
+    h.update(np.ascontiguousarray(g.ew[idx], dtype="<f8").tobytes())
+    return h.hexdigest()
+
+
+class SolutionCache:
+    """Diretório de soluções (cost, tour, pares) com limite de tamanho LRU."""
+
+    def __init__(self, path: str, max_bytes: int = 256 << 20):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + _SUFFIX)
+
+    def get(self, g: CSRGraph, options: Optional[Dict] = None) -> Optional[CachedSolution]:
+        f = self._file(graph_key(g, options))
+        try:
+            with open(f, "rb") as fh:
+                data = fh.read()
+            sol = _decode(data, {str(x): x for x in g.labels})
+            os.utime(f)
+        except (OSError, ValueError, KeyError, struct.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return sol
+
+    def put(self, g: CSRGraph, options: Optional[Dict], cost: float, tour: List, pairs: List[Tuple]) -> None:
+        data = _encode(cost, tour, pairs)
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, self._file(graph_key(g, options)))
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.path) as it:
+            for e in it:
+                if e.name.endswith(_SUFFIX):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, f in entries:
+            try:
+                os.unlink(f)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+def _encode(cost: float, tour: List, pairs: List[Tuple]) -> bytes:
+    index: Dict[str, int] = {}
+    for x in tour:
+        index.setdefault(str(x), len(index))
+    for u, v in pairs:
+        index.setdefault(str(u), len(index))
+        index.setdefault(str(v), len(index))
+    blob = "\0".join(index).encode("utf-8")
+    pair_arr = np.asarray([index[str(x)] for p in pairs for x in p], dtype="<i4")
+    tour_arr = np.asarray([index[str(x)] for x in tour], dtype="<i4")
+    head = _HEADER.pack(_MAGIC, _VERSION, float(cost), len(index), len(pairs), len(tour))
+    return head + struct.pack("<I", len(blob)) + blob + pair_arr.tobytes() + tour_arr.tobytes()
+
+
+def _decode(data: bytes, by_name: Dict[str, object]) -> CachedSolution:
+    magic, version, cost, nlab, npairs, ntour = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Entrada de cache incompatível.")
+    pos = _HEADER.size
+    (blen,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    names = data[pos:pos + blen].decode("utf-8").split("\0") if nlab else []
+    pos += blen
+    table = [by_name[x] for x in names]
+    pair_arr = np.frombuffer(data, dtype="<i4", count=2 * npairs, offset=pos)
+    pos += 8 * npairs
+    tour_arr = np.frombuffer(data, dtype="<i4", count=ntour, offset=pos)
+    pairs = [(table[a], table[b]) for a, b in pair_arr.reshape(-1, 2).tolist()]
+    return CachedSolution(cost, [table[x] for x in tour_arr.tolist()], pairs)
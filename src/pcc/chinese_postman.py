@@ -1,24 +1,57 @@
 """
-CPP não dirigido (pesos >= 0) usando networkx internamente.
+CPP não dirigido (pesos >= 0) sobre o grafo compacto CSR (pcc.csr).
+Entradas nx.Graph são convertidas uma única vez; networkx não é usado nas etapas.
 
 Passos:
-1) Verificar conectividade ignorando vértices isolados.
+1) Verificar conectividade ignorando vértices isolados e contrair as cadeias
+   de nós de grau 2 em super-arestas (pcc.contraction).
 2) Identificar vértices de grau ímpar.
-3) Distâncias de caminhos mínimos (Dijkstra).
-4) Emparelhamento perfeito mínimo (DP por bitmask) – O(k^2 · 2^k).
-5) Duplicar arestas ao longo dos caminhos mínimos emparelhados.
-6) Gerar circuito euleriano (Hierholzer / networkx.eulerian_circuit).
+3) Distâncias de caminhos mínimos (Dijkstra com parada antecipada nos ímpares).
+4) Emparelhamento perfeito mínimo: DP por bitmask (k pequeno, referência)
+   ou blossom de Edmonds (k grande) – ver pcc.matching. Pontes com um lado
+   ímpar são duplicadas direto e cada bloco 2-aresta-conexo é emparelhado
+   separadamente (pcc.bridges). Com quality="approx" (ou time_limit), blocos
+   grandes usam guloso + 2-opt com prazo e limite inferior dual (pcc.approx).
+5) Duplicar arestas ao longo dos caminhos mínimos emparelhados: o multigrafo
+   aumentado é o próprio grafo mais um vetor de multiplicidades por aresta
+   (1 + número de cópias), sem materializar as cópias.
+6) Gerar circuito euleriano (Hierholzer iterativo sobre ids de arestas e
+   multiplicidades, pcc.euler) e expandir as super-arestas de volta aos
+   vértices originais: mesmo custo e um circuito euleriano válido do grafo
+   original, mas não necessariamente a sequência obtida sem contração.
 
 Complexidades:
 - Dijkstra por fonte: O(m log n)
-- DP do matching: O(k^2 · 2^k)
+- DP do matching: O(k^2 · 2^k) tempo, O(2^(k-1)) memória (vetorizado com NumPy)
+- Blossom (Edmonds, primal-dual): O(k^3)
 """
 from __future__ import annotations
-from typing import List, Tuple, Dict
-import math
-import networkx as nx
+from typing import List, Tuple, Dict, Union, Optional, TYPE_CHECKING
+import math, itertools, heapq, os, time
+import numpy as np
+from .matching import minimum_weight_perfect_matching
+from .csr import CSRGraph, connected_components
+from .euler import hierholzer
+from .contraction import contract_degree2
+from .bridges import split_at_bridges
+from .approx import approximate_matching
+from .profiling import NO_STATS
+
+if TYPE_CHECKING:  # só anotações: o caminho CSR não carrega networkx
+    import networkx as nx
+
+# Acima deste k o DP exponencial perde para o blossom O(k^3).
+_DP_MAX_K = 20
+# Tabela do DP: 2^(k-1) float64 + 2^(k-1) int8 (k=28 -> ~1.2 GB).
+_DP_MAX_K_HARD = 30
+_DP_CHUNK = 1 << 16
+# Abaixo deste k o custo de subir o pool supera o ganho do paralelismo.
+_PARALLEL_MIN_K = 32
+# No modo aproximado, blocos até este k continuam exatos (DP em milissegundos).
+_APPROX_EXACT_K = 12
 
 def build_graph_from_edges(edges: List[Tuple[str, str, float]]) -> nx.Graph:
+    import networkx as nx
     G = nx.Graph()
     for u, v, w in edges:
         w = float(w)
@@ -27,115 +60,504 @@ def build_graph_from_edges(edges: List[Tuple[str, str, float]]) -> nx.Graph:
         G.add_edge(str(u), str(v), weight=w)
     return G
 
-def solve_cpp_undirected(G: nx.Graph) -> Tuple[float, List[str]]:
-    _assert_connected_ignoring_isolated(G)
-    base_cost = float(sum(d.get("weight", 1.0) for _, _, d in G.edges(data=True)))
-    odd_nodes = [n for n in G.nodes if G.degree(n) % 2 == 1]
-
-    if len(odd_nodes) == 0:
-        MG = nx.MultiGraph()
-        MG.add_nodes_from(G.nodes)
-        for u, v, d in G.edges(data=True):
-            MG.add_edge(u, v, **d)
-        tour_vertices = _eulerian_tour_vertices(MG)
-        return base_cost, tour_vertices
-
-    dist_mat, path_mat = _all_pairs_shortest_paths_among(G, odd_nodes)
-    pairs, added_cost = _minimum_weight_perfect_matching_dp(odd_nodes, dist_mat)
-    MG = _duplicate_along_paths(G, odd_nodes, pairs, path_mat)
-    tour_vertices = _eulerian_tour_vertices(MG)
-    return base_cost + added_cost, tour_vertices
-
-def _assert_connected_ignoring_isolated(G: nx.Graph) -> None:
-    H = G.copy()
-    isolates = [n for n in H.nodes if H.degree(n) == 0]
-    H.remove_nodes_from(isolates)
-    if H.number_of_nodes() == 0 or H.number_of_edges() == 0:
+def solve_cpp_undirected(
+    G: Union[nx.Graph, CSRGraph],
+    workers: int = 1,
+    candidates: int = 0,
+    coords: Optional[Dict[str, Tuple[float, float]]] = None,
+    cache=None,
+    quality: str = "exact",
+    time_limit: Optional[float] = None,
+    info: Optional[Dict] = None,
+    profile=None,
+) -> Tuple[float, List[str]]:
+    # Todo o pipeline roda sobre o CSR; um nx.Graph é convertido uma vez.
+    # workers > 1 distribui as buscas de caminho mínimo num pool de processos
+    # (0 = todos os núcleos). candidates = K > 0 ativa o modo esparso (K
+    # ímpares mais próximos + certificado dual, ver pcc.sparse); coords
+    # (id -> (lat, lon)) semeia os candidatos por proximidade geográfica.
+    # cache (pcc.cache.SolutionCache) devolve soluções já calculadas para o
+    # mesmo grafo e guarda as novas.
+    # quality="approx" (implícito com time_limit, em segundos) troca o
+    # matching exato por guloso + 2-opt até o prazo (pcc.approx); info, se
+    # dado, recebe quality, lower_bound, gap ((custo - limite) / custo) e
+    # stopped (True se o prazo interrompeu o 2-opt). Soluções aproximadas
+    # não passam pelo cache.
+    # profile (pcc.profiling.SolveStats) recebe tempo, memória e contadores
+    # de cada fase (conectividade, contração, pontes, caminhos mínimos,
+    # matching, duplicação, Euler).
+    if time_limit is not None:
+        quality = "approx"
+    if quality not in ("exact", "approx"):
+        raise ValueError(f"quality deve ser 'exact' ou 'approx' (recebido {quality!r}).")
+    approx = quality == "approx"
+    deadline = time.perf_counter() + max(0.0, float(time_limit)) if time_limit is not None else None
+    g = G if isinstance(G, CSRGraph) else CSRGraph.from_networkx(G)
+    options = {"candidates": int(candidates)}
+    summary = {"quality": quality, "lower_bound": None, "stopped": False}
+    prof = profile if profile is not None else NO_STATS
+    if cache is not None and not approx:
+        with prof.phase("cache"):
+            hit = cache.get(g, options)
+        if hit is not None:
+            prof.count("cache_hits")
+            cost, tour = hit.cost, hit.tour
+            summary["lower_bound"] = cost
+            _set_gap(summary, cost, info)
+            return cost, tour
+    cost, tour, pairs = _solve_csr(g, workers, candidates, coords, approx, deadline, summary, prof)
+    if cache is not None and not approx:
+        with prof.phase("cache"):
+            cache.put(g, options, cost, tour, pairs)
+    _set_gap(summary, cost, info)
+    return cost, tour
+
+def _set_gap(summary: Dict, cost: float, info: Optional[Dict]) -> None:
+    lb = summary["lower_bound"]
+    summary["gap"] = (cost - lb) / cost if cost > 0 else 0.0
+    if info is not None:
+        info.update(summary)
+
+def _solve_csr(
+    g: CSRGraph,
+    workers: int,
+    candidates: int,
+    coords: Optional[Dict[str, Tuple[float, float]]],
+    approx: bool = False,
+    deadline: Optional[float] = None,
+    summary: Optional[Dict] = None,
+    prof=NO_STATS,
+) -> Tuple[float, List[str], List[Tuple[str, str]]]:
+    # Pipeline completo; também devolve os pares emparelhados (extremos de
+    # cada caminho duplicado, pontes forçadas incluídas). Cadeias de grau 2
+    # são contraídas antes (pcc.contraction) e o circuito é expandido de volta
+    # no fim. summary recebe lower_bound (o próprio custo quando tudo foi
+    # exato) e stopped.
+    with prof.phase("connectivity"):
+        _assert_connected_ignoring_isolated(g)
+    base_cost = float(g.ew.sum())
+    with prof.phase("contraction"):
+        cg = contract_degree2(g)
+    h = cg.g if cg is not None else g
+    odd = np.flatnonzero(h.degree() % 2 == 1).astype(np.int32)
+    summary = summary if summary is not None else {}
+    prof.set("n", g.n)
+    prof.set("m", g.m)
+    prof.set("n_contracted", h.n)
+    prof.set("m_contracted", h.m)
+    prof.set("k", int(odd.size))
+
+    if odd.size == 0:
+        summary["lower_bound"] = base_cost
+        prof.set("multigraph_edges", h.m)
+        with prof.phase("euler"):
+            tour_vertices = _tour(g, cg, h, None)
+        return base_cost, tour_vertices, []
+
+    # Pontes com lado ímpar são duplicadas direto; o resto do emparelhamento
+    # se separa por bloco 2-aresta-conexo (pcc.bridges).
+    with prof.phase("bridges"):
+        split = split_at_bridges(h, odd)
+    forced, groups = split if split is not None else (np.empty(0, dtype=np.int64), [odd])
+    prof.set("forced_bridges", int(forced.size))
+    prof.set("blocks", len(groups))
+    added_cost = float(h.ew[forced].sum())
+    lower = base_cost + added_cost
+    parts = [forced]
+    labels = h.labels
+    matched = [(labels[int(a)], labels[int(b)]) for a, b in zip(h.eu[forced], h.ev[forced])]
+    for terminals in groups:
+        if approx and terminals.size > _APPROX_EXACT_K:
+            with prof.phase("shortest_paths"):
+                dist_mat, trees = _all_pairs_shortest_paths_among(h, terminals, workers, prof)
+            with prof.phase("matching"):
+                pairs, cost, lb, stopped = approximate_matching(dist_mat, deadline)
+            summary["stopped"] = summary.get("stopped", False) or stopped
+        else:
+            pairs, cost, trees = _match_terminals(h, terminals, workers, candidates, coords, prof)
+            lb = cost
+        added_cost += cost
+        lower += lb
+        with prof.phase("duplication"):
+            parts.append(_path_edge_ids(pairs, trees))
+        src = terminals.tolist()
+        matched.extend((labels[src[i]], labels[src[j]]) for i, j in pairs)
+    with prof.phase("duplication"):
+        mult = _edge_multiplicity(h, np.concatenate(parts))
+    prof.set("multigraph_edges", int(mult.sum()))
+    with prof.phase("euler"):
+        tour_vertices = _tour(g, cg, h, mult)
+    summary["lower_bound"] = min(lower, base_cost + added_cost)
+    return base_cost + added_cost, tour_vertices, matched
+
+def _match_terminals(
+    g: CSRGraph,
+    terminals: np.ndarray,
+    workers: int,
+    candidates: int,
+    coords: Optional[Dict[str, Tuple[float, float]]],
+    prof=NO_STATS,
+):
+    # Emparelhamento perfeito mínimo entre os terminais (pares, custo, árvores):
+    # DP ou blossom sobre a matriz densa, ou o modo esparso se k for grande.
+    names = [g.labels[x] for x in terminals.tolist()]
+    if candidates > 0 and len(names) > max(_DP_MAX_K, 2 * candidates):
+        from .sparse import sparse_candidate_matching
+        with prof.phase("sparse_matching"):
+            return sparse_candidate_matching(g, terminals, candidates, coords)
+    with prof.phase("shortest_paths"):
+        dist_mat, trees = _all_pairs_shortest_paths_among(g, terminals, workers, prof)
+    with prof.phase("matching"):
+        pairs, cost = _minimum_weight_perfect_matching(names, dist_mat)
+    if len(names) <= _DP_MAX_K:
+        prof.count("dp_states", _dp_states(len(names)))
+    return pairs, cost, trees
+
+def _tour(g: CSRGraph, cg, h: CSRGraph, mult: Optional[np.ndarray]) -> List[str]:
+    # Circuito do multigrafo aumentado (h com multiplicidades mult; None = 1);
+    # com contração, h é o grafo contraído e o circuito é expandido e
+    # rotacionado para começar no mesmo vértice que sem contração.
+    if cg is None:
+        return _eulerian_tour_vertices(g, mult)
+    used: List[int] = []
+    circuit = _eulerian_circuit(h.n, h.eu, h.ev, mult, used)
+    if not circuit:
+        return []
+    seq = cg.expand(circuit, used)
+    first = int(np.flatnonzero(g.degree() > 0)[0])
+    if seq[0] != first:
+        i = seq.index(first)
+        seq = seq[i:-1] + seq[:i + 1]
+    labels = g.labels
+    return [labels[x] for x in seq]
+
+def solve_cpp_components(
+    G: Union[nx.Graph, CSRGraph],
+    workers: int = 1,
+    candidates: int = 0,
+    coords: Optional[Dict[str, Tuple[float, float]]] = None,
+    cache=None,
+    quality: str = "exact",
+    time_limit: Optional[float] = None,
+    info: Optional[Dict] = None,
+    profile=None,
+) -> Tuple[float, List[Tuple[float, List[str]]]]:
+    # Resolve cada componente conexa (com arestas) de forma independente, em
+    # paralelo quando workers != 1. Devolve (custo agregado, [(custo, tour)]),
+    # na ordem de primeira aparição das componentes. Com cache, cada
+    # componente é uma entrada própria. quality/time_limit como em
+    # solve_cpp_undirected (o prazo vale para cada componente); info recebe
+    # o limite inferior somado e o gap agregado. profile acumula as fases das
+    # componentes (no modo paralelo, só o tempo total em "components").
+    g = G if isinstance(G, CSRGraph) else CSRGraph.from_networkx(G)
+    ncomp, comp = connected_components(g)
+    has_edges = np.bincount(comp[g.eu], minlength=ncomp) > 0
+    subs = [g.subgraph(comp == c) for c in range(ncomp) if has_edges[c]]
+    workers = _resolve_workers(workers)
+    if workers > 1 and len(subs) > 1:
+        from .parallel import solve_components_parallel
+        with (profile if profile is not None else NO_STATS).phase("components"):
+            solved = solve_components_parallel(subs, workers, candidates, coords, cache, quality, time_limit)
+    else:
+        solved = []
+        for sub in subs:
+            sub_info: Dict = {}
+            cost, tour = solve_cpp_undirected(sub, candidates=candidates, coords=coords, cache=cache,
+                                              quality=quality, time_limit=time_limit, info=sub_info,
+                                              profile=profile)
+            solved.append((cost, tour, sub_info))
+    results = [(c, t) for c, t, _ in solved]
+    total = float(sum(c for c, _ in results))
+    if info is not None:
+        infos = [x for _, _, x in solved]
+        summary = {"quality": "approx" if time_limit is not None else quality,
+                   "lower_bound": float(sum(x["lower_bound"] for x in infos)),
+                   "stopped": any(x["stopped"] for x in infos)}
+        _set_gap(summary, total, info)
+    return total, results
+
+def _assert_connected_ignoring_isolated(g: CSRGraph) -> None:
+    deg = g.degree()
+    active = np.flatnonzero(deg > 0)
+    if active.size == 0:
         return
-    if not nx.is_connected(H):
+    off = memoryview(g.offsets)
+    tgt = memoryview(g.targets)
+    seen = bytearray(g.n)
+    start = int(active[0])
+    seen[start] = 1
+    stack = [start]
+    count = 1
+    while stack:
+        u = stack.pop()
+        for p in range(off[u], off[u + 1]):
+            v = tgt[p]
+            if not seen[v]:
+                seen[v] = 1
+                count += 1
+                stack.append(v)
+    if count != active.size:
         raise ValueError("O grafo não é conexo (ignorando vértices isolados).")
 
+class _ShortestPathTrees:
+    """Árvores de caminhos mínimos por fonte ímpar: pred[i] é um vetor int32
+    com o id da aresta pela qual cada nó foi alcançado (-1 se não alcançado).
+    Caminhos só são reconstruídos sob demanda, para os pares emparelhados."""
+
+    __slots__ = ("g", "sources", "pred")
+
+    def __init__(self, g: CSRGraph, sources: List[int], pred: np.ndarray):
+        self.g = g
+        self.sources = sources    # i -> índice do i-ésimo vértice ímpar
+        self.pred = pred          # (k, n) int32: aresta predecessora
+
+    def path_edges(self, i: int, j: int) -> List[int]:
+        # Ids das arestas do caminho mínimo entre os ímpares i e j.
+        if i > j:
+            i, j = j, i
+        s, x = self.sources[i], self.sources[j]
+        row = self.pred[i]
+        eu, ev = self.g.eu, self.g.ev
+        out: List[int] = []
+        while x != s:
+            e = int(row[x])
+            out.append(e)
+            x = int(eu[e]) if int(ev[e]) == x else int(ev[e])
+        out.reverse()
+        return out
+
+    def path(self, i: int, j: int) -> List[str]:
+        if i > j:
+            return self.path(j, i)[::-1]
+        x = self.sources[i]
+        out = [x]
+        for e in self.path_edges(i, j):
+            x = int(self.g.ev[e]) if int(self.g.eu[e]) == x else int(self.g.eu[e])
+            out.append(x)
+        return [self.g.labels[v] for v in out]
+
 def _all_pairs_shortest_paths_among(
-    G: nx.Graph, nodes: List[str]
-) -> Tuple[List[List[float]], List[List[List[str]]]]:
+    g: CSRGraph, nodes: np.ndarray, workers: int = 1, prof=NO_STATS
+) -> Tuple[np.ndarray, _ShortestPathTrees]:
+    # Matriz simétrica: a busca a partir de nodes[i] só precisa assentar os
+    # alvos j > i e para assim que o último deles sai da fila.
     k = len(nodes)
-    dist_mat = [[0.0] * k for _ in range(k)]
-    path_mat: List[List[List[str]]] = [[[] for _ in range(k)] for _ in range(k)]
-    for i, s in enumerate(nodes):
-        lengths, paths = nx.single_source_dijkstra(G, s, weight="weight")
-        for j, t in enumerate(nodes):
-            if i == j:
-                dist_mat[i][j] = 0.0
-                path_mat[i][j] = [s]
-            else:
-                if t not in lengths:
-                    raise ValueError(f"Vértice ímpar '{t}' é inalcançável a partir de '{s}'.")
-                dist_mat[i][j] = float(lengths[t])
-                path_mat[i][j] = list(map(str, paths[t]))
-    return dist_mat, path_mat
+    src = nodes.tolist()
+    workers = _resolve_workers(workers)
+    pushes = [0]
+    if workers > 1 and k >= _PARALLEL_MIN_K:
+        from .parallel import parallel_shortest_paths
+        dist_mat, pred, failed = parallel_shortest_paths(g, src, workers, pushes)
+    else:
+        dist_mat = np.zeros((k, k), dtype=np.float64)
+        pred = np.full((k, g.n), -1, dtype=np.int32)
+        failed = None
+        for i in range(k - 1):
+            failed = _sssp_row(g.offsets, g.targets, g.weights, g.edge_ids, src, i, dist_mat[i], pred[i], pushes)
+            if failed is not None:
+                break
+        dist_mat = np.triu(dist_mat) + np.triu(dist_mat, 1).T
+    prof.count("dijkstra_runs", max(k - 1, 0))
+    prof.count("heap_pushes", pushes[0])
+    if failed is not None:
+        s, t = failed
+        raise ValueError(
+            f"Vértice ímpar '{g.labels[t]}' é inalcançável a partir de '{g.labels[s]}'."
+        )
+    return dist_mat, _ShortestPathTrees(g, src, pred)
+
+def _resolve_workers(workers: Optional[int]) -> int:
+    # workers <= 0 (ou None) usa todos os núcleos disponíveis.
+    if not workers or workers < 0:
+        return os.cpu_count() or 1
+    return int(workers)
+
+def _sssp_row(
+    offsets, targets, weights, edge_ids, src: List[int], i: int, dist_row: np.ndarray, pred_row: np.ndarray,
+    counter: Optional[List[int]] = None,
+) -> Optional[Tuple[int, int]]:
+    # Preenche dist_row[j] (j > i) e pred_row a partir do ímpar i. Devolve
+    # (fonte, alvo) do primeiro alvo inalcançável, ou None. Trabalha só com
+    # arrays/buffers, para poder rodar em processos sobre memória compartilhada.
+    tlist = src[i + 1:]
+    dist, remaining = _targeted_dijkstra(offsets, targets, weights, edge_ids, src[i], tlist, pred_row, counter)
+    if remaining:
+        return src[i], next(t for t in tlist if t in remaining)
+    dist_row[i + 1:] = [dist[t] for t in tlist]
+    return None
+
+def _targeted_dijkstra(
+    offsets, targets, weights, edge_ids, source: int, target_list: List[int], pred_row,
+    counter: Optional[List[int]] = None,
+) -> Tuple[Dict[int, float], set]:
+    # Dijkstra com parada antecipada sobre o CSR: encerra quando todos os
+    # alvos foram assentados (removidos da fila com distância definitiva).
+    # A aresta predecessora de cada nó alcançado é gravada em pred_row;
+    # counter[0], se dado, soma os pushes no heap.
+    off = memoryview(offsets)
+    tgt = memoryview(targets)
+    wts = memoryview(weights)
+    eid = memoryview(edge_ids)
+    prow = memoryview(pred_row)
+    remaining = set(target_list)
+    remaining.discard(source)
+    dist: Dict[int, float] = {source: 0.0}
+    heap = [(0.0, source)]
+    pushes = 1
+    while heap and remaining:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        remaining.discard(u)
+        for p in range(off[u], off[u + 1]):
+            v = tgt[p]
+            nd = d + wts[p]
+            dv = dist.get(v)
+            if dv is None or nd < dv:
+                dist[v] = nd
+                prow[v] = eid[p]
+                heapq.heappush(heap, (nd, v))
+                pushes += 1
+    if counter is not None:
+        counter[0] += pushes
+    return dist, remaining
+
+def _minimum_weight_perfect_matching(
+    odd_nodes: List[str], dist_mat: List[List[float]]
+) -> Tuple[List[Tuple[int, int]], float]:
+    # DP (referência) para k pequeno; blossom O(k^3) para o restante.
+    if len(odd_nodes) <= _DP_MAX_K:
+        return _minimum_weight_perfect_matching_dp(odd_nodes, dist_mat)
+    if len(odd_nodes) % 2 != 0:
+        raise ValueError("Quantidade de vértices ímpares deve ser par.")
+    return minimum_weight_perfect_matching(dist_mat)
 
 def _minimum_weight_perfect_matching_dp(
     odd_nodes: List[str], dist_mat: List[List[float]]
 ) -> Tuple[List[Tuple[int, int]], float]:
+    # DP iterativo (bottom-up). dp[mask] só existe para máscaras de paridade par,
+    # indexadas pelos k-1 bits baixos (o bit k-1 é implícito pela paridade).
+    # As máscaras são processadas por camadas do bit menos significativo i, de
+    # k-2 até 0: toda máscara com bit baixo i depende só de camadas > i.
     k = len(odd_nodes)
     if k % 2 != 0:
         raise ValueError("Quantidade de vértices ímpares deve ser par.")
+    if k == 0:
+        return [], 0.0
+    if k > _DP_MAX_K_HARD:
+        raise ValueError(f"DP por bitmask inviável para k={k} (limite {_DP_MAX_K_HARD}).")
+    D = np.asarray(dist_mat, dtype=np.float64)
+    low = (1 << (k - 1)) - 1
+    dp = np.full(1 << (k - 1), np.inf, dtype=np.float64)
+    choice = np.zeros(1 << (k - 1), dtype=np.int8)
+    dp[0] = 0.0
+    for i in range(k - 2, -1, -1):
+        js = np.arange(i + 1, k, dtype=np.int64)
+        jbits = np.left_shift(np.int64(1), js)
+        drop = jbits | np.int64(1 << i)
+        Dij = D[i, i + 1:]
+        for r in _dp_layer_chunks(i, k):
+            masks = (r << (i + 1)) | np.int64(1 << i)
+            # (máscaras x candidatos j): custo d[i][j] + dp[mask sem {i, j}]
+            vals = dp[(masks[:, None] ^ drop[None, :]) & low] + Dij[None, :]
+            vals[(masks[:, None] & jbits[None, :]) == 0] = np.inf
+            best = np.argmin(vals, axis=1)
+            idx = masks & low
+            dp[idx] = vals[np.arange(masks.size), best]
+            choice[idx] = (best + (i + 1)).astype(np.int8)
     full = (1 << k) - 1
-    memo: Dict[int, float] = {0: 0.0}
-    choice: Dict[int, Tuple[int, int, int]] = {}
-    def solve(mask: int) -> float:
-        if mask in memo:
-            return memo[mask]
-        i = (mask & -mask).bit_length() - 1
-        best = float("inf"); best_choice = None
-        rest = mask ^ (1 << i)
-        jmask = rest
-        while jmask:
-            j = (jmask & -jmask).bit_length() - 1
-            next_mask = rest ^ (1 << j)
-            cost = dist_mat[i][j] + solve(next_mask)
-            if cost < best:
-                best = cost
-                best_choice = (i, j, next_mask)
-            jmask ^= (1 << j)
-        memo[mask] = best
-        choice[mask] = best_choice  # type: ignore
-        return best
-    total_cost = solve(full)
+    total_cost = float(dp[full & low])
     pairs: List[Tuple[int, int]] = []
     mask = full
     while mask:
-        i, j, next_mask = choice[mask]
+        i = (mask & -mask).bit_length() - 1
+        j = int(choice[mask & low])
         pairs.append((i, j))
-        mask = next_mask
+        mask ^= (1 << i) | (1 << j)
     return pairs, total_cost
 
-def _duplicate_along_paths(
-    G: nx.Graph,
-    odd_nodes: List[str],
-    pairs: List[Tuple[int, int]],
-    path_mat: List[List[List[str]]],
-) -> nx.MultiGraph:
-    MG = nx.MultiGraph()
-    MG.add_nodes_from(G.nodes)
-    for u, v, d in G.edges(data=True):
-        MG.add_edge(u, v, **d)
+def _dp_layer_chunks(i: int, k: int):
+    # Bits acima de i (r, largura w) das máscaras com bit baixo i alcançáveis a
+    # partir da máscara cheia: cada par removido tem o primeiro vértice abaixo
+    # de i, logo no máximo i bits acima de i foram removidos (zeros de r <= i),
+    # com paridade total par. As demais entradas da tabela nunca são lidas.
+    w = k - 1 - i
+    n_reach = sum(math.comb(w, z) for z in range(i % 2, min(i, w) + 1, 2))
+    if n_reach * 8 < (1 << w):
+        # Poucas máscaras: enumera diretamente as posições dos zeros.
+        full_r = (1 << w) - 1
+        out: List[int] = []
+        for z in range(i % 2, min(i, w) + 1, 2):
+            for zeros in itertools.combinations(range(w), z):
+                r = full_r
+                for b in zeros:
+                    r ^= 1 << b
+                out.append(r)
+                if len(out) >= _DP_CHUNK:
+                    yield np.array(out, dtype=np.int64)
+                    out = []
+        if out:
+            yield np.array(out, dtype=np.int64)
+        return
+    for start in range(0, 1 << w, _DP_CHUNK):
+        r = np.arange(start, min(start + _DP_CHUNK, 1 << w), dtype=np.int64)
+        zeros = w - _popcount(r)
+        r = r[(zeros <= i) & ((zeros & 1) == (i & 1))]
+        if r.size:
+            yield r
+
+def _dp_states(k: int) -> int:
+    # Máscaras avaliadas pelo DP (as mesmas geradas por _dp_layer_chunks).
+    total = 0
+    for i in range(k - 2, -1, -1):
+        w = k - 1 - i
+        total += sum(math.comb(w, z) for z in range(i % 2, min(i, w) + 1, 2))
+    return total
+
+def _popcount(x: "np.ndarray") -> "np.ndarray":
+    # Popcount SWAR para inteiros não negativos < 2^32.
+    x = x - ((x >> 1) & 0x55555555)
+    x = (x & 0x33333333) + ((x >> 2) & 0x33333333)
+    x = (x + (x >> 4)) & 0x0F0F0F0F
+    return ((x * 0x01010101) & 0xFFFFFFFF) >> 24
+
+def _path_edge_ids(pairs: List[Tuple[int, int]], trees) -> np.ndarray:
+    # Ids das arestas dos caminhos emparelhados (trees: qualquer objeto com
+    # path_edges(i, j), denso ou esparso).
+    extra: List[int] = []
     for i, j in pairs:
-        path = path_mat[i][j]
-        for a, b in zip(path, path[1:]):
-            w = float(G[a][b]["weight"])
-            MG.add_edge(a, b, weight=w)
-    return MG
-
-def _eulerian_tour_vertices(MG: nx.MultiGraph) -> List[str]:
-    if not nx.is_eulerian(MG):
-        raise ValueError("O multigrafo não é euleriano após duplicação de arestas.")
-    edges = list(nx.eulerian_circuit(MG))
-    if not edges:
+        extra.extend(trees.path_edges(i, j))
+    return np.asarray(extra, dtype=np.int64)
+
+def _edge_multiplicity(g: CSRGraph, ids: np.ndarray) -> np.ndarray:
+    # Multigrafo aumentado como sobreposição: mult[e] = 1 + número de vezes
+    # que a aresta e aparece nos caminhos emparelhados (O(m) int64, em vez
+    # de arrays com todas as cópias).
+    return np.bincount(ids, minlength=g.m) + 1
+
+def _eulerian_circuit(
+    n: int,
+    eu: np.ndarray,
+    ev: np.ndarray,
+    mult: Optional[np.ndarray] = None,
+    edges_out: Optional[List[int]] = None,
+) -> List[int]:
+    # Incidência montada com NumPy (argsort estável) e percorrida pelo
+    # Hierholzer compartilhado de pcc.euler, via memoryviews (sem cópias);
+    # a incidência só tem as m arestas distintas, as cópias ficam em mult.
+    m = len(eu)
+    if m == 0:
         return []
-    tour_vertices: List[str] = [edges[0][0]]
-    for u, v in edges:
-        tour_vertices.append(v)
-    if tour_vertices and tour_vertices[0] != tour_vertices[-1]:
-        tour_vertices.append(tour_vertices[0])
-    return tour_vertices
\ No newline at end of file
+    src = np.concatenate([eu, ev]).astype(np.int64)
+    inc = np.ascontiguousarray(np.argsort(src, kind="stable") % m, dtype=np.int64)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    a = np.ascontiguousarray(eu, dtype=np.int32)
+    b = np.ascontiguousarray(ev, dtype=np.int32)
+    k = memoryview(np.ascontiguousarray(mult, dtype=np.int64)) if mult is not None else None
+    return hierholzer(n, memoryview(a), memoryview(b),
+                      incidence=(memoryview(offsets), memoryview(inc)), edges_out=edges_out, mult=k)
+
+def _eulerian_tour_vertices(g: CSRGraph, mult: Optional[np.ndarray] = None) -> List[str]:
+    labels = g.labels
+    return [labels[x] for x in _eulerian_circuit(g.n, g.eu, g.ev, mult)]
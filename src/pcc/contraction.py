@@ -0,0 +1,123 @@
+"""
+Contração de cadeias de grau 2 (quebras de polilinha em malhas viárias).
+
+Um nó interno de cadeia tem grau 2 e duas arestas distintas (um laço não
+conta). Cada cadeia maximal entre nós mantidos (grau != 2) vira uma
+super-aresta com o peso somado; a lista ordenada das arestas originais fica
+guardada para expandir o circuito depois. A contração não muda o conjunto de
+ímpares (nós internos têm grau par) nem as distâncias entre nós mantidos
+(um caminho mínimo atravessa uma cadeia inteira ou não entra nela), então
+o CPP do grafo reduzido tem o mesmo custo; expandir cada super-aresta do
+circuito reduzido dá um circuito euleriano do multigrafo original (não
+necessariamente o mesmo que o Hierholzer acharia sem contração).
+
+Custo: O(n + m) para contrair e para expandir; Dijkstra e Hierholzer passam
+a rodar sobre o grafo reduzido.
+"""
+from __future__ import annotations
+from typing import List, Optional
+import numpy as np
+
+from .csr import CSRGraph
+
+
+class ContractedGraph:
+    """Grafo reduzido + o necessário para voltar ao grafo original."""
+
+    __slots__ = ("g", "orig", "nodes", "chain_off", "chain_edges", "chain_start")
+
+    def __init__(self, g: CSRGraph, orig: CSRGraph, nodes: np.ndarray,
+                 chain_off: np.ndarray, chain_edges: np.ndarray, chain_start: np.ndarray):
+        self.g = g                      # grafo reduzido (só nós mantidos)
+        self.orig = orig
+        self.nodes = nodes              # id reduzido -> id original
+        self.chain_off = chain_off      # super-aresta s: arestas chain_off[s]:chain_off[s+1]
+        self.chain_edges = chain_edges  # ids originais, na ordem a partir de chain_start[s]
+        self.chain_start = chain_start  # id original do extremo onde a cadeia começa
+
+    def expand(self, vertices: List[int], edges: List[int]) -> List[int]:
+        """
+        Circuito reduzido (vértices e super-arestas usadas entre eles) ->
+        sequência de vértices originais.
+        """
+        nodes = self.nodes.tolist()
+        off = self.chain_off.tolist()
+        chain = self.chain_edges.tolist()
+        start = self.chain_start.tolist()
+        eu, ev = self.orig.eu.tolist(), self.orig.ev.tolist()
+        x = nodes[vertices[0]]
+        out = [x]
+        for i, s in enumerate(edges):
+            ids = chain[off[s]:off[s + 1]]
+            if start[s] != x:
+                ids.reverse()
+            for e in ids:
+                x = ev[e] if eu[e] == x else eu[e]
+                out.append(x)
+            if x != nodes[vertices[i + 1]]:
+                raise ValueError("Circuito reduzido inconsistente com as cadeias contraídas.")
+        return out
+
+
+def contract_degree2(g: CSRGraph) -> Optional[ContractedGraph]:
+    """Contrai as cadeias de grau 2 de g; None se não há nó interno."""
+    deg = g.degree()
+    interior = deg == 2
+    cand = np.flatnonzero(interior)
+    if cand.size == 0:
+        return None
+    p = g.offsets[cand]
+    interior[cand[g.edge_ids[p] == g.edge_ids[p + 1]]] = False   # laço isolado
+    kept = ~interior & (deg > 0)
+    if not interior.any():
+        return None
+    if not kept.any():
+        # Componente inteira é um ciclo simples: um nó qualquer vira extremo.
+        first = int(np.flatnonzero(interior)[0])
+        interior[first] = False
+        kept[first] = True
+    kept_ids = np.flatnonzero(kept)
+    new_id = np.full(g.n, -1, dtype=np.int64)
+    new_id[kept_ids] = np.arange(kept_ids.size)
+
+    off = memoryview(g.offsets)
+    tgt = memoryview(g.targets)
+    eid = memoryview(g.edge_ids)
+    wts = memoryview(g.weights)
+    inner = bytearray(interior.astype(np.uint8).tobytes())
+    visited = bytearray(g.m)
+    su: List[int] = []
+    sv: List[int] = []
+    sw: List[float] = []
+    start: List[int] = []
+    chain_off = [0]
+    chain: List[int] = []
+    for a in kept_ids.tolist():
+        for q in range(off[a], off[a + 1]):
+            e = eid[q]
+            if visited[e]:
+                continue
+            visited[e] = 1
+            chain.append(e)
+            w = wts[q]
+            x = tgt[q]
+            while inner[x]:
+                q = off[x]
+                if eid[q] == e:
+                    q += 1
+                e = eid[q]
+                visited[e] = 1
+                chain.append(e)
+                w += wts[q]
+                x = tgt[q]
+            su.append(a); sv.append(x); sw.append(w); start.append(a)
+            chain_off.append(len(chain))
+    labels = g.labels
+    h = CSRGraph([labels[x] for x in kept_ids.tolist()],
+                 new_id[np.asarray(su, dtype=np.int64)].astype(np.int32),
+                 new_id[np.asarray(sv, dtype=np.int64)].astype(np.int32),
+                 np.asarray(sw, dtype=np.float64))
+    return ContractedGraph(h, g, kept_ids,
+                           np.asarray(chain_off, dtype=np.int64),
+                           np.asarray(chain, dtype=np.int32),
+                           np.asarray(start, dtype=np.int64))
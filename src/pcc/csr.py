@@ -0,0 +1,193 @@
+"""
+Grafo compacto em CSR (compressed sparse row), independente de networkx.
+
+Nós são inteiros 0..n-1 com uma tabela de rótulos; arestas são identificadas
+por id (0..m-1) com extremos eu/ev e peso ew. A adjacência é guardada como
+meias-arestas: para o nó u, as posições offsets[u]:offsets[u+1] de targets,
+weights e edge_ids. Um laço (u, u) aparece duas vezes na lista de u, de modo
+que o grau é sempre offsets[u+1] - offsets[u] (como em networkx).
+"""
+from __future__ import annotations
+from typing import List, Tuple, Dict, Iterable, Optional, Sequence
+import math
+import numpy as np
+
+
+class CSRGraph:
+    """Grafo não dirigido com arrays CSR (offsets/targets/weights/edge_ids)."""
+
+    __slots__ = ("labels", "eu", "ev", "ew", "offsets", "targets", "weights", "edge_ids", "source", "_index")
+
+    def __init__(
+        self,
+        labels: Sequence,
+        eu: np.ndarray,
+        ev: np.ndarray,
+        ew: np.ndarray,
+        offsets: Optional[np.ndarray] = None,
+        targets: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+        edge_ids: Optional[np.ndarray] = None,
+    ):
+        self.labels = labels
+        self.eu = eu
+        self.ev = ev
+        self.ew = ew
+        if offsets is None or targets is None or weights is None or edge_ids is None:
+            offsets, targets, weights, edge_ids = _build_csr(len(labels), eu, ev, ew)
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.edge_ids = edge_ids
+        self.source: Optional[str] = None   # arquivo .pccg mapeado, se houver
+        self._index: Optional[Dict] = None
+
+    @property
+    def n(self) -> int:
+        return len(self.labels)
+
+    @property
+    def m(self) -> int:
+        return len(self.eu)
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def index(self, label) -> int:
+        if self._index is None:
+            self._index = {x: i for i, x in enumerate(self.labels)}
+        return self._index[label]
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Tuple[str, str, float]]) -> "CSRGraph":
+        # Mesma semântica de build_graph_from_edges: arestas repetidas (u,v)
+        # mantêm o último peso; nós na ordem de primeira aparição.
+        index: Dict[str, int] = {}
+        labels: List[str] = []
+        slot: Dict[Tuple[int, int], int] = {}
+        eu: List[int] = []
+        ev: List[int] = []
+        ew: List[float] = []
+        for u, v, w in edges:
+            w = float(w)
+            if not (w >= 0) or math.isnan(w):
+                raise ValueError(f"Peso inválido em ({u},{v},{w})")
+            u, v = str(u), str(v)
+            a = index.get(u)
+            if a is None:
+                a = index[u] = len(labels)
+                labels.append(u)
+            b = index.get(v)
+            if b is None:
+                b = index[v] = len(labels)
+                labels.append(v)
+            key = (a, b) if a <= b else (b, a)
+            e = slot.get(key)
+            if e is None:
+                slot[key] = len(eu)
+                eu.append(a); ev.append(b); ew.append(w)
+            else:
+                ew[e] = w
+        g = cls(labels,
+                np.asarray(eu, dtype=np.int32),
+                np.asarray(ev, dtype=np.int32),
+                np.asarray(ew, dtype=np.float64))
+        g._index = index
+        return g
+
+    @classmethod
+    def from_arrays(cls, labels: Sequence, eu: np.ndarray, ev: np.ndarray, ew: np.ndarray) -> "CSRGraph":
+        # Versão vetorizada de from_edges para arrays já internados (pesos já
+        # validados): repetidas (u,v) mantêm a posição da primeira ocorrência
+        # e o peso da última.
+        n = len(labels)
+        eu = np.asarray(eu, dtype=np.int64)
+        ev = np.asarray(ev, dtype=np.int64)
+        ew = np.asarray(ew, dtype=np.float64)
+        key = np.minimum(eu, ev) * max(n, 1) + np.maximum(eu, ev)
+        order = np.argsort(key, kind="stable")
+        sk = key[order]
+        starts = np.flatnonzero(np.r_[True, sk[1:] != sk[:-1]])
+        ends = np.r_[starts[1:], len(sk)] - 1
+        first, last = order[starts], order[ends]
+        keep = np.argsort(first, kind="stable")
+        first, last = first[keep], last[keep]
+        return cls(labels,
+                   eu[first].astype(np.int32),
+                   ev[first].astype(np.int32),
+                   ew[last].copy())
+
+    @classmethod
+    def from_networkx(cls, G) -> "CSRGraph":
+        labels = list(G.nodes)
+        index = {x: i for i, x in enumerate(labels)}
+        m = G.number_of_edges()
+        eu = np.empty(m, dtype=np.int32)
+        ev = np.empty(m, dtype=np.int32)
+        ew = np.empty(m, dtype=np.float64)
+        for e, (u, v, d) in enumerate(G.edges(data=True)):
+            eu[e] = index[u]
+            ev[e] = index[v]
+            ew[e] = float(d.get("weight", 1.0))
+        g = cls(labels, eu, ev, ew)
+        g._index = index
+        return g
+
+    def to_networkx(self):
+        """Constrói o nx.Graph equivalente (usado apenas para plot)."""
+        import networkx as nx
+        G = nx.Graph()
+        G.add_nodes_from(self.labels)
+        labels = self.labels
+        for u, v, w in zip(self.eu.tolist(), self.ev.tolist(), self.ew.tolist()):
+            G.add_edge(labels[u], labels[v], weight=w)
+        return G
+
+    def subgraph(self, keep: np.ndarray) -> "CSRGraph":
+        """Subgrafo induzido pelos nós com keep[x] verdadeiro (ordem preservada)."""
+        keep = np.asarray(keep, dtype=bool)
+        new_id = np.full(self.n, -1, dtype=np.int64)
+        new_id[keep] = np.arange(int(keep.sum()))
+        emask = keep[self.eu] & keep[self.ev]
+        labels = [x for x, k in zip(self.labels, keep.tolist()) if k]
+        return CSRGraph(labels,
+                        new_id[self.eu[emask]].astype(np.int32),
+                        new_id[self.ev[emask]].astype(np.int32),
+                        self.ew[emask].copy())
+
+
+def _build_csr(n: int, eu: np.ndarray, ev: np.ndarray, ew: np.ndarray):
+    m = len(eu)
+    src = np.concatenate([eu, ev]).astype(np.int64)
+    dst = np.concatenate([ev, eu])
+    eid = np.concatenate([np.arange(m, dtype=np.int32), np.arange(m, dtype=np.int32)])
+    order = np.argsort(src, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    targets = np.ascontiguousarray(dst[order], dtype=np.int32)
+    edge_ids = np.ascontiguousarray(eid[order], dtype=np.int32)
+    weights = np.ascontiguousarray(ew[edge_ids], dtype=np.float64)
+    return offsets, targets, weights, edge_ids
+
+
+def connected_components(g: CSRGraph) -> Tuple[int, np.ndarray]:
+    """Rótulo de componente por nó (BFS sobre o CSR). Devolve (ncomp, comp)."""
+    n = g.n
+    comp = [-1] * n
+    off = memoryview(g.offsets)
+    tgt = memoryview(g.targets)
+    ncomp = 0
+    for s in range(n):
+        if comp[s] != -1:
+            continue
+        comp[s] = ncomp
+        stack = [s]
+        while stack:
+            u = stack.pop()
+            for p in range(off[u], off[u + 1]):
+                v = tgt[p]
+                if comp[v] == -1:
+                    comp[v] = ncomp
+                    stack.append(v)
+        ncomp += 1
+    return ncomp, np.asarray(comp, dtype=np.int32)
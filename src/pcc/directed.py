@@ -0,0 +1,144 @@
+"""
+CPP dirigido (ruas de mão única) sobre arrays de arcos.
+
+Passos:
+1) Verificar conectividade forte ignorando vértices isolados.
+2) Desbalanceamento d[x] = grau de entrada - grau de saída.
+3) Fluxo de custo mínimo dos vértices com d > 0 para os com d < 0 (pcc.flow):
+   o fluxo em cada arco é o número de cópias extras dele.
+4) Circuito euleriano dirigido do multigrafo balanceado (pcc.euler), dado
+   pelos arcos originais com multiplicidade 1 + fluxo (sem copiar arcos).
+
+Ruas de mão dupla entram como dois arcos opostos (cada sentido percorrido ao
+menos uma vez), como na leitura do CSV com a coluna oneway (pcc.graph_io).
+O tour sai no mesmo formato do caso não dirigido e usa os mesmos exports da
+CLI.
+"""
+from __future__ import annotations
+from typing import Iterable, List, Sequence, Tuple, Union, TYPE_CHECKING
+import math
+import numpy as np
+
+from .euler import hierholzer_directed
+from .flow import min_cost_flow
+from .profiling import NO_STATS
+
+if TYPE_CHECKING:  # só anotações: o caminho CSR não carrega networkx
+    import networkx as nx
+
+
+class DirectedGraph:
+    """Arcos tail[e] -> head[e] com peso w[e] e tabela de rótulos."""
+
+    __slots__ = ("labels", "tail", "head", "w")
+
+    def __init__(self, labels: Sequence, tail: np.ndarray, head: np.ndarray, w: np.ndarray):
+        self.labels = labels
+        self.tail = tail
+        self.head = head
+        self.w = w
+
+    @property
+    def n(self) -> int:
+        return len(self.labels)
+
+    @property
+    def m(self) -> int:
+        return len(self.tail)
+
+    @classmethod
+    def from_edges(cls, arcs: Iterable[Tuple[str, str, float]]) -> "DirectedGraph":
+        # Arcos repetidos (u,v) mantêm o último peso; nós na ordem de
+        # primeira aparição (como CSRGraph.from_edges, mas com sentido).
+        index = {}
+        labels: List[str] = []
+        ids: List[int] = []
+        ws: List[float] = []
+        for u, v, w in arcs:
+            w = float(w)
+            if not (w >= 0) or math.isnan(w):
+                raise ValueError(f"Peso inválido em ({u},{v},{w})")
+            for x in (str(u), str(v)):
+                if x not in index:
+                    index[x] = len(labels)
+                    labels.append(x)
+                ids.append(index[x])
+            ws.append(w)
+        uv = np.asarray(ids, dtype=np.int64).reshape(-1, 2)
+        return cls.from_arrays(labels, uv[:, 0], uv[:, 1], np.asarray(ws, dtype=np.float64))
+
+    @classmethod
+    def from_arrays(cls, labels: Sequence, tail: np.ndarray, head: np.ndarray, w: np.ndarray) -> "DirectedGraph":
+        # Arcos repetidos mantêm a posição da primeira ocorrência e o peso da
+        # última (pesos já validados).
+        n = max(len(labels), 1)
+        tail = np.asarray(tail, dtype=np.int64)
+        head = np.asarray(head, dtype=np.int64)
+        w = np.asarray(w, dtype=np.float64)
+        key = tail * n + head
+        order = np.argsort(key, kind="stable")
+        sk = key[order]
+        starts = np.flatnonzero(np.r_[True, sk[1:] != sk[:-1]])
+        ends = np.r_[starts[1:], len(sk)] - 1
+        first, last = order[starts], order[ends]
+        keep = np.argsort(first, kind="stable")
+        first, last = first[keep], last[keep]
+        return cls(labels, tail[first].astype(np.int32), head[first].astype(np.int32), w[last].copy())
+
+    @classmethod
+    def from_networkx(cls, D) -> "DirectedGraph":
+        return cls.from_edges((u, v, d.get("weight", 1.0)) for u, v, d in D.edges(data=True))
+
+
+def solve_cpp_directed(G: Union[nx.DiGraph, DirectedGraph], profile=None) -> Tuple[float, List[str]]:
+    # Aceita DirectedGraph ou nx.DiGraph (convertido uma vez). Devolve
+    # (custo, tour) com o tour começando no primeiro vértice com arcos.
+    # profile (pcc.profiling.SolveStats) como em solve_cpp_undirected.
+    prof = profile if profile is not None else NO_STATS
+    g = G if isinstance(G, DirectedGraph) else DirectedGraph.from_networkx(G)
+    with prof.phase("connectivity"):
+        _assert_strongly_connected(g)
+    n = g.n
+    supply = (np.bincount(g.head, minlength=n) - np.bincount(g.tail, minlength=n)).astype(np.int64)
+    prof.set("n", n)
+    prof.set("m", g.m)
+    prof.set("k", int(np.count_nonzero(supply)))
+    with prof.phase("flow"):
+        if supply.any():
+            extra = min_cost_flow(n, g.tail, g.head, g.w, supply)
+        else:
+            extra = np.zeros(g.m, dtype=np.int64)
+    mult = extra + 1
+    cost = float(np.dot(mult, g.w))
+    prof.set("multigraph_edges", int(mult.sum()))
+    with prof.phase("euler"):
+        circuit = hierholzer_directed(n, g.tail.tolist(), g.head.tolist(), mult=memoryview(mult))
+    labels = g.labels
+    return cost, [labels[x] for x in circuit]
+
+
+def _assert_strongly_connected(g: DirectedGraph) -> None:
+    n = g.n
+    active = np.flatnonzero((np.bincount(g.tail, minlength=n) + np.bincount(g.head, minlength=n)) > 0)
+    if active.size == 0:
+        return
+    start = int(active[0])
+    for a, b in ((g.tail, g.head), (g.head, g.tail)):
+        order = np.argsort(a, kind="stable")
+        off = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(a, minlength=n), out=off[1:])
+        off_l = off.tolist()
+        nbr = b[order].tolist()
+        seen = bytearray(n)
+        seen[start] = 1
+        stack = [start]
+        count = 1
+        while stack:
+            u = stack.pop()
+            for v in nbr[off_l[u]:off_l[u + 1]]:
+                if not seen[v]:
+                    seen[v] = 1
+                    count += 1
+                    stack.append(v)
+        if count != active.size:
+            raise ValueError("O grafo dirigido não é fortemente conexo (ignorando vértices isolados).")
@@ -0,0 +1,185 @@
+"""
+Circuito euleriano (Hierholzer iterativo) sobre arrays de ids de arestas.
+
+Compartilhado pelo pacote (pcc.chinese_postman) e pelo script didático
+cpp_solver.py; usa apenas a biblioteca padrão. Cada aresta e = (eu[e], ev[e])
+entra na lista de incidência dos dois extremos; um contador de cópias restantes
+por aresta e um cursor por vértice garantem que cada entrada é examinada uma
+única vez, sem remover nada das listas: tempo O(n + M) e memória O(n + m),
+onde M é o total de cópias. hierholzer_directed é a variante para multigrafos
+dirigidos (pcc.directed): cada arco só entra na lista de saída da cauda.
+
+Com `mult`, a aresta e vale mult[e] >= 1 cópias paralelas: o grafo aumentado
+do CPP é o grafo original mais um vetor de multiplicidades, sem materializar
+as cópias.
+"""
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+
+
+def build_incidence(n: int, eu: Sequence[int], ev: Sequence[int]) -> Tuple[List[int], List[int]]:
+    """Lista de incidência em CSR (counting sort): (offsets, ids de arestas)."""
+    deg = [0] * (n + 1)
+    for a in eu:
+        deg[a + 1] += 1
+    for b in ev:
+        deg[b + 1] += 1
+    for x in range(n):
+        deg[x + 1] += deg[x]
+    offsets = deg
+    fill = offsets[:-1]
+    inc = [0] * offsets[n]
+    for e, (a, b) in enumerate(zip(eu, ev)):
+        inc[fill[a]] = e
+        fill[a] += 1
+        inc[fill[b]] = e
+        fill[b] += 1
+    return offsets, inc
+
+
+def hierholzer(
+    n: int,
+    eu: Sequence[int],
+    ev: Sequence[int],
+    start: Optional[int] = None,
+    incidence: Optional[Tuple[Sequence[int], Sequence[int]]] = None,
+    edges_out: Optional[List[int]] = None,
+    mult: Optional[Sequence[int]] = None,
+) -> List[int]:
+    """
+    Sequência de vértices de um circuito euleriano do multigrafo (eu, ev).
+    `incidence` permite reaproveitar uma lista (offsets, ids) já construída.
+    Se `edges_out` é dada, recebe os ids das arestas do circuito, na ordem
+    (a i-ésima liga os vértices i e i+1; útil com arestas paralelas); uma
+    aresta com mult[e] cópias aparece mult[e] vezes.
+    Levanta ValueError se algum grau é ímpar ou as arestas não são conexas.
+    """
+    m = len(eu)
+    if m == 0:
+        return []
+    offsets, inc = incidence if incidence is not None else build_incidence(n, eu, ev)
+    if mult is None:
+        left = bytearray(b"\x01") * m
+        total = m
+    else:
+        # Contadores em bytes quando cabem (caso comum: poucas cópias).
+        left = list(mult)
+        total = sum(left)
+        if max(left) < 256:
+            left = bytearray(left)
+        # Paridade do grau com multiplicidades (laços somam 2 e se anulam).
+        odd = bytearray(n)
+        for e, k in enumerate(left):
+            if k & 1:
+                odd[eu[e]] ^= 1
+                odd[ev[e]] ^= 1
+        if any(odd):
+            raise ValueError("O multigrafo não é euleriano após duplicação de arestas.")
+    cursor = [0] * n
+    for x in range(n):
+        c, stop = offsets[x], offsets[x + 1]
+        if mult is None and (stop - c) % 2 == 1:
+            raise ValueError("O multigrafo não é euleriano após duplicação de arestas.")
+        cursor[x] = c
+        if start is None and stop > c:
+            start = x
+    stack = [start]
+    # Aresta pela qual cada vértice da pilha foi alcançado: ao desempilhar v,
+    # ela liga v ao próximo vértice desempilhado.
+    via = [-1] if edges_out is not None else None
+    circuit: List[int] = []
+    while stack:
+        u = stack[-1]
+        c, stop = cursor[u], offsets[u + 1]
+        while c < stop and not left[inc[c]]:
+            c += 1
+        cursor[u] = c
+        if c == stop:
+            circuit.append(stack.pop())
+            if via is not None:
+                edges_out.append(via.pop())
+            continue
+        # O cursor só passa da entrada quando a última cópia é usada.
+        e = inc[c]
+        left[e] -= 1
+        a = eu[e]
+        stack.append(ev[e] if a == u else a)
+        if via is not None:
+            via.append(e)
+    if len(circuit) != total + 1:
+        raise ValueError("O multigrafo não é euleriano após duplicação de arestas.")
+    circuit.reverse()
+    if edges_out is not None:
+        edges_out.pop()          # -1 do vértice inicial
+        edges_out.reverse()
+    return circuit
+
+
+def hierholzer_directed(
+    n: int,
+    tail: Sequence[int],
+    head: Sequence[int],
+    start: Optional[int] = None,
+    edges_out: Optional[List[int]] = None,
+    mult: Optional[Sequence[int]] = None,
+) -> List[int]:
+    """
+    Circuito euleriano do multigrafo dirigido (tail[e] -> head[e]), com a
+    mesma interface de hierholzer (inclusive `mult`). Levanta ValueError se
+    algum vértice tem grau de entrada diferente do de saída ou os arcos não
+    são conexos.
+    """
+    m = len(tail)
+    if m == 0:
+        return []
+    offsets = [0] * (n + 1)
+    for a in tail:
+        offsets[a + 1] += 1
+    for x in range(n):
+        offsets[x + 1] += offsets[x]
+    fill = offsets[:-1]
+    out = [0] * m
+    for e, a in enumerate(tail):
+        out[fill[a]] = e
+        fill[a] += 1
+    left = bytearray(b"\x01") * m if mult is None else list(mult)
+    total = sum(left)
+    if mult is not None and max(left) < 256:
+        left = bytearray(left)
+    # Saldo saída - entrada, contando as cópias de cada arco.
+    bal = [0] * n
+    for e, a in enumerate(tail):
+        bal[a] += left[e]
+    for e, b in enumerate(head):
+        bal[b] -= left[e]
+    for x in range(n):
+        if bal[x]:
+            raise ValueError("O multigrafo dirigido não é euleriano após o balanceamento.")
+        if start is None and offsets[x + 1] > offsets[x]:
+            start = x
+    cursor = offsets[:-1]
+    stack = [start]
+    via = [-1] if edges_out is not None else None
+    circuit: List[int] = []
+    while stack:
+        u = stack[-1]
+        c = cursor[u]
+        if c == offsets[u + 1]:
+            circuit.append(stack.pop())
+            if via is not None:
+                edges_out.append(via.pop())
+            continue
+        e = out[c]
+        left[e] -= 1
+        if not left[e]:
+            cursor[u] = c + 1
+        stack.append(head[e])
+        if via is not None:
+            via.append(e)
+    if len(circuit) != total + 1:
+        raise ValueError("O multigrafo dirigido não é euleriano após o balanceamento.")
+    circuit.reverse()
+    if edges_out is not None:
+        edges_out.pop()
+        edges_out.reverse()
+    return circuit
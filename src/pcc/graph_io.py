@@ -1,35 +1,263 @@
 """
-Leitura de CSV (u,v,w) e construção do grafo networkx.
+Leitura de CSV (u,v,w) e construção do grafo (CSR compacto ou networkx).
+
+O CSV é lido em blocos de linhas com csv.reader (sem um dict por linha); os
+pesos de cada bloco são convertidos e validados de uma vez com NumPy e os
+rótulos são internados em ids inteiros. Em caso de erro, a mensagem aponta a
+primeira linha inválida, como na leitura linha a linha.
+
+Também lê/grava o formato binário .pccg (pcc.pccg) via mmap: os arrays do
+grafo são views diretas sobre as páginas do arquivo (zero cópia, páginas
+compartilhadas pelo cache do SO entre processos).
+
+Coluna opcional oneway (CPP dirigido, pcc.directed): vazio/0/no/false = mão
+dupla (dois arcos), 1/yes/true = só u -> v, -1/reverse = só v -> u (convenção
+do OSM). Sem directed=True a coluna é ignorada.
 """
 from __future__ import annotations
-from typing import List, Tuple
-import csv, os, math
-import networkx as nx
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+import csv, gc, mmap, os
+from contextlib import contextmanager
+from collections import defaultdict
+from itertools import count, islice
+from operator import itemgetter
+import numpy as np
 from .chinese_postman import build_graph_from_edges
+from .csr import CSRGraph
+from . import pccg
+
+if TYPE_CHECKING:  # só anotações: o caminho CSR não carrega networkx
+    import networkx as nx
+
+# Linhas de dados processadas por bloco.
+_CHUNK_ROWS = 1 << 16
+# Valores aceitos na coluna oneway -> sentido (0 = mão dupla, 1 = u->v, -1 = v->u).
+_ONEWAY = {"": 0, "0": 0, "no": 0, "false": 0, "não": 0, "nao": 0,
+           "1": 1, "yes": 1, "true": 1, "sim": 1, "-1": -1, "reverse": -1}
+
+@contextmanager
+def _gc_paused():
+    # Carga em massa cria milhões de objetos de vida longa; o coletor cíclico
+    # só os percorreria à toa (nenhum ciclo é criado aqui).
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
-def read_csv_edges(path: str) -> List[Tuple[str, str, float]]:
+def _iter_edge_chunks(path: str, chunk_rows: int = _CHUNK_ROWS, oneway: bool = False) -> Iterator[Tuple]:
+    # Gera (us, vs, ws) por bloco, já validados; com oneway=True, (us, vs,
+    # ws, sentidos int8) (sentido 0 para todas se o CSV não tem a coluna).
     if not os.path.exists(path):
         raise FileNotFoundError(f"Arquivo não encontrado: {path}")
-    edges: List[Tuple[str, str, float]] = []
-    with open(path, "r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        req = {"u", "v", "w"}
-        if r.fieldnames is None or not req.issubset({h.strip() for h in r.fieldnames}):
-            raise ValueError(f"CSV deve conter cabeçalho u,v,w. Encontrado: {r.fieldnames}")
-        for i, row in enumerate(r, start=2):
-            u = str(row["u"]).strip()
-            v = str(row["v"]).strip()
-            w_str = str(row["w"]).strip()
-            if not u or not v:
-                raise ValueError(f"Linha {i}: vértices vazios.")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        r = csv.reader(f)
+        header = next(r, None)
+        names = [h.strip() for h in header] if header is not None else []
+        if header is None or not {"u", "v", "w"}.issubset(names):
+            raise ValueError(f"CSV deve conter cabeçalho u,v,w. Encontrado: {header}")
+        cols = (names.index("u"), names.index("v"), names.index("w"))
+        io = names.index("oneway") if oneway and "oneway" in names else None
+        line = 2  # número (1-based, contando o cabeçalho) da próxima linha de dados
+        while True:
+            rows = list(islice(r, chunk_rows))
+            if not rows:
+                return
+            # Linhas vazias são ignoradas (e não contam), como no DictReader.
+            rows = [row for row in rows if row]
+            if rows:
+                parsed = _parse_edge_rows(rows, line, cols)
+                if oneway:
+                    parsed += (_parse_oneway(rows, line, io),)
+                yield parsed
+                line += len(rows)
+
+def _parse_edge_rows(rows: List[List[str]], line0: int, cols: Tuple[int, int, int]):
+    iu, iv, iw = cols
+    width = max(cols) + 1
+    if min(map(len, rows)) < width:
+        # Campos ausentes valem "None", como no DictReader.
+        rows = [row + ["None"] * (width - len(row)) if len(row) < width else row for row in rows]
+    strip = str.strip
+    us = list(map(strip, map(itemgetter(iu), rows)))
+    vs = list(map(strip, map(itemgetter(iv), rows)))
+    w_strs = list(map(strip, map(itemgetter(iw), rows)))
+    errors: List[Tuple[int, str]] = []
+    limit = len(rows)
+    if "" in us or "" in vs:
+        limit = next(i for i, (u, v) in enumerate(zip(us, vs)) if not u or not v)
+        errors.append((limit, f"Linha {line0 + limit}: vértices vazios."))
+    try:
+        ws = np.asarray(w_strs[:limit], dtype=np.float64)
+    except ValueError:
+        # Caminho lento só no bloco com problema: float() define o que é válido.
+        vals: List[float] = []
+        for i, x in enumerate(w_strs[:limit]):
             try:
-                w = float(w_str)
-            except Exception:
-                raise ValueError(f"Linha {i}: peso inválido '{w_str}'.")
-            if math.isnan(w) or w < 0:
-                raise ValueError(f"Linha {i}: peso inválido '{w_str}'. Deve ser >= 0.")
-            edges.append((u, v, w))
+                vals.append(float(x))
+            except ValueError:
+                errors.append((i, f"Linha {line0 + i}: peso inválido '{x}'."))
+                break
+        ws = np.asarray(vals, dtype=np.float64)
+    invalid = np.flatnonzero(np.isnan(ws) | (ws < 0))
+    if invalid.size:
+        i = int(invalid[0])
+        errors.append((i, f"Linha {line0 + i}: peso inválido '{w_strs[i]}'. Deve ser >= 0."))
+    if errors:
+        raise ValueError(min(errors)[1])
+    return us, vs, ws
+
+def _parse_oneway(rows: List[List[str]], line0: int, io: Optional[int]) -> np.ndarray:
+    if io is None:
+        return np.zeros(len(rows), dtype=np.int8)
+    vals = [row[io].strip().lower() if len(row) > io else "" for row in rows]
+    try:
+        return np.fromiter(map(_ONEWAY.__getitem__, vals), dtype=np.int8, count=len(vals))
+    except KeyError:
+        i = next(i for i, x in enumerate(vals) if x not in _ONEWAY)
+        raise ValueError(f"Linha {line0 + i}: valor de oneway inválido '{rows[i][io]}'.") from None
+
+def read_csv_edges(path: str, directed: bool = False) -> List[Tuple[str, str, float]]:
+    # directed=True devolve arcos (u, v, w) segundo a coluna oneway: linhas
+    # de mão dupla viram (u, v, w) e (v, u, w).
+    edges: List[Tuple[str, str, float]] = []
+    with _gc_paused():
+        if not directed:
+            for us, vs, ws in _iter_edge_chunks(path):
+                edges.extend(zip(us, vs, ws.tolist()))
+            return edges
+        for us, vs, ws, dirs in _iter_edge_chunks(path, oneway=True):
+            for u, v, w, d in zip(us, vs, ws.tolist(), dirs.tolist()):
+                if d >= 0:
+                    edges.append((u, v, w))
+                if d <= 0:
+                    edges.append((v, u, w))
     return edges
 
+def read_csv_edge_arrays(path: str) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """(rótulos, eu int32, ev int32, ew float64), rótulos na ordem de primeira aparição."""
+    # Internação em C: defaultdict cujo default é o próximo id livre, aplicado
+    # com map sobre (u1, v1, u2, v2, ...) de cada bloco.
+    index: Dict[str, int] = defaultdict(count().__next__)
+    intern = index.__getitem__
+    uv_parts: List[np.ndarray] = []
+    ew_parts: List[np.ndarray] = []
+    with _gc_paused():
+        for us, vs, ws in _iter_edge_chunks(path):
+            flat: List[str] = [""] * (2 * len(us))
+            flat[0::2] = us
+            flat[1::2] = vs
+            uv_parts.append(np.fromiter(map(intern, flat), dtype=np.int32, count=len(flat)))
+            ew_parts.append(ws)
+    labels = list(index)
+    if not uv_parts:
+        return labels, np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.float64)
+    uv = np.concatenate(uv_parts)
+    return labels, uv[0::2].copy(), uv[1::2].copy(), np.concatenate(ew_parts)
+
+def read_csv_arc_arrays(path: str) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (rótulos, tail int32, head int32, w float64) com a coluna oneway, na mesma
+    ordem de read_csv_edges(directed=True).
+    """
+    index: Dict[str, int] = defaultdict(count().__next__)
+    intern = index.__getitem__
+    parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    with _gc_paused():
+        for us, vs, ws, dirs in _iter_edge_chunks(path, oneway=True):
+            flat: List[str] = [""] * (2 * len(us))
+            flat[0::2] = us
+            flat[1::2] = vs
+            uv = np.fromiter(map(intern, flat), dtype=np.int32, count=len(flat)).reshape(-1, 2)
+            # Por linha: arco direto (sentido >= 0) e depois o reverso (<= 0).
+            tails = np.stack([uv[:, 0], uv[:, 1]], axis=1)
+            heads = np.stack([uv[:, 1], uv[:, 0]], axis=1)
+            keep = np.stack([dirs >= 0, dirs <= 0], axis=1)
+            parts.append((tails[keep], heads[keep], np.repeat(ws, keep.sum(axis=1))))
+    labels = list(index)
+    if not parts:
+        return labels, np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.float64)
+    return (labels, np.concatenate([t for t, _, _ in parts]), np.concatenate([h for _, h, _ in parts]),
+            np.concatenate([w for _, _, w in parts]))
+
+def read_nodes_csv(path: str) -> Dict[str, Tuple[float, float]]:
+    """CSV de nós id,lat,lon -> {id: (lat, lon)}; linhas com campo vazio são ignoradas."""
+    out: Dict[str, Tuple[float, float]] = {}
+    with open(path, "r", encoding="utf-8", newline="") as f, _gc_paused():
+        r = csv.reader(f)
+        header = next(r, None)
+        if header is None:
+            return out
+        try:
+            ii, ilat, ilon = header.index("id"), header.index("lat"), header.index("lon")
+        except ValueError:
+            return out
+        width = max(ii, ilat, ilon) + 1
+        while True:
+            rows = [row for _, row in zip(range(_CHUNK_ROWS), r)]
+            if not rows:
+                break
+            keep = [row for row in rows if len(row) >= width and row[ii] and row[ilat] and row[ilon]]
+            lat = np.asarray([row[ilat] for row in keep], dtype=np.float64)
+            lon = np.asarray([row[ilon] for row in keep], dtype=np.float64)
+            out.update(zip((row[ii] for row in keep), zip(lat.tolist(), lon.tolist())))
+    return out
+
 def load_graph_from_csv(path: str) -> nx.Graph:
-    return build_graph_from_edges(read_csv_edges(path))
\ No newline at end of file
+    return build_graph_from_edges(read_csv_edges(path))
+
+def load_csr_graph_from_csv(path: str) -> CSRGraph:
+    labels, eu, ev, ew = read_csv_edge_arrays(path)
+    return CSRGraph.from_arrays(labels, eu, ev, ew)
+
+def load_directed_graph_from_csv(path: str):
+    """DirectedGraph (pcc.directed) a partir de CSV u,v,w[,oneway]."""
+    from .directed import DirectedGraph
+    return DirectedGraph.from_arrays(*read_csv_arc_arrays(path))
+
+def load_csr_graph_from_pccg(path: str) -> CSRGraph:
+    mm, flags, n, m, layout = _map_pccg(path)
+    arr = {s: _section(mm, layout, s) for s in pccg.DTYPES}
+    off, size = layout["label_blob"]
+    labels = pccg.LabelTable(arr["label_off"], memoryview(mm)[off:off + size])
+    g = CSRGraph(labels, arr["eu"], arr["ev"], arr["ew"],
+                 arr["offsets"], arr["targets"], arr["weights"], arr["edge_ids"])
+    g.source = path
+    return g
+
+def read_pccg_nodes(path: str) -> Dict[str, Tuple[float, float]]:
+    """Coordenadas embutidas no .pccg ({} se o arquivo não tem lat/lon)."""
+    mm, flags, n, m, layout = _map_pccg(path)
+    if not flags & pccg.FLAG_COORDS:
+        return {}
+    lat, lon = _section(mm, layout, "lat"), _section(mm, layout, "lon")
+    ok = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+    off, size = layout["label_blob"]
+    labels = pccg.LabelTable(_section(mm, layout, "label_off"), memoryview(mm)[off:off + size])
+    names = list(labels)
+    return {names[i]: (la, lo) for i, la, lo in zip(ok.tolist(), lat[ok].tolist(), lon[ok].tolist())}
+
+def save_pccg(path: str, g: CSRGraph, coords: Optional[Dict[str, Tuple[float, float]]] = None) -> None:
+    pccg.write_pccg(path, g.labels, g.eu, g.ev, g.ew, coords,
+                    csr=(g.offsets, g.targets, g.weights, g.edge_ids))
+
+def load_csr_graph(path: str) -> CSRGraph:
+    """CSR a partir de .pccg (mmap) ou de CSV u,v,w, pela extensão."""
+    if path.lower().endswith(".pccg"):
+        return load_csr_graph_from_pccg(path)
+    return load_csr_graph_from_csv(path)
+
+def _map_pccg(path: str):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    flags, n, m, layout = pccg.read_layout(mm)
+    return mm, flags, n, m, layout
+
+def _section(mm, layout, name: str) -> np.ndarray:
+    off, size = layout[name]
+    dt = np.dtype(pccg.DTYPES[name][1])
+    return np.frombuffer(mm, dtype=dt, count=size // dt.itemsize, offset=off)
@@ -0,0 +1,468 @@
+"""
+Emparelhamento perfeito de custo mínimo via algoritmo de blossom de Edmonds.
+
+Implementação primal-dual O(n^3) (variante de Galil / van Rantwijk): rótulos
+S/T, contração e expansão de blossoms e atualização das variáveis duais.
+Trabalha sobre índices inteiros 0..n-1, de modo que roda diretamente sobre a
+matriz de distâncias entre vértices ímpares produzida pelo solver.
+
+Convenções internas (como no artigo original):
+- as variáveis duais e as folgas são mantidas multiplicadas por 2;
+- cada aresta k tem dois "endpoints" 2k e 2k+1 (endpoint[p] = vértice).
+"""
+from __future__ import annotations
+from typing import List, Tuple, Sequence, Optional
+
+
+class BlossomResult:
+    """Resultado do blossom: pares (mate) e solução dual final (certificado)."""
+
+    __slots__ = ("mate", "dualvar", "blossomparent", "nvertex")
+
+    def __init__(self, mate: List[int], dualvar: List[float], blossomparent: List[int], nvertex: int):
+        self.mate = mate                      # mate[v] = vértice parceiro ou -1
+        self.dualvar = dualvar                # 2*y_v (vértices) e z_B (blossoms), sem offset
+        self.blossomparent = blossomparent    # hierarquia de blossoms remanescentes
+        self.nvertex = nvertex
+
+    def blossom_chain(self, v: int) -> List[int]:
+        """Blossoms (não triviais) que contêm v, do mais externo para o mais interno."""
+        chain: List[int] = []
+        b = self.blossomparent[v]
+        while b != -1:
+            chain.append(b)
+            b = self.blossomparent[b]
+        chain.reverse()
+        return chain
+
+    def reduced_slack(self, i: int, j: int, wt: float) -> float:
+        """Folga (x2) da restrição dual do par (i, j) com peso wt; >= 0 se viável."""
+        s = self.dualvar[i] + self.dualvar[j] - 2 * wt
+        for bi, bj in zip(self.blossom_chain(i), self.blossom_chain(j)):
+            if bi != bj:
+                break
+            s += 2 * self.dualvar[bi]
+        return s
+
+
+def max_weight_matching(
+    nvertex: int,
+    edges: Sequence[Tuple[int, int, float]],
+    maxcardinality: bool = False,
+) -> BlossomResult:
+    """
+    Emparelhamento de peso máximo em grafo geral (arestas (i, j, w), i != j).
+    Com maxcardinality=True, maximiza o peso entre os emparelhamentos de
+    cardinalidade máxima. Complexidade O(n^3).
+    """
+    nedge = len(edges)
+    mate = [-1] * nvertex
+    if nedge == 0 or nvertex == 0:
+        return BlossomResult(mate, [0.0] * (2 * nvertex), [-1] * (2 * nvertex), nvertex)
+
+    maxweight = max(0.0, max(float(w) for _, _, w in edges))
+    endpoint = [edges[p // 2][p % 2] for p in range(2 * nedge)]
+    neighbend: List[List[int]] = [[] for _ in range(nvertex)]
+    for k, (i, j, _) in enumerate(edges):
+        if i == j:
+            raise ValueError(f"Laço ({i},{j}) não é permitido no emparelhamento.")
+        neighbend[i].append(2 * k + 1)
+        neighbend[j].append(2 * k)
+
+    # mate[v]: endpoint remoto da aresta emparelhada de v (durante o algoritmo)
+    label = [0] * (2 * nvertex)          # 0 livre, 1 S, 2 T (+4 = marcador em scan)
+    labelend = [-1] * (2 * nvertex)
+    inblossom = list(range(nvertex))
+    blossomparent = [-1] * (2 * nvertex)
+    blossomchilds: List[Optional[List[int]]] = [None] * (2 * nvertex)
+    blossombase = list(range(nvertex)) + [-1] * nvertex
+    blossomendps: List[Optional[List[int]]] = [None] * (2 * nvertex)
+    bestedge = [-1] * (2 * nvertex)
+    blossombestedges: List[Optional[List[int]]] = [None] * (2 * nvertex)
+    unusedblossoms = list(range(nvertex, 2 * nvertex))
+    dualvar = [maxweight] * nvertex + [0.0] * nvertex
+    allowedge = [False] * nedge
+    queue: List[int] = []
+
+    def slack(k: int) -> float:
+        i, j, wt = edges[k]
+        return dualvar[i] + dualvar[j] - 2 * wt
+
+    def blossom_leaves(b: int):
+        if b < nvertex:
+            yield b
+            return
+        stack = list(reversed(blossomchilds[b]))  # type: ignore[arg-type]
+        while stack:
+            t = stack.pop()
+            if t < nvertex:
+                yield t
+            else:
+                stack.extend(reversed(blossomchilds[t]))  # type: ignore[arg-type]
+
+    def assign_label(w: int, t: int, p: int) -> None:
+        while True:
+            b = inblossom[w]
+            label[w] = label[b] = t
+            labelend[w] = labelend[b] = p
+            bestedge[w] = bestedge[b] = -1
+            if t == 1:
+                queue.extend(blossom_leaves(b))
+                return
+            # b virou T: seu mate (pela base) recebe rótulo S
+            base = blossombase[b]
+            w, t, p = endpoint[mate[base]], 1, mate[base] ^ 1
+
+    def scan_blossom(v: int, w: int) -> int:
+        # Caminha para trás a partir de v e w deixando marcadores; devolve a
+        # base do novo blossom ou -1 se achou caminho aumentante.
+        path: List[int] = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                base = blossombase[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if labelend[b] == -1:
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                v = endpoint[labelend[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base: int, k: int) -> None:
+        v, w, _ = edges[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        b = unusedblossoms.pop()
+        blossombase[b] = base
+        blossomparent[b] = -1
+        blossomparent[bb] = b
+        path: List[int] = []
+        endps: List[int] = []
+        blossomchilds[b] = path
+        blossomendps[b] = endps
+        while bv != bb:
+            blossomparent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2 * k)
+        while bw != bb:
+            blossomparent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dualvar[b] = 0.0
+        for v in blossom_leaves(b):
+            if label[inblossom[v]] == 2:
+                # vértice T passa a S ao entrar num S-blossom
+                queue.append(v)
+            inblossom[v] = b
+        # arestas de menor folga do novo blossom para outros S-blossoms
+        bestedgeto = [-1] * (2 * nvertex)
+        for bv in path:
+            if blossombestedges[bv] is None:
+                nblists = [[p // 2 for p in neighbend[v]] for v in blossom_leaves(bv)]
+            else:
+                nblists = [blossombestedges[bv]]  # type: ignore[list-item]
+            for nblist in nblists:
+                for kk in nblist:
+                    i, j, _ = edges[kk]
+                    if inblossom[j] == b:
+                        i, j = j, i
+                    bj = inblossom[j]
+                    if bj != b and label[bj] == 1 and (
+                        bestedgeto[bj] == -1 or slack(kk) < slack(bestedgeto[bj])
+                    ):
+                        bestedgeto[bj] = kk
+            blossombestedges[bv] = None
+            bestedge[bv] = -1
+        blossombestedges[b] = [kk for kk in bestedgeto if kk != -1]
+        bestedge[b] = -1
+        for kk in blossombestedges[b]:  # type: ignore[union-attr]
+            if bestedge[b] == -1 or slack(kk) < slack(bestedge[b]):
+                bestedge[b] = kk
+
+    def expand_blossom(b: int, endstage: bool) -> None:
+        childs = blossomchilds[b]
+        assert childs is not None
+        for s in childs:
+            blossomparent[s] = -1
+            if s < nvertex:
+                inblossom[s] = s
+            elif endstage and dualvar[s] == 0:
+                expand_blossom(s, endstage)
+            else:
+                for v in blossom_leaves(s):
+                    inblossom[v] = s
+        if not endstage and label[b] == 2:
+            # T-blossom expandido no meio de um estágio: re-rotular sub-blossoms
+            endps = blossomendps[b]
+            assert endps is not None
+            entrychild = inblossom[endpoint[labelend[b] ^ 1]]
+            j = childs.index(entrychild)
+            if j & 1:
+                j -= len(childs)
+                jstep, endptrick = 1, 0
+            else:
+                jstep, endptrick = -1, 1
+            p = labelend[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[endps[j - endptrick] ^ endptrick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowedge[endps[j - endptrick] // 2] = True
+                j += jstep
+                p = endps[j - endptrick] ^ endptrick
+                allowedge[p // 2] = True
+                j += jstep
+            bv = childs[j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            labelend[endpoint[p ^ 1]] = labelend[bv] = p
+            bestedge[bv] = -1
+            j += jstep
+            while childs[j] != entrychild:
+                bv = childs[j]
+                if label[bv] == 1:
+                    j += jstep
+                    continue
+                reached = -1
+                for v in blossom_leaves(bv):
+                    if label[v] != 0:
+                        reached = v
+                        break
+                if reached != -1:
+                    label[reached] = 0
+                    label[endpoint[mate[blossombase[bv]]]] = 0
+                    assign_label(reached, 2, labelend[reached])
+                j += jstep
+        label[b] = labelend[b] = -1
+        blossomchilds[b] = blossomendps[b] = None
+        blossombase[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unusedblossoms.append(b)
+
+    def augment_blossom(b: int, v: int) -> None:
+        t = v
+        while blossomparent[t] != b:
+            t = blossomparent[t]
+        if t >= nvertex:
+            augment_blossom(t, v)
+        childs = blossomchilds[b]
+        endps = blossomendps[b]
+        assert childs is not None and endps is not None
+        i = j = childs.index(t)
+        if i & 1:
+            j -= len(childs)
+            jstep, endptrick = 1, 0
+        else:
+            jstep, endptrick = -1, 1
+        while j != 0:
+            j += jstep
+            t = childs[j]
+            p = endps[j - endptrick] ^ endptrick
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p])
+            j += jstep
+            t = childs[j]
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossomchilds[b] = childs[i:] + childs[:i]
+        blossomendps[b] = endps[i:] + endps[:i]
+        blossombase[b] = blossombase[blossomchilds[b][0]]  # type: ignore[index]
+
+    def augment_matching(k: int) -> None:
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= nvertex:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= nvertex:
+                    augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+    for _ in range(nvertex):
+        # Cada iteração é um "estágio": procura um caminho aumentante.
+        label[:] = [0] * (2 * nvertex)
+        bestedge[:] = [-1] * (2 * nvertex)
+        blossombestedges[nvertex:] = [None] * nvertex
+        allowedge[:] = [False] * nedge
+        queue[:] = []
+        for v in range(nvertex):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                assign_label(v, 1, -1)
+        augmented = False
+        while True:
+            # "Subestágio": rotula tudo o que for alcançável por arestas justas.
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbend[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue
+                    kslack = 0.0
+                    if not allowedge[k]:
+                        kslack = slack(k)
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < slack(bestedge[w]):
+                            bestedge[w] = k
+            if augmented:
+                break
+
+            # Sem caminho aumentante com as arestas justas: atualização dual.
+            deltatype = -1
+            delta = 0.0
+            deltaedge = deltablossom = -1
+            if not maxcardinality:
+                deltatype = 1
+                delta = min(dualvar[:nvertex])
+            for v in range(nvertex):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = slack(bestedge[v])
+                    if deltatype == -1 or d < delta:
+                        delta, deltatype, deltaedge = d, 2, bestedge[v]
+            for b in range(2 * nvertex):
+                if blossomparent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = slack(bestedge[b]) / 2
+                    if deltatype == -1 or d < delta:
+                        delta, deltatype, deltaedge = d, 3, bestedge[b]
+            for b in range(nvertex, 2 * nvertex):
+                if (blossombase[b] >= 0 and blossomparent[b] == -1 and label[b] == 2
+                        and (deltatype == -1 or dualvar[b] < delta)):
+                    delta, deltatype, deltablossom = dualvar[b], 4, b
+            if deltatype == -1:
+                # Ótimo de cardinalidade máxima: ajuste final verificável.
+                deltatype = 1
+                delta = max(0.0, min(dualvar[:nvertex]))
+
+            for v in range(nvertex):
+                lb = label[inblossom[v]]
+                if lb == 1:
+                    dualvar[v] -= delta
+                elif lb == 2:
+                    dualvar[v] += delta
+            for b in range(nvertex, 2 * nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1:
+                    if label[b] == 1:
+                        dualvar[b] += delta
+                    elif label[b] == 2:
+                        dualvar[b] -= delta
+
+            if deltatype == 1:
+                break
+            elif deltatype == 2:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif deltatype == 3:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                queue.append(i)
+            else:
+                expand_blossom(deltablossom, False)
+
+        if not augmented:
+            break
+        # Fim do estágio: expande S-blossoms de topo com dual zero.
+        for b in range(nvertex, 2 * nvertex):
+            if (blossomparent[b] == -1 and blossombase[b] >= 0
+                    and label[b] == 1 and dualvar[b] == 0):
+                expand_blossom(b, True)
+
+    mate_v = [endpoint[m] if m >= 0 else -1 for m in mate]
+    return BlossomResult(mate_v, dualvar, blossomparent, nvertex)
+
+
+def minimum_weight_perfect_matching(
+    dist_mat: Sequence[Sequence[float]],
+) -> Tuple[List[Tuple[int, int]], float]:
+    """
+    Emparelhamento perfeito mínimo sobre a matriz simétrica dist_mat (k x k).
+    Devolve (pares (i, j) com i < j, custo). Reduz a peso máximo com
+    cardinalidade máxima usando pesos C - d (todos positivos).
+    """
+    k = len(dist_mat)
+    if k % 2 != 0:
+        raise ValueError("Quantidade de vértices ímpares deve ser par.")
+    if k == 0:
+        return [], 0.0
+    edges: List[Tuple[int, int, float]] = []
+    dmax = 0.0
+    for i in range(k):
+        row = dist_mat[i]
+        for j in range(i + 1, k):
+            d = float(row[j])
+            if d > dmax:
+                dmax = d
+    C = dmax + 1.0
+    for i in range(k):
+        row = dist_mat[i]
+        for j in range(i + 1, k):
+            edges.append((i, j, C - float(row[j])))
+    res = max_weight_matching(k, edges, maxcardinality=True)
+    return _pairs_from_mate(res.mate, dist_mat)
+
+
+def _pairs_from_mate(
+    mate: List[int], dist_mat: Sequence[Sequence[float]]
+) -> Tuple[List[Tuple[int, int]], float]:
+    pairs: List[Tuple[int, int]] = []
+    cost = 0.0
+    for i, j in enumerate(mate):
+        if j == -1:
+            raise ValueError("Não existe emparelhamento perfeito entre os vértices ímpares.")
+        if i < j:
+            pairs.append((i, j))
+            cost += float(dist_mat[i][j])
+    return pairs, cost
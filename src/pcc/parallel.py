@@ -0,0 +1,157 @@
+"""
+Fase de caminhos mínimos em paralelo (pool de processos).
+
+Os arrays CSR do grafo e as saídas (matriz de distâncias k x k e árvores de
+predecessores k x n) ficam em blocos de multiprocessing.shared_memory (um
+grafo lido de .pccg é mapeado do próprio arquivo pelos workers): cada
+worker se anexa uma única vez no initializer e as tarefas são apenas o índice
+i do vértice ímpar de origem, de modo que nada é serializado por tarefa.
+
+Também resolve componentes conexas independentes em paralelo (uma tarefa por
+componente, cada uma com seu subgrafo CSR).
+"""
+from __future__ import annotations
+from typing import List, Tuple, Dict, Optional
+from multiprocessing import shared_memory
+import multiprocessing as mp
+import numpy as np
+
+from .csr import CSRGraph
+
+# Estado do worker (preenchido pelo initializer; vive enquanto o processo vive).
+_W: Dict[str, object] = {}
+
+
+class SharedArrays:
+    """Conjunto de arrays NumPy alocados em memória compartilhada (lado do pai)."""
+
+    def __init__(self):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.specs: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+
+    def add(self, name: str, shape: Tuple[int, ...], dtype, fill=None, src: Optional[np.ndarray] = None) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._blocks.append(shm)
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        if src is not None:
+            arr[...] = src
+        elif fill is not None:
+            arr.fill(fill)
+        self.specs[name] = (shm.name, tuple(shape), dtype.str)
+        self.arrays[name] = arr
+        return arr
+
+    def close(self) -> None:
+        self.arrays.clear()
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks.clear()
+
+
+def attach_shared(specs: Dict[str, Tuple[str, Tuple[int, ...], str]]) -> Dict[str, np.ndarray]:
+    """Anexa (no worker) os blocos descritos por specs; mantém referências vivas."""
+    blocks = _W.setdefault("_blocks", [])
+    out: Dict[str, np.ndarray] = {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)  # type: ignore[union-attr]
+        out[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return out
+
+
+def _init_sssp_worker(specs, sources: List[int], pccg_path: Optional[str] = None) -> None:
+    arrays = attach_shared(specs)
+    if pccg_path:
+        # Grafo vindo de .pccg: cada worker mapeia o mesmo arquivo (páginas
+        # compartilhadas pelo SO) em vez de receber uma cópia do CSR.
+        from .graph_io import load_csr_graph_from_pccg
+        g = load_csr_graph_from_pccg(pccg_path)
+        arrays.update(offsets=g.offsets, targets=g.targets, weights=g.weights, edge_ids=g.edge_ids)
+    _W["arrays"] = arrays
+    _W["sources"] = sources
+
+
+def _sssp_task(i: int) -> Tuple[Optional[Tuple[int, int]], int]:
+    from .chinese_postman import _sssp_row
+    a = _W["arrays"]
+    pushes = [0]
+    failed = _sssp_row(a["offsets"], a["targets"], a["weights"], a["edge_ids"],  # type: ignore[index]
+                       _W["sources"], i, a["dist"][i], a["pred"][i], pushes)  # type: ignore[arg-type,index]
+    return failed, pushes[0]
+
+
+def parallel_shortest_paths(
+    g: CSRGraph, sources: List[int], workers: int, counter: Optional[List[int]] = None
+) -> Tuple[np.ndarray, np.ndarray, Optional[Tuple[int, int]]]:
+    """
+    Executa as k buscas direcionadas (triângulo superior) em `workers`
+    processos. Devolve (dist_mat simétrica, pred (k, n) int32, falha) onde
+    falha é (fonte, alvo) do primeiro par inalcançável ou None; counter[0],
+    se dado, soma os pushes no heap de todas as buscas.
+    """
+    k = len(sources)
+    sh = SharedArrays()
+    try:
+        if not g.source:
+            sh.add("offsets", g.offsets.shape, g.offsets.dtype, src=g.offsets)
+            sh.add("targets", g.targets.shape, g.targets.dtype, src=g.targets)
+            sh.add("weights", g.weights.shape, g.weights.dtype, src=g.weights)
+            sh.add("edge_ids", g.edge_ids.shape, g.edge_ids.dtype, src=g.edge_ids)
+        dist = sh.add("dist", (k, k), np.float64, fill=0.0)
+        pred = sh.add("pred", (k, g.n), np.int32, fill=-1)
+        # Fontes com índice baixo têm mais alvos: entram primeiro na fila.
+        chunk = max(1, (k - 1) // (workers * 8))
+        failed: Optional[Tuple[int, int]] = None
+        with mp.get_context().Pool(workers, initializer=_init_sssp_worker,
+                                    initargs=(sh.specs, sources, g.source)) as pool:
+            for res, pushes in pool.imap_unordered(_sssp_task, range(k - 1), chunksize=chunk):
+                if res is not None and failed is None:
+                    failed = res
+                if counter is not None:
+                    counter[0] += pushes
+        dist_mat = np.triu(dist) + np.triu(dist, 1).T
+        pred_out = pred.copy()
+    finally:
+        sh.close()
+    return dist_mat, pred_out, failed
+
+
+def _solve_component_task(args) -> Tuple[float, List[str], Dict]:
+    from .chinese_postman import solve_cpp_undirected
+    sub, candidates, coords, cache, quality, time_limit = args
+    info: Dict = {}
+    cost, tour = solve_cpp_undirected(sub, candidates=candidates, coords=coords, cache=cache,
+                                      quality=quality, time_limit=time_limit, info=info)
+    return cost, tour, info
+
+
+def solve_components_parallel(
+    subs: List[CSRGraph],
+    workers: int,
+    candidates: int = 0,
+    coords: Optional[Dict[str, Tuple[float, float]]] = None,
+    cache=None,
+    quality: str = "exact",
+    time_limit: Optional[float] = None,
+) -> List[Tuple[float, List[str], Dict]]:
+    """
+    Resolve componentes independentes num pool; (custo, tour, info de
+    solve_cpp_undirected) na ordem de subs.
+    """
+    tasks = []
+    for sub in subs:
+        sub_coords = None
+        if coords:
+            sub_coords = {x: coords[x] for x in sub.labels if x in coords}
+        tasks.append((sub, candidates, sub_coords, cache, quality, time_limit))
+    # Maiores primeiro na fila (melhor balanceamento); ordem original na saída.
+    order = sorted(range(len(subs)), key=lambda c: -subs[c].m)
+    out: List[Optional[Tuple[float, List[str], Dict]]] = [None] * len(subs)
+    with mp.get_context().Pool(min(workers, len(subs))) as pool:
+        for c, res in zip(order, pool.imap(_solve_component_task, [tasks[c] for c in order])):
+            out[c] = res
+    return out  # type: ignore[return-value]
@@ -0,0 +1,193 @@
+"""
+Formato binário .pccg: grafo pronto para mmap (sem parse nem internação).
+
+Usa apenas a biblioteca padrão (o conversor tools/geojson_to_csv.py o importa
+sem numpy); a leitura com NumPy sobre mmap fica em pcc.graph_io. Layout
+little-endian, cada seção alinhada em 8 bytes:
+
+  cabeçalho  '<4sHHqq'  magic b"PCCG", versão, flags (bit 0: há lat/lon), n, m
+  índice     11 x (offset, nbytes) '<qq', na ordem de SECTIONS
+  label_off  int64[n+1]  deslocamentos de cada rótulo em label_blob
+  label_blob UTF-8 concatenado
+  lat, lon   float64[n]  (NaN onde não há coordenada)
+  eu, ev     int32[m]    extremos de cada aresta
+  ew         float64[m]  pesos
+  offsets    int64[n+1]  CSR (mesma convenção de pcc.csr)
+  targets    int32[2m]
+  weights    float64[2m]
+  edge_ids   int32[2m]
+"""
+from __future__ import annotations
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Optional, Tuple
+import math, os, struct, sys
+
+MAGIC = b"PCCG"
+VERSION = 1
+FLAG_COORDS = 1
+HEADER = struct.Struct("<4sHHqq")
+SECTIONS = ("label_off", "label_blob", "lat", "lon", "eu", "ev", "ew",
+            "offsets", "targets", "weights", "edge_ids")
+TOC = struct.Struct("<" + "qq" * len(SECTIONS))
+# Tipo (array/NumPy) de cada seção; label_blob é bytes.
+DTYPES = {"label_off": ("q", "<i8"), "lat": ("d", "<f8"), "lon": ("d", "<f8"),
+          "eu": ("i", "<i4"), "ev": ("i", "<i4"), "ew": ("d", "<f8"),
+          "offsets": ("q", "<i8"), "targets": ("i", "<i4"), "weights": ("d", "<f8"),
+          "edge_ids": ("i", "<i4")}
+
+
+def write_pccg(
+    path: str,
+    labels: Sequence,
+    eu: Sequence[int],
+    ev: Sequence[int],
+    ew: Sequence[float],
+    coords: Optional[Dict[str, Tuple[float, float]]] = None,
+    csr: Optional[Tuple] = None,
+) -> None:
+    """
+    Grava o grafo em .pccg. eu/ev/ew podem ser listas, array.array ou arrays
+    NumPy; csr = (offsets, targets, weights, edge_ids) evita recalcular o CSR.
+    coords: id -> (lat, lon) opcional. Escrita atômica (temporário + replace).
+    """
+    n, m = len(labels), len(eu)
+    names = [str(x).encode("utf-8") for x in labels]
+    label_off = array("q", [0]) * (n + 1)
+    for i, b in enumerate(names):
+        label_off[i + 1] = label_off[i] + len(b)
+    flags = 0
+    lat = array("d", [math.nan]) * n
+    lon = array("d", [math.nan]) * n
+    if coords:
+        flags |= FLAG_COORDS
+        for i, x in enumerate(labels):
+            c = coords.get(str(x))
+            if c is not None:
+                lat[i], lon[i] = float(c[0]), float(c[1])
+    if csr is None:
+        csr = _build_csr(n, _as_array(eu, "i"), _as_array(ev, "i"), _as_array(ew, "d"))
+    sections = {
+        "label_off": label_off, "label_blob": b"".join(names), "lat": lat, "lon": lon,
+        "eu": eu, "ev": ev, "ew": ew,
+        "offsets": csr[0], "targets": csr[1], "weights": csr[2], "edge_ids": csr[3],
+    }
+    blobs = [_to_bytes(sections[s], DTYPES[s][1] if s in DTYPES else None) for s in SECTIONS]
+    toc: List[int] = []
+    pos = _align(HEADER.size + TOC.size)
+    for b in blobs:
+        toc += [pos, len(b)]
+        pos = _align(pos + len(b))
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, n, m))
+        f.write(TOC.pack(*toc))
+        for (off, _), b in zip(zip(toc[0::2], toc[1::2]), blobs):
+            f.write(b"\0" * (off - f.tell()))
+            f.write(b)
+    os.replace(tmp, path)
+
+
+def read_layout(buf) -> Tuple[int, int, int, Dict[str, Tuple[int, int]]]:
+    """(flags, n, m, {seção: (offset, nbytes)}) de um buffer .pccg, validado."""
+    if len(buf) < HEADER.size + TOC.size:
+        raise ValueError("Arquivo .pccg truncado.")
+    magic, version, flags, n, m = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("Arquivo não é um grafo .pccg.")
+    if version != VERSION:
+        raise ValueError(f"Versão .pccg não suportada: {version}")
+    raw = TOC.unpack_from(buf, HEADER.size)
+    layout = {s: (raw[2 * i], raw[2 * i + 1]) for i, s in enumerate(SECTIONS)}
+    counts = {"label_off": n + 1, "lat": n, "lon": n, "eu": m, "ev": m, "ew": m,
+              "offsets": n + 1, "targets": 2 * m, "weights": 2 * m, "edge_ids": 2 * m}
+    for s, (off, size) in layout.items():
+        if off + size > len(buf) or (s in counts and size != counts[s] * struct.calcsize(DTYPES[s][0])):
+            raise ValueError(f"Arquivo .pccg corrompido (seção {s}).")
+    return flags, n, m, layout
+
+
+class LabelTable(Sequence):
+    """Rótulos decodificados sob demanda a partir de label_off/label_blob."""
+
+    __slots__ = ("_off", "_blob")
+
+    def __init__(self, off, blob):
+        self._off = off      # sequência int64 (n+1)
+        self._blob = blob    # bytes/memoryview
+
+    def __len__(self) -> int:
+        return len(self._off) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return bytes(self._blob[self._off[i]:self._off[i + 1]]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        off = list(self._off)
+        data = bytes(self._blob).decode("utf-8")
+        if len(data) == off[-1]:   # ASCII: deslocamentos em bytes == em caracteres
+            return (data[a:b] for a, b in zip(off, off[1:]))
+        raw = bytes(self._blob)
+        return (raw[a:b].decode("utf-8") for a, b in zip(off, off[1:]))
+
+    def __reduce__(self):
+        # Ao enviar para outro processo vira uma lista comum.
+        return (list, (list(self),))
+
+
+def _build_csr(n: int, eu: array, ev: array, ew: array):
+    # Mesma ordem de pcc.csr._build_csr (argsort estável de [eu, ev]).
+    m = len(eu)
+    offsets = array("q", [0]) * (n + 1)
+    for x in eu:
+        offsets[x + 1] += 1
+    for x in ev:
+        offsets[x + 1] += 1
+    for x in range(n):
+        offsets[x + 1] += offsets[x]
+    fill = array("q", offsets[:-1])
+    targets = array("i", [0]) * (2 * m)
+    weights = array("d", [0.0]) * (2 * m)
+    edge_ids = array("i", [0]) * (2 * m)
+    for side, other in ((eu, ev), (ev, eu)):
+        for e in range(m):
+            x = side[e]
+            p = fill[x]
+            targets[p] = other[e]
+            weights[p] = ew[e]
+            edge_ids[p] = e
+            fill[x] = p + 1
+    return offsets, targets, weights, edge_ids
+
+
+def _as_array(x, code: str) -> array:
+    if isinstance(x, array) and x.typecode == code:
+        return x
+    if hasattr(x, "tolist"):
+        x = x.tolist()
+    return array(code, x)
+
+
+def _to_bytes(x, dtype: Optional[str]) -> bytes:
+    if dtype is None:
+        return bytes(x)
+    if hasattr(x, "astype"):            # NumPy, sem importar numpy aqui
+        return x.astype(dtype, copy=False).tobytes()
+    a = _as_array(x, DTYPES_BY_NUMPY[dtype])
+    if sys.byteorder == "big":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+DTYPES_BY_NUMPY = {v[1]: v[0] for v in DTYPES.values()}
+
+
+def _align(x: int) -> int:
+    return (x + 7) & ~7
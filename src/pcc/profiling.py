@@ -0,0 +1,97 @@
+"""
+Instrumentação por fase do solver e do conversor (só biblioteca padrão).
+
+SolveStats acumula, por nome de fase, tempo de parede, número de entradas e
+pico de memória alocada acima do início da fase (tracemalloc, se memory=True),
+mais contadores de trabalho (k, pushes no heap, estados do DP, arestas do
+multigrafo, ...). Fases não devem ser aninhadas: cada uma zera o pico do
+tracemalloc ao começar. callback(nome, registro) é chamado ao fim de cada
+fase (gancho para coletores de métricas externos).
+
+Sem SolveStats, as funções usam NO_STATS, cujas operações não fazem nada.
+"""
+from __future__ import annotations
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Optional
+import json, sys, time, tracemalloc
+
+
+class SolveStats:
+    """Tempos, memória e contadores por fase; ver o docstring do módulo."""
+
+    def __init__(self, memory: bool = False, callback: Optional[Callable[[str, Dict], None]] = None):
+        self.memory = memory
+        self.callback = callback
+        self.phases: Dict[str, Dict] = {}
+        self.counters: Dict[str, float] = {}
+        self._started_tracing = False
+
+    def __enter__(self) -> "SolveStats":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Para o tracemalloc se foi esta instância que o iniciou."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name: str):
+        base = 0
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            dt = time.perf_counter() - t0
+            rec = self.phases.setdefault(name, {"wall_s": 0.0, "calls": 0})
+            rec["wall_s"] += dt
+            rec["calls"] += 1
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                rec["peak_bytes"] = max(rec.get("peak_bytes", 0), peak)
+            if self.callback is not None:
+                self.callback(name, dict(rec, last_s=dt))
+
+    def count(self, name: str, n: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name: str, value: float) -> None:
+        self.counters[name] = value
+
+    def as_dict(self) -> Dict:
+        return {"phases": self.phases, "counters": self.counters,
+                "total_s": sum(r["wall_s"] for r in self.phases.values())}
+
+    def write_json(self, path: Optional[str] = None) -> None:
+        """JSON em path (None ou '-' = stdout)."""
+        text = json.dumps(self.as_dict(), indent=2, ensure_ascii=False)
+        if path in (None, "-"):
+            print(text, file=sys.stdout)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+
+
+class _NoStats:
+    """Mesma interface de SolveStats, sem custo."""
+
+    def phase(self, name: str):
+        return nullcontext(self)
+
+    def count(self, name: str, n: float = 1) -> None:
+        pass
+
+    def set(self, name: str, value: float) -> None:
+        pass
+
+
+NO_STATS = _NoStats()
@@ -0,0 +1,288 @@
+"""
+Sessão de re-resolução incremental do CPP (alterações de peso, inserções e
+remoções de arestas, p.ex. interdição de ruas durante o dia).
+
+A sessão guarda, entre chamadas:
+- o grau de cada nó (o conjunto de ímpares muda só nos extremos tocados);
+- para cada ímpar s, a linha completa de Dijkstra: dist[s] (n float64) e a
+  árvore de predecessores pred[s] (n int32, ids estáveis de arestas);
+- o emparelhamento anterior e, no blossom, a solução dual (certificado).
+
+Uma atualização da aresta e = (u, v) só invalida as linhas que ela afeta:
+- peso menor / inserção: linha s afetada sse dist[s][u] + w < dist[s][v] (ou
+  o simétrico), i.e. a aresta relaxa algum nó;
+- peso maior / remoção: linha s afetada sse e está na árvore de s
+  (pred[s][u] == e ou pred[s][v] == e); caso contrário nenhum caminho mínimo
+  usa e e as distâncias não mudam.
+Ímpares novos ganham uma linha; ímpares que ficaram pares perdem a sua.
+
+No solve(), se as distâncias entre ímpares não mudaram o emparelhamento é
+reaproveitado; se mudaram, as duais do blossom anterior são testadas contra os
+novos pesos (viabilidade + folga zero nos pares emparelhados) e, se o
+certificado ainda vale, o emparelhamento anterior continua ótimo sem re-rodar
+o blossom. Memória: O(k·n) para as linhas.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+import math
+import numpy as np
+
+from .csr import CSRGraph
+from .matching import max_weight_matching
+from .chinese_postman import (
+    _DP_MAX_K, _assert_connected_ignoring_isolated, _edge_multiplicity, _eulerian_tour_vertices,
+    _minimum_weight_perfect_matching_dp, _targeted_dijkstra,
+)
+
+if TYPE_CHECKING:  # só anotações: o caminho CSR não carrega networkx
+    import networkx as nx
+
+
+class CPPSession:
+    """Estado do solver reaproveitado entre atualizações de arestas."""
+
+    def __init__(self, G: Union[nx.Graph, CSRGraph]):
+        g = G if isinstance(G, CSRGraph) else CSRGraph.from_networkx(G)
+        self.labels: List = list(g.labels)
+        self._index: Dict = {x: i for i, x in enumerate(self.labels)}
+        # Arestas com ids estáveis (removidas ficam com alive = 0).
+        self._eu: List[int] = g.eu.tolist()
+        self._ev: List[int] = g.ev.tolist()
+        self._ew: List[float] = g.ew.tolist()
+        self._alive = bytearray(b"\x01" * g.m)
+        self._slot: Dict[Tuple[int, int], int] = {}
+        for e, (a, b) in enumerate(zip(self._eu, self._ev)):
+            self._slot[(a, b) if a <= b else (b, a)] = e
+        self._deg: List[int] = g.degree().tolist()
+        self._rows: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._dirty: set = set()
+        self._csr: Optional[Tuple[CSRGraph, np.ndarray]] = None
+        self._last: Optional[Tuple] = None   # (odd, D, pares, blossom, C)
+        self.rows_recomputed = 0
+        self.matching_reused = False
+
+    # ------------------------------------------------------------------ API
+
+    @property
+    def graph(self) -> CSRGraph:
+        """Grafo atual (somente arestas vivas) em CSR."""
+        return self._current_csr()[0]
+
+    def set_weight(self, u, v, w: float) -> None:
+        """Altera o peso de uma aresta existente."""
+        e = self._edge(u, v)
+        if e is None:
+            raise ValueError(f"Aresta inexistente ({u},{v}).")
+        w = _check_weight(u, v, w)
+        old = self._ew[e]
+        if w == old:
+            return
+        self._ew[e] = w
+        self._csr = None
+        if w < old:
+            self._mark_relaxed(e)
+        else:
+            self._mark_tree_users(e)
+
+    def add_edge(self, u, v, w: float) -> None:
+        """Insere (u, v); se já existe, equivale a set_weight (último peso vale)."""
+        w = _check_weight(u, v, w)
+        if self._edge(u, v) is not None:
+            self.set_weight(u, v, w)
+            return
+        a, b = self._node(u), self._node(v)
+        key = (a, b) if a <= b else (b, a)
+        e = len(self._eu)
+        self._slot[key] = e
+        self._eu.append(a); self._ev.append(b); self._ew.append(w)
+        self._alive.append(1)
+        self._csr = None
+        self._mark_relaxed(e)
+        self._flip_degree(a, b)
+
+    def remove_edge(self, u, v) -> None:
+        """Remove (u, v) (p.ex. rua interditada)."""
+        e = self._edge(u, v)
+        if e is None:
+            raise ValueError(f"Aresta inexistente ({u},{v}).")
+        a, b = self._eu[e], self._ev[e]
+        del self._slot[(a, b) if a <= b else (b, a)]
+        self._alive[e] = 0
+        self._csr = None
+        self._mark_tree_users(e)
+        self._flip_degree(a, b, -1)
+
+    def solve(self) -> Tuple[float, List]:
+        """(custo, tour) do grafo atual, recalculando só o necessário."""
+        g, eids = self._current_csr()
+        _assert_connected_ignoring_isolated(g)
+        self.rows_recomputed = 0
+        self.matching_reused = False
+        odd = [x for x in range(len(self._deg)) if self._deg[x] % 2 == 1]
+        for x in list(self._rows):
+            if self._deg[x] % 2 == 0:
+                del self._rows[x]
+        for x in odd:
+            if x in self._dirty or x not in self._rows:
+                self._rows[x] = self._full_row(g, eids, x)
+                self.rows_recomputed += 1
+        self._dirty.clear()
+
+        base_cost = float(g.ew.sum())
+        if not odd:
+            self._last = None
+            return base_cost, _eulerian_tour_vertices(g)
+
+        idx = np.asarray(odd, dtype=np.int64)
+        D = np.stack([self._rows[x][0][idx] for x in odd])
+        if not np.isfinite(D).all():
+            i, j = map(int, np.argwhere(~np.isfinite(D))[0])
+            raise ValueError(
+                f"Vértice ímpar '{self.labels[odd[j]]}' é inalcançável a partir de '{self.labels[odd[i]]}'."
+            )
+        pairs = self._match(odd, D)
+        added = float(sum(D[i, j] for i, j in pairs))
+
+        extra: List[int] = []
+        for i, j in pairs:
+            extra.extend(self._path_edges(odd[i], odd[j]))
+        # Ids da sessão -> posições no CSR (arestas vivas, em ordem crescente).
+        alive = np.flatnonzero(np.frombuffer(bytes(self._alive), dtype=np.uint8))
+        ids = np.searchsorted(alive, np.asarray(extra, dtype=np.int64))
+        return base_cost + added, _eulerian_tour_vertices(g, _edge_multiplicity(g, ids))
+
+    # ------------------------------------------------------------ internos
+
+    def _node(self, label) -> int:
+        x = self._index.get(label)
+        if x is None:
+            x = self._index[label] = len(self.labels)
+            self.labels.append(label)
+            self._deg.append(0)
+            self._csr = None
+        return x
+
+    def _edge(self, u, v) -> Optional[int]:
+        a, b = self._index.get(u), self._index.get(v)
+        if a is None or b is None:
+            return None
+        return self._slot.get((a, b) if a <= b else (b, a))
+
+    def _flip_degree(self, a: int, b: int, sign: int = 1) -> None:
+        self._deg[a] += sign
+        self._deg[b] += sign
+
+    def _mark_relaxed(self, e: int) -> None:
+        # Linhas antigas ganham as posições dos nós novos (inf / -1). Uma
+        # ponta sem outras arestas vivas é folha: nenhum caminho passa por
+        # ela, então basta preencher a distância dela, sem refazer a linha.
+        a, b, w = self._eu[e], self._ev[e], self._ew[e]
+        n = len(self.labels)
+        leaf = b if self._deg[b] == 0 else a if self._deg[a] == 0 else -1
+        for s in list(self._rows):
+            dist, pred = self._rows[s]
+            if len(dist) < n:
+                dist, pred = self._rows[s] = _padded(dist, pred, n)
+            if s in self._dirty:
+                continue
+            da, db = dist[a], dist[b]
+            if leaf >= 0:
+                near = a if leaf == b else b
+                if dist[near] + w < dist[leaf]:
+                    dist[leaf] = dist[near] + w
+                    pred[leaf] = e
+            elif da + w < db or db + w < da:
+                self._dirty.add(s)
+
+    def _mark_tree_users(self, e: int) -> None:
+        a, b = self._eu[e], self._ev[e]
+        for s, (_, pred) in self._rows.items():
+            if s not in self._dirty and (_at(pred, a, -1) == e or _at(pred, b, -1) == e):
+                self._dirty.add(s)
+
+    def _current_csr(self) -> Tuple[CSRGraph, np.ndarray]:
+        if self._csr is None:
+            alive = np.flatnonzero(np.frombuffer(bytes(self._alive), dtype=np.uint8))
+            g = CSRGraph(self.labels,
+                         np.asarray(self._eu, dtype=np.int32)[alive],
+                         np.asarray(self._ev, dtype=np.int32)[alive],
+                         np.asarray(self._ew, dtype=np.float64)[alive])
+            # Ids locais do CSR -> ids estáveis da sessão.
+            eids = np.ascontiguousarray(alive[g.edge_ids], dtype=np.int32)
+            self._csr = (g, eids)
+        return self._csr
+
+    def _full_row(self, g: CSRGraph, eids: np.ndarray, s: int) -> Tuple[np.ndarray, np.ndarray]:
+        pred = np.full(g.n, -1, dtype=np.int32)
+        dmap, _ = _targeted_dijkstra(g.offsets, g.targets, g.weights, eids, s, range(g.n), pred)
+        dist = np.full(g.n, math.inf, dtype=np.float64)
+        dist[list(dmap)] = list(dmap.values())
+        return dist, pred
+
+    def _path_edges(self, s: int, t: int) -> List[int]:
+        pred = self._rows[s][1]
+        out: List[int] = []
+        x = t
+        while x != s:
+            e = int(pred[x])
+            out.append(e)
+            x = self._eu[e] if self._ev[e] == x else self._ev[e]
+        return out
+
+    def _match(self, odd: List[int], D: np.ndarray) -> List[Tuple[int, int]]:
+        last = self._last
+        if last is not None and last[0] == odd:
+            _, D0, pairs0, res0, C0 = last
+            if np.array_equal(D, D0) or (res0 is not None and _certified(res0, C0, D, pairs0)):
+                self.matching_reused = True
+                self._last = (odd, D, pairs0, res0, C0)
+                return pairs0
+        k = len(odd)
+        if k <= _DP_MAX_K:
+            pairs, _ = _minimum_weight_perfect_matching_dp([self.labels[x] for x in odd], D)
+            self._last = (odd, D, pairs, None, 0.0)
+            return pairs
+        C = float(D.max()) + 1.0
+        iu, ju = np.triu_indices(k, 1)
+        res = max_weight_matching(k, list(zip(iu.tolist(), ju.tolist(), (C - D[iu, ju]).tolist())),
+                                  maxcardinality=True)
+        if any(x == -1 for x in res.mate):
+            raise ValueError("Não existe emparelhamento perfeito entre os vértices ímpares.")
+        pairs = [(i, j) for i, j in enumerate(res.mate) if i < j]
+        self._last = (odd, D, pairs, res, C)
+        return pairs
+
+
+def _certified(res, C: float, D: np.ndarray, pairs: List[Tuple[int, int]]) -> bool:
+    # Duais anteriores continuam um certificado para os pesos C - D novos?
+    # Viabilidade em todos os pares e folga zero nos emparelhados.
+    k = len(D)
+    y = np.asarray(res.dualvar[:k], dtype=np.float64)
+    tol = 1e-9 * max(1.0, C)
+    for i, j in pairs:
+        if abs(res.reduced_slack(i, j, C - float(D[i, j]))) > tol:
+            return False
+    s = y[:, None] + y[None, :] - 2.0 * (C - D)
+    s[np.tril_indices(k)] = np.inf
+    for i, j in zip(*np.nonzero(s < -tol)):
+        if res.reduced_slack(int(i), int(j), C - float(D[i, j])) < -tol:
+            return False
+    return True
+
+
+def _padded(dist: np.ndarray, pred: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    k = n - len(dist)
+    return (np.concatenate([dist, np.full(k, math.inf)]),
+            np.concatenate([pred, np.full(k, -1, dtype=pred.dtype)]))
+
+
+def _at(row: np.ndarray, x: int, default: float = math.inf):
+    # Linhas calculadas antes de um nó novo existir não têm a posição dele.
+    return row[x] if x < len(row) else default
+
+
+def _check_weight(u, v, w) -> float:
+    w = float(w)
+    if not (w >= 0) or math.isnan(w):
+        raise ValueError(f"Peso inválido em ({u},{v},{w})")
+    return w
@@ -1,20 +1,23 @@
 from __future__ import annotations
 """
-CLI do CPP (não dirigido) para:
-- Resolver instância CSV u,v,w.
+CLI do CPP (não dirigido; dirigido com --directed) para:
+- Resolver instância CSV u,v,w (coluna opcional oneway com --directed).
 - Plotar solução (default) ou apenas o tour (style=tour).
 - Exportar tour em TXT, GeoJSON e GPX (quando houver --nodes id,lat,lon).
 """
 import argparse
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, TYPE_CHECKING
 from collections import defaultdict
-import os, csv, json, math
-import networkx as nx
-import matplotlib.pyplot as plt
-from matplotlib.collections import LineCollection
-from matplotlib.lines import Line2D
-from .graph_io import load_graph_from_csv
-from .chinese_postman import solve_cpp_undirected
+import os, json, math
+import numpy as np
+from .graph_io import load_csr_graph, load_directed_graph_from_csv, read_nodes_csv, read_pccg_nodes
+from .chinese_postman import solve_cpp_undirected, solve_cpp_components
+from .csr import CSRGraph, connected_components
+from .cache import SolutionCache
+from .profiling import SolveStats, NO_STATS
+
+if TYPE_CHECKING:  # só anotações: networkx é importado ao plotar
+    import networkx as nx
 
 
 class BasemapUnavailableError(RuntimeError):
@@ -42,59 +45,73 @@ def _group_nodes_for_labels(
         groups.append((sorted(members), (x, y)))
     return groups
 
-def _largest_connected_component(G: nx.Graph) -> nx.Graph:
-    if G.number_of_nodes() == 0:
-        return G.copy()
-    comps = list(nx.connected_components(G))
-    if not comps:
-        return G.copy()
-    biggest = max(comps, key=len)
-    return G.subgraph(biggest).copy()
+def _largest_connected_component(g: CSRGraph) -> CSRGraph:
+    if g.n == 0:
+        return g
+    ncomp, comp = connected_components(g)
+    sizes = np.bincount(comp, minlength=ncomp)
+    biggest = int(np.argmax(sizes))
+    return g.subgraph(comp == biggest)
 
-def _export_tour_geojson(tour: List[str], pos_geo: Optional[Dict[str, Tuple[float, float]]], path: str, total: float) -> None:
+def _export_tour_geojson(routes: List[List[str]], pos_geo: Optional[Dict[str, Tuple[float, float]]], path: str, total: float) -> None:
+    # Uma Feature por rota (várias quando --components).
     if not pos_geo:
         print("Aviso: --save-geojson requer --nodes (id,lat,lon). Ignorando.")
         return
-    coords = []
-    for n in tour:
-        if n in pos_geo:
-            lat, lon = pos_geo[n]
-            coords.append([float(lon), float(lat)])  # GeoJSON: [lon, lat]
-    if not coords:
+    features = []
+    for r, tour in enumerate(routes):
+        coords = []
+        for n in tour:
+            if n in pos_geo:
+                lat, lon = pos_geo[n]
+                coords.append([float(lon), float(lat)])  # GeoJSON: [lon, lat]
+        if coords:
+            props = {"name": "CPP tour", "total_cost_m": float(total)}
+            if len(routes) > 1:
+                props["name"] = f"CPP tour {r + 1}"
+            features.append({"type": "Feature", "properties": props,
+                             "geometry": {"type": "LineString", "coordinates": coords}})
+    if not features:
         print("Aviso: sem coordenadas válidas para GeoJSON.")
         return
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    doc = {"type": "FeatureCollection",
-           "features": [{"type": "Feature",
-                         "properties": {"name": "CPP tour", "total_cost_m": float(total)},
-                         "geometry": {"type": "LineString", "coordinates": coords}}]}
+    doc = {"type": "FeatureCollection", "features": features}
     with open(path, "w", encoding="utf-8") as f:
         json.dump(doc, f, ensure_ascii=False)
     print(f"GeoJSON salvo em: {path}")
 
-def _export_tour_gpx(tour: List[str], pos_geo: Optional[Dict[str, Tuple[float, float]]], path: str, total: float) -> None:
+def _export_tour_gpx(routes: List[List[str]], pos_geo: Optional[Dict[str, Tuple[float, float]]], path: str, total: float) -> None:
+    # Um <trk> por rota (várias quando --components).
     if not pos_geo:
         print("Aviso: --save-gpx requer --nodes (id,lat,lon). Ignorando.")
         return
-    pts = []
-    for n in tour:
-        if n in pos_geo:
-            lat, lon = pos_geo[n]
-            pts.append((lat, lon))
-    if not pts:
+    tracks = []
+    for tour in routes:
+        pts = []
+        for n in tour:
+            if n in pos_geo:
+                lat, lon = pos_geo[n]
+                pts.append((lat, lon))
+        if pts:
+            tracks.append(pts)
+    if not tracks:
         print("Aviso: sem coordenadas válidas para GPX.")
         return
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
         f.write('<gpx version="1.1" creator="pcc.solve_cli" xmlns="http://www.topografix.com/GPX/1/1">\n')
-        f.write(f'  <trk><name>CPP tour (custo {total:.1f} m)</name><trkseg>\n')
-        for lat, lon in pts:
-            f.write(f'    <trkpt lat="{lat:.7f}" lon="{lon:.7f}"></trkpt>\n')
-        f.write('  </trkseg></trk>\n</gpx>\n')
+        for r, pts in enumerate(tracks):
+            name = f"CPP tour (custo {total:.1f} m)" if len(tracks) == 1 else f"CPP tour {r + 1} (custo total {total:.1f} m)"
+            f.write(f'  <trk><name>{name}</name><trkseg>\n')
+            for lat, lon in pts:
+                f.write(f'    <trkpt lat="{lat:.7f}" lon="{lon:.7f}"></trkpt>\n')
+            f.write('  </trkseg></trk>\n')
+        f.write('</gpx>\n')
     print(f"GPX salvo em: {path}")
 
 def _project_positions(G: nx.Graph, pos_geo: Optional[Dict[str, Tuple[float, float]]], layout_k: Optional[float]) -> Dict[str, Tuple[float, float]]:
+    import networkx as nx
     if not pos_geo:
         return nx.spring_layout(G, seed=42, k=layout_k) if layout_k else nx.spring_layout(G, seed=42)
     lats = [lat for n,(lat,lon) in pos_geo.items() if n in G.nodes]
@@ -176,6 +193,9 @@ def _plot_with_basemap(
     fs_node: float,
     labels_nodes: List[str],
 ):
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
     try:
         import contextily as ctx
         import numpy as np
@@ -314,12 +334,30 @@ def _plot_with_basemap(
 
 def main(argv: Optional[List[str]] = None) -> None:
     p = argparse.ArgumentParser(description="Resolver o CPP (não dirigido) a partir de CSV u,v,w.")
-    p.add_argument("--input", "--edgelist", dest="input", default="data/example_edges.csv", help="CSV u,v,w")
+    p.add_argument("--input", "--edgelist", dest="input", default="data/example_edges.csv",
+                   help="CSV u,v,w ou grafo binário .pccg")
     p.add_argument("--plot", "--draw", action="store_true", help="Plota o grafo")
     p.add_argument("--save-plot", default=None, help="Salvar figura (PNG/SVG)")
     p.add_argument("--save-tour", default=None, help="Salvar tour em texto")
-    p.add_argument("--nodes", dest="nodes_csv", default=None, help="CSV de nós (id,lat,lon) para plot/export")
+    p.add_argument("--nodes", dest="nodes_csv", default=None,
+                   help="CSV de nós (id,lat,lon) para plot/export (um .pccg já traz lat/lon)")
+    p.add_argument("--directed", action="store_true",
+                   help="CPP dirigido: coluna oneway do CSV (1 = u->v, -1 = v->u, vazio/0 = mão dupla)")
     p.add_argument("--largest-component", action="store_true", help="Usar apenas a maior componente conexa")
+    p.add_argument("--components", action="store_true",
+                   help="Resolver cada componente conexa separadamente (uma rota por componente, em paralelo com --workers)")
+    p.add_argument("--workers", type=int, default=1, help="Processos para a fase de caminhos mínimos (0 = todos os núcleos)")
+    p.add_argument("--candidates", type=int, default=0,
+                   help="Modo esparso: K ímpares mais próximos por ímpar (exato, com certificado dual); 0 = denso")
+    p.add_argument("--cache", default=os.environ.get("PCC_CACHE_DIR"),
+                   help="Diretório do cache de soluções (padrão: $PCC_CACHE_DIR; sem cache se ausente)")
+    p.add_argument("--cache-max-mb", type=float, default=256.0, help="Tamanho máximo do cache (LRU), em MB")
+    p.add_argument("--profile", nargs="?", const="-", default=None, metavar="JSON",
+                   help="Tempo, pico de memória (tracemalloc) e contadores por fase; JSON no stdout ou no arquivo dado")
+    p.add_argument("--quality", choices=["exact", "approx"], default="exact",
+                   help="Matching exato ou aproximado (guloso + 2-opt, com limite inferior e gap)")
+    p.add_argument("--time-limit", type=float, default=None,
+                   help="Prazo em segundos para o 2-opt (implica --quality approx)")
     # Estilo
     p.add_argument("--style", choices=["default", "tour"], default="default", help="Estilo do gráfico: default ou tour")
     p.add_argument("--node-size", type=int, default=0, help="Tamanho dos nós (auto se 0)")
@@ -341,43 +379,90 @@ def main(argv: Optional[List[str]] = None) -> None:
     p.add_argument("--save-geojson", default=None, help="Exportar tour em GeoJSON (requer --nodes)")
     p.add_argument("--save-gpx", default=None, help="Exportar tour em GPX (requer --nodes)")
     args = p.parse_args(argv)
-
-    G = load_graph_from_csv(args.input)
-    if args.largest_component:
-        G = _largest_connected_component(G)
-
-    total, tour = solve_cpp_undirected(G)
-    print(f"Custo Total: {total}")
-    print("Tour:", " -> ".join(map(str, tour)))
+    if args.directed and (args.components or args.largest_component or args.input.lower().endswith(".pccg")):
+        p.error("--directed requer CSV e não combina com --components/--largest-component")
+
+    profile = SolveStats(memory=True) if args.profile else None
+    prof = profile if profile is not None else NO_STATS
+    dg = None
+    with prof.phase("load"):
+        if args.directed:
+            dg = load_directed_graph_from_csv(args.input)
+            # Versão não dirigida só para o plot (ruas sem sentido).
+            g = CSRGraph.from_arrays(dg.labels, dg.tail, dg.head, dg.w)
+        else:
+            g = load_csr_graph(args.input)
+        if args.largest_component:
+            g = _largest_connected_component(g)
 
     pos_geo: Optional[Dict[str, Tuple[float, float]]] = None
     if args.nodes_csv:
         try:
-            pos_geo = {}
-            with open(args.nodes_csv, newline="", encoding="utf-8") as f:
-                r = csv.DictReader(f)
-                for row in r:
-                    nid, lat, lon = row.get("id"), row.get("lat"), row.get("lon")
-                    if nid and lat and lon:
-                        pos_geo[nid] = (float(lat), float(lon))
+            pos_geo = read_nodes_csv(args.nodes_csv)
         except Exception as e:
             print(f"Aviso: falha ao ler --nodes: {e} (prosseguindo sem georreferência)")
             pos_geo = None
+    elif args.input.lower().endswith(".pccg"):
+        pos_geo = read_pccg_nodes(args.input) or None
+
+    cache = SolutionCache(args.cache, int(args.cache_max_mb * (1 << 20))) if args.cache else None
+    info: Dict = {"quality": "exact"}
+    if dg is not None:
+        from .directed import solve_cpp_directed
+        total, tour = solve_cpp_directed(dg, profile=profile)
+        routes = [tour]
+        print(f"Custo Total: {total}")
+        print("Tour:", " -> ".join(map(str, tour)))
+    elif args.components:
+        total, results = solve_cpp_components(g, workers=args.workers, candidates=args.candidates, coords=pos_geo,
+                                              cache=cache, quality=args.quality, time_limit=args.time_limit,
+                                              info=info, profile=profile)
+        routes = [t for _, t in results]
+        for r, (cost, t) in enumerate(results, start=1):
+            print(f"Componente {r}: custo {cost}")
+            print("Tour:", " -> ".join(map(str, t)))
+        print(f"Custo Total: {total} ({len(results)} componente(s))")
+        # Para o plot as rotas são concatenadas com separador None (não é nó).
+        tour = [n for t in routes for n in t + [None]][:-1] if routes else []
+    else:
+        total, tour = solve_cpp_undirected(g, workers=args.workers, candidates=args.candidates, coords=pos_geo,
+                                           cache=cache, quality=args.quality, time_limit=args.time_limit,
+                                           info=info, profile=profile)
+        routes = [tour]
+        print(f"Custo Total: {total}")
+        print("Tour:", " -> ".join(map(str, tour)))
+    if info["quality"] == "approx":
+        stop = " (prazo esgotado)" if info["stopped"] else ""
+        print(f"Limite inferior: {info['lower_bound']} (gap {100 * info['gap']:.2f}%){stop}")
+    if cache is not None and cache.hits:
+        print(f"(solução lida do cache em {args.cache})")
 
     if args.save_tour:
         os.makedirs(os.path.dirname(args.save_tour) or ".", exist_ok=True)
         with open(args.save_tour, "w", encoding="utf-8") as f:
-            f.write(" -> ".join(map(str, tour)) + "\n")
+            for t in routes:
+                f.write(" -> ".join(map(str, t)) + "\n")
         print(f"Tour salvo em: {args.save_tour}")
 
-    if args.save_geojson:
-        _export_tour_geojson(tour, pos_geo, args.save_geojson, total)
-    if args.save_gpx:
-        _export_tour_gpx(tour, pos_geo, args.save_gpx, total)
+    with prof.phase("export"):
+        if args.save_geojson:
+            _export_tour_geojson(routes, pos_geo, args.save_geojson, total)
+        if args.save_gpx:
+            _export_tour_gpx(routes, pos_geo, args.save_gpx, total)
+    if profile is not None:
+        profile.close()
+        profile.write_json(args.profile)
+        if args.profile != "-":
+            print(f"Perfil salvo em: {args.profile}")
 
     if not args.plot:
         return
 
+    # matplotlib e networkx só são importados para plotar (uma resposta do
+    # cache sai em ms; --help e a resolução via CSR não carregam nenhum dos dois).
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    G = g.to_networkx()
     pos = _project_positions(G, pos_geo, args.layout_k)
     n_nodes, n_edges = G.number_of_nodes(), G.number_of_edges()
     node_size = args.node_size if args.node_size > 0 else (520 if n_nodes <= 30 else (340 if n_nodes <= 80 else 240))
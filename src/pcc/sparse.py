@@ -0,0 +1,222 @@
+"""
+Emparelhamento esparso por pares candidatos, com certificado de otimalidade.
+
+Em redes viárias o emparelhamento ótimo quase nunca liga ímpares distantes.
+Em vez das k^2 distâncias:
+1) de cada ímpar i roda-se um Dijkstra truncado que para ao assentar os K
+   ímpares mais próximos (mais os K vizinhos geográficos, se houver lat/lon);
+   o raio r_i da busca é um limite inferior para d(i, j) de todo j não visto;
+2) resolve-se o blossom só sobre os pares candidatos;
+3) verifica-se a viabilidade dual dos pares podados usando d(i, j) >= max(r_i, r_j):
+   se a restrição dual vale com esse limite, vale com a distância real. Pares
+   que violam o certificado têm a distância exata calculada e entram no
+   conjunto; repete-se até o certificado fechar (o resultado é exato).
+"""
+from __future__ import annotations
+from typing import List, Tuple, Dict, Optional, Sequence
+import heapq, math
+import numpy as np
+
+from .csr import CSRGraph
+from .matching import max_weight_matching
+from .chinese_postman import _targeted_dijkstra
+
+# Linhas da matriz de verificação processadas por vez (limita memória a O(k)).
+_CHECK_ROWS = 256
+
+
+def sparse_candidate_matching(
+    g: CSRGraph,
+    odd: np.ndarray,
+    K: int,
+    coords: Optional[Dict[str, Tuple[float, float]]] = None,
+) -> Tuple[List[Tuple[int, int]], float, "_LazyPairPaths"]:
+    """
+    Emparelhamento perfeito mínimo exato entre os ímpares usando apenas
+    pares candidatos. Devolve (pares, custo adicional, caminhos sob demanda).
+    """
+    k = len(odd)
+    src = odd.tolist()
+    odd_index = np.full(g.n, -1, dtype=np.int32)
+    odd_index[odd] = np.arange(k, dtype=np.int32)
+    seeds = _geo_seeds(g, src, K, coords)
+
+    while True:
+        cand, radius = _candidate_pairs(g, src, odd_index, K, seeds)
+        while True:
+            pairs, cost, res, C = _solve_sparse(k, cand)
+            if pairs is None:
+                break  # sem emparelhamento perfeito no grafo esparso
+            missing = _certificate_violations(k, cand, radius, res, C)
+            if not missing:
+                return pairs, cost, _LazyPairPaths(g, src)
+            _add_exact_pairs(g, src, missing, cand)
+        if K >= k - 1:
+            raise ValueError("Não existe emparelhamento perfeito entre os vértices ímpares.")
+        K = min(2 * K, k - 1)
+        seeds = _geo_seeds(g, src, K, coords)
+
+
+def _candidate_pairs(
+    g: CSRGraph, src: List[int], odd_index: np.ndarray, K: int, seeds: Optional[List[List[int]]]
+) -> Tuple[Dict[Tuple[int, int], float], np.ndarray]:
+    cand: Dict[Tuple[int, int], float] = {}
+    radius = np.empty(len(src), dtype=np.float64)
+    for i, s in enumerate(src):
+        found, r = _knn_dijkstra(g, s, odd_index, K, seeds[i] if seeds else ())
+        radius[i] = r
+        for j, d in found:
+            key = (i, j) if i < j else (j, i)
+            old = cand.get(key)
+            if old is None or d < old:
+                cand[key] = d
+    return cand, radius
+
+
+def _knn_dijkstra(
+    g: CSRGraph, source: int, odd_index: np.ndarray, K: int, seeds: Sequence[int]
+) -> Tuple[List[Tuple[int, float]], float]:
+    # Para ao assentar K ímpares (e todas as sementes). Todo nó não assentado
+    # tem distância >= raio; se a fila esvazia, o raio é infinito.
+    off = memoryview(g.offsets)
+    tgt = memoryview(g.targets)
+    wts = memoryview(g.weights)
+    oidx = memoryview(odd_index)
+    pending = set(seeds)
+    pending.discard(oidx[source])
+    dist: Dict[int, float] = {source: 0.0}
+    heap = [(0.0, source)]
+    found: List[Tuple[int, float]] = []
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        j = oidx[u]
+        if j >= 0 and u != source:
+            found.append((j, d))
+            pending.discard(j)
+            if len(found) >= K and not pending:
+                return found, d
+        for p in range(off[u], off[u + 1]):
+            v = tgt[p]
+            nd = d + wts[p]
+            dv = dist.get(v)
+            if dv is None or nd < dv:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return found, math.inf
+
+
+def _geo_seeds(
+    g: CSRGraph, src: List[int], K: int, coords: Optional[Dict[str, Tuple[float, float]]]
+) -> Optional[List[List[int]]]:
+    # K vizinhos mais próximos por haversine entre os ímpares com lat/lon.
+    if not coords:
+        return None
+    k = len(src)
+    lat = np.full(k, np.nan)
+    lon = np.full(k, np.nan)
+    for i, s in enumerate(src):
+        c = coords.get(g.labels[s])
+        if c is not None:
+            lat[i], lon[i] = c
+    has = np.flatnonzero(~np.isnan(lat))
+    seeds: List[List[int]] = [[] for _ in range(k)]
+    if has.size < 2:
+        return seeds
+    phi = np.radians(lat[has])
+    lam = np.radians(lon[has])
+    kk = min(K, has.size - 1)
+    for a in range(0, has.size, _CHECK_ROWS):
+        rows = slice(a, a + _CHECK_ROWS)
+        dphi = phi[None, :] - phi[rows, None]
+        dlam = lam[None, :] - lam[rows, None]
+        h = np.sin(dphi / 2) ** 2 + np.cos(phi[rows, None]) * np.cos(phi[None, :]) * np.sin(dlam / 2) ** 2
+        h[np.arange(h.shape[0]), np.arange(a, a + h.shape[0])] = np.inf
+        near = np.argpartition(h, kk - 1, axis=1)[:, :kk]
+        for r, row in enumerate(near):
+            seeds[int(has[a + r])] = has[row].tolist()
+    return seeds
+
+
+def _solve_sparse(k: int, cand: Dict[Tuple[int, int], float]):
+    C = (max(cand.values()) if cand else 0.0) + 1.0
+    edges = [(i, j, C - d) for (i, j), d in cand.items()]
+    res = max_weight_matching(k, edges, maxcardinality=True)
+    if any(x == -1 for x in res.mate):
+        return None, 0.0, res, C
+    pairs: List[Tuple[int, int]] = []
+    cost = 0.0
+    for i, j in enumerate(res.mate):
+        if i < j:
+            pairs.append((i, j))
+            cost += cand[(i, j)]
+    return pairs, cost, res, C
+
+
+def _certificate_violations(
+    k: int, cand: Dict[Tuple[int, int], float], radius: np.ndarray, res, C: float
+) -> List[Tuple[int, int]]:
+    # Restrição dual de um par podado (i, j), com pesos w = C - d:
+    #   y_i + y_j + sum(z_B : B contém i e j) >= C - d(i, j).
+    # Com d >= LB = max(r_i, r_j) basta checar contra C - LB. Primeiro um teste
+    # vetorizado sem os z_B (que só somam >= 0); os que falham são refeitos
+    # com a hierarquia de blossoms.
+    y = np.asarray(res.dualvar[:k], dtype=np.float64)
+    tol = 1e-9 * max(1.0, C)
+    out: List[Tuple[int, int]] = []
+    cols = np.arange(k)
+    for a in range(0, k, _CHECK_ROWS):
+        rows = np.arange(a, min(a + _CHECK_ROWS, k))
+        lb = np.maximum(radius[rows, None], radius[None, :])
+        with np.errstate(invalid="ignore"):
+            s = y[rows, None] + y[None, :] - 2.0 * (C - lb)
+        s[cols[None, :] <= rows[:, None]] = np.inf
+        for r, j in zip(*np.nonzero(s < -tol)):
+            i, j = int(rows[r]), int(j)
+            if (i, j) in cand:
+                continue
+            lbij = float(lb[r, j])
+            if res.reduced_slack(i, j, C - lbij) < -tol:
+                out.append((i, j))
+    return out
+
+
+def _add_exact_pairs(
+    g: CSRGraph, src: List[int], missing: List[Tuple[int, int]], cand: Dict[Tuple[int, int], float]
+) -> None:
+    by_source: Dict[int, List[int]] = {}
+    for i, j in missing:
+        by_source.setdefault(i, []).append(j)
+    scratch = np.full(g.n, -1, dtype=np.int32)
+    for i, js in by_source.items():
+        tl = [src[j] for j in js]
+        dist, remaining = _targeted_dijkstra(g.offsets, g.targets, g.weights, g.edge_ids, src[i], tl, scratch)
+        for j, t in zip(js, tl):
+            cand[(i, j)] = float(dist[t])
+
+
+class _LazyPairPaths:
+    """Caminhos mínimos dos pares emparelhados, recalculados sob demanda com
+    uma busca direcionada (memória O(n) em vez de k árvores)."""
+
+    __slots__ = ("g", "sources", "_row")
+
+    def __init__(self, g: CSRGraph, sources: List[int]):
+        self.g = g
+        self.sources = sources
+        self._row = np.full(g.n, -1, dtype=np.int32)
+
+    def path_edges(self, i: int, j: int) -> List[int]:
+        g = self.g
+        s, t = self.sources[i], self.sources[j]
+        _targeted_dijkstra(g.offsets, g.targets, g.weights, g.edge_ids, s, [t], self._row)
+        eu, ev, row = g.eu, g.ev, self._row
+        out: List[int] = []
+        x = t
+        while x != s:
+            e = int(row[x])
+            out.append(e)
+            x = int(eu[e]) if int(ev[e]) == x else int(ev[e])
+        out.reverse()
+        return out
@@ -1,11 +1,13 @@
-import sys, pathlib, pytest
+import sys, pathlib, random, pytest
+import numpy as np
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
-from pcc.graph_io import load_graph_from_csv
-from pcc.chinese_postman import solve_cpp_undirected
+from pcc.graph_io import load_graph_from_csv, load_csr_graph_from_csv
+from pcc.chinese_postman import solve_cpp_undirected, solve_cpp_components
+from pcc.csr import CSRGraph
 
 def test_example_cost_and_tour():
     G = load_graph_from_csv(str(ROOT / "data" / "example_edges.csv"))
@@ -14,4 +16,431 @@ def test_example_cost_and_tour():
     assert len(tour) >= 2 and tour[0] == tour[-1]
     tour_edges = set(frozenset((a, b)) for a, b in zip(tour, tour[1:]))
     orig_edges = set(frozenset((u, v)) for u, v, _ in G.edges(data=True))
-    assert orig_edges.issubset(tour_edges)
\ No newline at end of file
+    assert orig_edges.issubset(tour_edges)
+
+def test_csr_path_matches_networkx_input():
+    path = str(ROOT / "data" / "example_edges.csv")
+    cost_nx, _ = solve_cpp_undirected(load_graph_from_csv(path))
+    cost_csr, tour = solve_cpp_undirected(load_csr_graph_from_csv(path))
+    assert cost_csr == pytest.approx(cost_nx, abs=1e-9)
+    assert tour[0] == tour[-1] and len(tour) == 8
+
+
+def _grid_edges(w, h, seed=0):
+    rng = random.Random(seed)
+    edges = []
+    for x in range(w):
+        for y in range(h):
+            if x + 1 < w:
+                edges.append((f"{x},{y}", f"{x+1},{y}", round(rng.uniform(50, 150), 1)))
+            if y + 1 < h:
+                edges.append((f"{x},{y}", f"{x},{y+1}", round(rng.uniform(50, 150), 1)))
+    return edges
+
+def test_parallel_shortest_paths_match_serial():
+    g = CSRGraph.from_edges(_grid_edges(12, 12))
+    cost_serial, _ = solve_cpp_undirected(g)
+    cost_par, tour = solve_cpp_undirected(g, workers=2)
+    assert cost_par == pytest.approx(cost_serial, abs=1e-6)
+    assert tour[0] == tour[-1]
+
+def test_targeted_dijkstra_stops_early_with_exact_distances_and_paths():
+    import networkx as nx
+    from pcc.chinese_postman import _targeted_dijkstra, _all_pairs_shortest_paths_among
+    edges = _grid_edges(20, 20, seed=5)
+    g = CSRGraph.from_edges(edges)
+    G = nx.Graph()
+    G.add_weighted_edges_from(edges)
+    idx = {x: i for i, x in enumerate(g.labels)}
+    s, near = idx["0,0"], [idx["1,1"], idx["2,0"], idx["0,3"]]
+    pred = np.full(g.n, -1, dtype=np.int32)
+    pushes = [0]
+    dist, missing = _targeted_dijkstra(g.offsets, g.targets, g.weights, g.edge_ids, s, near, pred, pushes)
+    ref = nx.single_source_dijkstra_path_length(G, "0,0")
+    assert not missing and len(dist) < g.n // 4 and pushes[0] < g.n
+    for t in near:
+        assert dist[t] == pytest.approx(ref[g.labels[t]])
+        x, total = t, 0.0
+        while x != s:                     # caminho reconstruído pelas arestas predecessoras
+            e = int(pred[x])
+            total += float(g.ew[e])
+            x = int(g.eu[e]) if int(g.ev[e]) == x else int(g.ev[e])
+        assert total == pytest.approx(dist[t])
+    odd = np.asarray([idx["0,5"], idx["7,0"], idx["19,12"], idx["3,19"]], dtype=np.int32)
+    D, trees = _all_pairs_shortest_paths_among(g, odd)
+    for i in range(len(odd)):
+        for j in range(i + 1, len(odd)):
+            path = trees.path(i, j)
+            assert path[0] == g.labels[odd[i]] and path[-1] == g.labels[odd[j]]
+            assert D[i, j] == pytest.approx(nx.dijkstra_path_length(G, path[0], path[-1]))
+            assert nx.path_weight(G, path, "weight") == pytest.approx(D[i, j])
+            assert float(g.ew[trees.path_edges(i, j)].sum()) == pytest.approx(D[i, j])
+
+def test_sparse_candidates_are_exact():
+    g = CSRGraph.from_edges(_grid_edges(14, 14, seed=3))
+    cost_dense, _ = solve_cpp_undirected(g)
+    cost_sparse, tour = solve_cpp_undirected(g, candidates=2)
+    assert cost_sparse == pytest.approx(cost_dense, abs=1e-6)
+    assert tour[0] == tour[-1]
+
+def test_standalone_cpp_solver_uses_shared_euler():
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    import cpp_solver
+    cost, tour = cpp_solver.chinese_postman_undirected(cpp_solver.example_graph())
+    assert cost == pytest.approx(16.0, abs=1e-9)
+    assert tour[0] == tour[-1] and len(tour) == 8
+
+def test_components_are_solved_independently():
+    edges = [("A", "B", 1.0), ("B", "C", 2.0), ("X", "Y", 5.0), ("Y", "Z", 1.0), ("Z", "X", 1.0)]
+    g = CSRGraph.from_edges(edges)
+    with pytest.raises(ValueError):
+        solve_cpp_undirected(g)
+    total, results = solve_cpp_components(g, workers=2)
+    assert [c for c, _ in results] == pytest.approx([6.0, 7.0])
+    assert total == pytest.approx(13.0)
+
+def test_batch_reports_failures_without_aborting(tmp_path):
+    from pcc.batch_cli import run_batch, expand_inputs
+    (tmp_path / "a.csv").write_text((ROOT / "data" / "example_edges.csv").read_text())
+    (tmp_path / "bad.csv").write_text("u,v,w\nA,B,x\n")
+    (tmp_path / "list.txt").write_text("a.csv\n# comentário\nmissing.csv\n")
+    recs = list(run_batch(expand_inputs([str(tmp_path), str(tmp_path / "list.txt")])))
+    assert len(recs) == 4
+    ok = [r for r in recs if r["ok"]]
+    assert len(ok) == 2 and all(r["cost"] == pytest.approx(16.0) and r["tour_edges"] == 7 for r in ok)
+    errors = sorted(r["error"].split(":")[0] for r in recs if not r["ok"])
+    assert errors == ["FileNotFoundError", "ValueError"]
+
+def test_solution_cache_hits_on_reordered_edges_and_evicts(tmp_path):
+    from pcc.cache import SolutionCache
+    edges = _grid_edges(5, 4, seed=3)
+    cache = SolutionCache(str(tmp_path), max_bytes=1 << 20)
+    cost, tour = solve_cpp_undirected(CSRGraph.from_edges(edges), cache=cache)
+    again = solve_cpp_undirected(CSRGraph.from_edges([(v, u, w) for u, v, w in reversed(edges)]), cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert again == (cost, tour)
+    small = SolutionCache(str(tmp_path / "lru"), max_bytes=1)
+    solve_cpp_undirected(CSRGraph.from_edges(edges), cache=small)
+    assert list((tmp_path / "lru").iterdir()) == []
+
+def test_session_matches_full_resolve_after_updates():
+    from pcc.session import CPPSession
+    rng = random.Random(7)
+    edges = {(u, v): w for u, v, w in _grid_edges(9, 7, seed=7)}
+    s = CPPSession(CSRGraph.from_edges([(u, v, w) for (u, v), w in edges.items()]))
+    s.solve()
+    for step in range(12):
+        key = rng.choice(list(edges))
+        if step % 4 == 3:
+            del edges[key]
+            s.remove_edge(*key)
+        elif step % 4 == 2:
+            key = ("0,0", f"x{step}")
+            edges[key] = 10.0
+            s.add_edge(*key, 10.0)
+        else:
+            edges[key] = round(edges[key] * rng.uniform(0.3, 3.0), 1)
+            s.set_weight(*key, edges[key])
+        ref, _ = solve_cpp_undirected(CSRGraph.from_edges([(u, v, w) for (u, v), w in edges.items()]))
+        cost, tour = s.solve()
+        assert cost == pytest.approx(ref, abs=1e-6)
+        assert tour[0] == tour[-1] and len(tour) - 1 >= len(edges)
+
+def test_session_keeps_rows_when_a_leaf_node_is_added():
+    from pcc.session import CPPSession
+    edges = _grid_edges(12, 12, seed=3)
+    s = CPPSession(CSRGraph.from_edges(edges))
+    s.solve()
+    s.add_edge("5,5", "folha", 20.0)      # nó novo, não encurta caminho algum
+    cost, _ = s.solve()
+    ref, _ = solve_cpp_undirected(CSRGraph.from_edges(edges + [("5,5", "folha", 20.0)]))
+    assert cost == pytest.approx(ref, abs=1e-6)
+    assert s.rows_recomputed == 2          # só as linhas dos dois ímpares novos
+
+def test_bulk_loader_matches_row_loader_and_keeps_line_numbers(tmp_path, monkeypatch):
+    import pcc.graph_io as gio
+    monkeypatch.setattr(gio, "_CHUNK_ROWS", 16)
+    rows = ["u,v,w", "A,B,1", "B,A,2", ""] + [f"N{i},N{i + 1},{i % 5}" for i in range(40)]
+    path = tmp_path / "e.csv"
+    path.write_text("\n".join(rows) + "\n")
+    g = gio.load_csr_graph_from_csv(str(path))
+    ref = CSRGraph.from_edges(gio.read_csv_edges(str(path)))
+    assert g.labels == ref.labels and g.m == ref.m == 41
+    assert (g.eu == ref.eu).all() and (g.ev == ref.ev).all() and (g.ew == ref.ew).all()
+    rows[30] = "N26,N27,-3"   # 30ª linha de dados (a linha vazia não conta)
+    path.write_text("\n".join(rows) + "\n")
+    with pytest.raises(ValueError, match=r"Linha 30: peso inválido '-3'\. Deve ser >= 0\."):
+        gio.load_csr_graph_from_csv(str(path))
+    rows[20] = "N16,,1"
+    path.write_text("\n".join(rows) + "\n")
+    with pytest.raises(ValueError, match=r"Linha 20: vértices vazios\."):
+        gio.read_csv_edges(str(path))
+
+def test_pccg_roundtrip_is_zero_copy_and_matches_csv(tmp_path):
+    from pcc import pccg
+    from pcc.graph_io import save_pccg, load_csr_graph, read_pccg_nodes
+    g = CSRGraph.from_edges(_grid_edges(6, 5, seed=2))
+    coords = {x: (float(i), -float(i)) for i, x in enumerate(g.labels) if i % 2 == 0}
+    path = str(tmp_path / "g.pccg")
+    save_pccg(path, g, coords)
+    h = load_csr_graph(path)
+    assert list(h.labels) == g.labels and not h.offsets.flags.writeable
+    assert solve_cpp_undirected(h) == solve_cpp_undirected(g)
+    assert read_pccg_nodes(path) == coords
+    # Escritor só com biblioteca padrão (usado pelo conversor) gera o mesmo arquivo.
+    path2 = str(tmp_path / "g2.pccg")
+    pccg.write_pccg(path2, g.labels, g.eu.tolist(), g.ev.tolist(), g.ew.tolist(), coords)
+    assert open(path, "rb").read() == open(path2, "rb").read()
+
+@pytest.fixture(scope="module")
+def tool():
+    # tools/geojson_to_csv.py carregado uma vez; registrado em sys.modules
+    # para que os workers do pool resolvam _convert_span.
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("geojson_to_csv", ROOT / "tools" / "geojson_to_csv.py")
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["geojson_to_csv"] = mod
+    spec.loader.exec_module(mod)
+    yield mod
+    sys.modules.pop("geojson_to_csv", None)
+
+def test_geojson_features_are_streamed(tool):
+    import json
+    src = ROOT / "data" / "osm_subgraph.geojson"
+    ref = json.loads(src.read_text(encoding="utf-8"))["features"]
+    assert list(tool.iter_features(str(src), chunk=97)) == ref
+    stats = {}
+    kept = list(tool.filter_feats(iter(ref), ["avenida"], None, stats))
+    assert stats["total"] == len(ref) and stats["kept"] == len(kept) > 0
+
+def test_geojson_snap_merges_across_cell_boundary(tool):
+    d = 1.0 / tool._M_PER_DEG  # 1 m em graus de latitude
+
+    def line(a, b):
+        return {"geometry": {"type": "LineString", "coordinates": [[a[1], a[0]], [b[1], b[0]]]}}
+
+    # Os dois extremos do meio ficam a 1 m, em lados opostos de uma borda da grade.
+    feats = [line((0.0, -100 * d), (0.0, -0.5 * d)), line((0.0, 0.5 * d), (0.0, 100 * d)),
+             line((0.0, 100 * d), (0.0, 200 * d))]
+    edges, pos = tool.relabel_edges(feats, snap_m=5.0)
+    assert [(u, v) for u, v, _ in edges] == [("N1", "N2"), ("N2", "N3"), ("N3", "N4")]
+    assert len(pos) == 4 and abs(pos["N2"][1]) < 1e-12
+    edges, _ = tool.relabel_edges(feats, snap_m=0.5)
+    assert len({x for u, v, _ in edges for x in (u, v)}) == 5
+    # Nenhum par a <= snap_m fica em nós distintos, em qualquer ordem de
+    # chegada: 11.99 m e 12.01 m (2 cm) se unem mesmo com 0 m já no índice.
+    rng = random.Random(11)
+    ys = [0.0, 11.99, 12.01, 30.0, 41.5, 60.0]
+    for _ in range(6):
+        rng.shuffle(ys)
+        pts = [(0.0, y * d) for y in ys]
+        index = tool._SnapIndex(12.0)
+        ids = [index.add(la, lo) for la, lo in pts]
+        for i in range(len(pts)):
+            for j in range(i + 1, len(pts)):
+                if abs(ys[i] - ys[j]) <= 12.0:
+                    assert index.find(ids[i]) == index.find(ids[j])
+
+def test_geojson_stream_fails_fast_on_truncated_or_malformed_feature(tool, tmp_path, monkeypatch):
+    import io, json
+    feat = {"type": "Feature", "properties": {"name": "Rua"},
+            "geometry": {"type": "LineString", "coordinates": [[0.5, 0.25], [1.5, 1.25]]}}
+    text = json.dumps({"type": "FeatureCollection", "features": [feat] * 5000})
+    # Arquivo cortado no meio de uma feature.
+    cut = tmp_path / "cut.geojson"
+    cut.write_text(text[:text.index('"coordinates"', len(text) // 2) + 20], encoding="utf-8")
+    with pytest.raises(ValueError, match="GeoJSON inválido"):
+        list(tool.iter_features(str(cut), chunk=256))
+    # Feature malformada logo no início: o erro sai sem ler o resto do arquivo.
+    monkeypatch.setattr(tool, "_LOOKAHEAD", 4096)
+    bad = text.replace("[0.5, 0.25], [1.5", "[0.5, 0.25] [1.5", 3).encode("utf-8")
+    f = io.BytesIO(bad)
+    with pytest.raises(ValueError, match="perto do byte"):
+        list(tool._walk_document(tool._JSONStream(f, 256), tool._iter_array))
+    assert f.tell() < 16 * 1024 < len(bad)
+
+def test_geojson_batched_lengths_match_scalar(tool):
+    lines = [[(-37.06, -10.94), (-37.05, -10.95), (-37.04, -10.95)], [(-37.0, -11.0)], [],
+             [(-37.1, -10.9), (-37.1, -10.8)]]
+    ref = [tool.line_length_m(c) for c in lines]
+    assert tool.line_lengths_m(lines) == pytest.approx(ref, rel=1e-12)
+    # Ponto não numérico: o lote cai no caminho escalar.
+    assert tool._pack_points([[(1.0, 2.0), ("x", 2.0)]], 2) is None
+    bbox = (-37.07, -10.96, -37.03, -10.93)
+    geoms = [{"type": "LineString", "coordinates": [list(p) for p in c]} for c in lines]
+    assert tool._bbox_mask(geoms, bbox) == [tool._geom_touches_bbox(g, bbox) for g in geoms]
+
+def test_geojson_parallel_conversion_matches_serial(tool, tmp_path):
+    import json
+    doc = json.loads((ROOT / "data" / "osm_subgraph.geojson").read_text(encoding="utf-8"))
+    # Objetos em listas e "},{" em textos: cortes candidatos dentro de features.
+    for i, f in enumerate(doc["features"][::3]):
+        f["properties"]["refs"] = [{"i": i}, {"nota": "}, {\"x\": 1}"}]
+    src = str(tmp_path / "g.geojson")
+    with open(src, "w", encoding="utf-8") as out:
+        json.dump(doc, out, ensure_ascii=False, indent=1)
+    for snap in (0.0, 12.0):
+        s1 = {}
+        ref = tool.relabel_edges(tool.filter_feats(tool.iter_features(src), [], None, s1), snap_m=snap)
+        # chunk=1: um corte em cada candidato; blocos pequenos também fazem
+        # muitos nós serem reconciliados entre blocos.
+        for chunk in (1, 1500, 40000):
+            s2 = {}
+            par = tool.relabel_edges_parallel(src, [], None, snap, 2, s2, chunk=chunk)
+            assert par == ref and s1 == s2
+
+def test_degree2_chains_are_contracted_and_expanded():
+    from pcc.contraction import contract_degree2
+    # Quadrado com lados subdivididos + diagonal: só A e C (grau 3) ficam,
+    # ligados por três cadeias de custo 5.
+    edges = [("A", "a1", 1.0), ("a1", "a2", 1.0), ("a2", "B", 1.0), ("B", "C", 2.0),
+             ("C", "c1", 1.5), ("c1", "D", 1.5), ("D", "A", 2.0), ("A", "x1", 2.5), ("x1", "C", 2.5)]
+    g = CSRGraph.from_edges(edges)
+    cg = contract_degree2(g)
+    assert list(cg.g.labels) == ["A", "C"] and sorted(cg.g.ew.tolist()) == [5.0, 5.0, 5.0]
+    cost, tour = solve_cpp_undirected(g)
+    assert cost == pytest.approx(sum(w for *_, w in edges) + 5.0)  # repete uma cadeia A-C
+    assert tour[0] == tour[-1] == "A" and len(tour) - 1 > len(edges)
+    w = {frozenset((u, v)): x for u, v, x in edges}
+    assert sum(w[frozenset(p)] for p in zip(tour, tour[1:])) == pytest.approx(cost)
+    assert {frozenset(p) for p in zip(tour, tour[1:])} == set(w)
+
+def test_contracted_tour_is_a_valid_euler_tour_of_the_original_graph(monkeypatch):
+    import pcc.chinese_postman as cp
+    # Malha 4x4 com cada rua partida em 6 pedaços e ruas sem saída longas:
+    # quase todos os nós são internos de cadeias de grau 2.
+    rng = random.Random(19)
+    edges = []
+
+    def street(u, v, parts):
+        pts = [u] + [f"{u}-{v}.{i}" for i in range(1, parts)] + [v]
+        edges.extend((a, b, round(rng.uniform(1, 9), 1)) for a, b in zip(pts, pts[1:]))
+
+    for i in range(4):
+        for j in range(4):
+            if i < 3:
+                street(f"{i},{j}", f"{i + 1},{j}", 6)
+            if j < 3:
+                street(f"{i},{j}", f"{i},{j + 1}", 6)
+    for j in range(4):
+        street(f"3,{j}", f"fim{j}", 8)
+    g = CSRGraph.from_edges(edges)
+    cost, tour = solve_cpp_undirected(g)
+    monkeypatch.setattr(cp, "contract_degree2", lambda g: None)
+    ref_cost, ref_tour = solve_cpp_undirected(g)
+    # Mesmo custo e um circuito euleriano válido do grafo original (a
+    # sequência de vértices pode diferir da obtida sem contração).
+    assert cost == pytest.approx(ref_cost)
+    assert tour[0] == tour[-1] == ref_tour[0]
+    w = {frozenset((u, v)): x for u, v, x in edges}
+    steps = [frozenset(p) for p in zip(tour, tour[1:])]
+    assert all(st in w for st in steps)
+    assert set(steps) == set(w)
+    assert sum(w[st] for st in steps) == pytest.approx(cost)
+
+def test_bridges_split_matching_into_blocks():
+    from pcc.bridges import split_at_bridges
+    # Dois triângulos ligados pela ponte C-D, com a folha E pendurada em A.
+    edges = [("A", "B", 1.0), ("B", "C", 1.0), ("C", "A", 1.0), ("C", "D", 5.0),
+             ("D", "F", 1.0), ("F", "G", 1.0), ("G", "D", 1.0), ("A", "E", 2.0)]
+    g = CSRGraph.from_edges(edges)
+    odd = np.flatnonzero(g.degree() % 2 == 1)
+    forced, groups = split_at_bridges(g, odd)
+    # Lado {D, F, G} tem um ímpar (D) -> C-D é duplicada; A-E também.
+    assert sorted((g.labels[g.eu[e]], g.labels[g.ev[e]]) for e in forced) == [("A", "E"), ("C", "D")]
+    assert groups == []  # as pontes já corrigem todas as paridades
+    cost, tour = solve_cpp_undirected(g)
+    assert cost == pytest.approx(sum(w for *_, w in edges) + 5.0 + 2.0)
+    assert tour[0] == tour[-1]
+
+def test_approx_quality_reports_bound_and_gap():
+    rng = np.random.default_rng(3)
+    edges = [(f"{r},{c}", f"{r},{c + 1}", float(rng.integers(1, 9))) for r in range(8) for c in range(7)]
+    edges += [(f"{r},{c}", f"{r + 1},{c}", float(rng.integers(1, 9))) for r in range(7) for c in range(8)]
+    g = CSRGraph.from_edges(edges)
+    exact, _ = solve_cpp_undirected(g)
+    info = {}
+    cost, tour = solve_cpp_undirected(g, quality="approx", info=info)
+    assert info["quality"] == "approx"
+    assert info["lower_bound"] <= exact + 1e-9 <= cost + 2e-9
+    assert info["gap"] == pytest.approx((cost - info["lower_bound"]) / cost)
+    w = {frozenset((u, v)): x for u, v, x in edges}
+    assert sum(w[frozenset(p)] for p in zip(tour, tour[1:])) == pytest.approx(cost)
+    # Prazo zero: fica no guloso, mas a rota continua válida.
+    info = {}
+    cost0, tour0 = solve_cpp_undirected(g, time_limit=0.0, info=info)
+    assert info["stopped"] and cost0 >= cost - 1e-9 and tour0[0] == tour0[-1]
+
+def test_directed_cpp_balances_oneway_streets(tmp_path):
+    from pcc.graph_io import read_csv_edges, load_directed_graph_from_csv
+    from pcc.directed import solve_cpp_directed
+    p = tmp_path / "ow.csv"
+    p.write_text("u,v,w,oneway\nA,B,1,1\nB,C,1,yes\nC,A,1,\nC,D,2,-1\nD,A,3,0\n", encoding="utf-8")
+    arcs = read_csv_edges(str(p), directed=True)
+    assert arcs[:4] == [("A", "B", 1.0), ("B", "C", 1.0), ("C", "A", 1.0), ("A", "C", 1.0)]
+    assert ("D", "C", 2.0) in arcs and ("C", "D", 2.0) not in arcs
+    assert len(read_csv_edges(str(p))) == 5   # sem directed, oneway é ignorada
+    cost, tour = solve_cpp_directed(load_directed_graph_from_csv(str(p)))
+    # Déficits em A e D, excesso 2 em C: C->A e C->A->D duplicados (1 + 4).
+    assert cost == pytest.approx(12.0 + 5.0)
+    w = {(u, v): x for u, v, x in arcs}
+    assert tour[0] == tour[-1] and set(zip(tour, tour[1:])) == set(w)
+    assert sum(w[a] for a in zip(tour, tour[1:])) == pytest.approx(cost)
+    p.write_text("u,v,w,oneway\nA,B,1,talvez\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Linha 2"):
+        read_csv_edges(str(p), directed=True)
+
+def test_profile_records_phases_counters_and_callback():
+    from pcc.profiling import SolveStats
+    seen = []
+    edges = [("A", "B", 2.0), ("A", "C", 3.0), ("B", "C", 1.0), ("B", "D", 4.0), ("C", "E", 2.0), ("D", "E", 3.0)]
+    with SolveStats(memory=True, callback=lambda name, rec: seen.append(name)) as prof:
+        cost, _ = solve_cpp_undirected(CSRGraph.from_edges(edges), profile=prof)
+    assert cost == pytest.approx(16.0)
+    d = prof.as_dict()
+    for name in ("connectivity", "contraction", "shortest_paths", "matching", "duplication", "euler"):
+        assert d["phases"][name]["calls"] >= 1 and d["phases"][name]["peak_bytes"] >= 0
+    c = d["counters"]
+    assert (c["n"], c["m"], c["k"]) == (5, 6, 2)
+    assert c["heap_pushes"] >= 1 and c["dp_states"] >= 1 and c["multigraph_edges"] == c["m_contracted"] + 1
+    assert seen[0] == "connectivity" and seen[-1] == "euler"
+
+def test_benchmark_generators_hit_k_and_compare_flags_changes():
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from benchmarks.generators import instance_from_spec
+    from benchmarks.run import run_suite, compare
+    spec = {"kind": "osm", "rows": 8, "cols": 8, "culdesacs": 5, "k": 6}
+    a, b = instance_from_spec(spec), instance_from_spec(spec)
+    assert a.edges == b.edges and a.k == 6
+    res = run_suite([dict(spec, series="k")], repeats=1)
+    assert [r["solver"] for r in res] == ["pcc", "cpp_solver"]
+    assert res[0]["cost"] == pytest.approx(res[1]["cost"]) and res[0]["counters"]["k"] == 6
+    slow = [dict(r, total_s=r["total_s"] + 1.0) for r in res]
+    assert [r["status"] for r in compare(slow, res)] == ["slower", "slower"]
+    assert compare(res, [dict(res[0], cost=0.0)])[0]["status"] == "cost_mismatch"
+    assert compare(res, [])[0]["status"] == "new"
+
+def test_euler_walks_edge_multiplicities_without_copies():
+    from pcc.euler import hierholzer, hierholzer_directed
+    # Caminho 0-1-2 com cada aresta em 2 cópias e um laço triplo em 2.
+    eu, ev = [0, 1, 2], [1, 2, 2]
+    used = []
+    circuit = hierholzer(3, eu, ev, mult=[2, 2, 3], edges_out=used)
+    assert len(circuit) == 8 and circuit[0] == circuit[-1] == 0
+    assert sorted(used) == [0, 0, 1, 1, 2, 2, 2]
+    with pytest.raises(ValueError):
+        hierholzer(3, eu, ev, mult=[1, 2, 1])
+    assert hierholzer_directed(2, [0, 1], [1, 0], mult=[300, 300]) == [0, 1] * 300 + [0]
+    with pytest.raises(ValueError):
+        hierholzer_directed(2, [0, 1], [1, 0], mult=[2, 1])
+
+def test_cli_startup_and_csr_solve_do_not_import_networkx():
+    import os, subprocess
+    code = ("import sys; from pcc.solve_cli import main; main(['--input', sys.argv[1]]); "
+            "assert 'networkx' not in sys.modules and 'matplotlib' not in sys.modules")
+    out = subprocess.run([sys.executable, "-c", code, str(ROOT / "data" / "example_edges.csv")],
+                         capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=str(SRC)))
+    assert out.returncode == 0, out.stderr
+    assert "Custo Total: 16.0" in out.stdout
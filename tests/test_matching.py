@@ -0,0 +1,38 @@
+import sys, pathlib, random, pytest
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from pcc.chinese_postman import _minimum_weight_perfect_matching_dp
+from pcc.matching import minimum_weight_perfect_matching
+
+def _random_metric(k, rng):
+    pts = [(rng.random(), rng.random()) for _ in range(k)]
+    return [[abs(a[0] - b[0]) + abs(a[1] - b[1]) for b in pts] for a in pts]
+
+@pytest.mark.parametrize("k", [2, 4, 6, 8, 10, 12])
+def test_blossom_matches_dp(k):
+    rng = random.Random(k)
+    for _ in range(15):
+        dist = _random_metric(k, rng)
+        _, dp_cost = _minimum_weight_perfect_matching_dp(list(range(k)), dist)
+        pairs, cost = minimum_weight_perfect_matching(dist)
+        assert cost == pytest.approx(dp_cost, abs=1e-9)
+        assert sorted(v for p in pairs for v in p) == list(range(k))
+
+@pytest.mark.parametrize("k", [14, 16, 18, 20])
+def test_vectorized_dp_matches_networkx_up_to_dp_max_k(k):
+    import networkx as nx
+    from pcc.chinese_postman import _DP_MAX_K
+    assert k <= _DP_MAX_K
+    rng = random.Random(100 + k)
+    for _ in range(3):
+        dist = _random_metric(k, rng)
+        pairs, dp_cost = _minimum_weight_perfect_matching_dp(list(range(k)), dist)
+        assert sorted(v for p in pairs for v in p) == list(range(k))
+        assert sum(dist[i][j] for i, j in pairs) == pytest.approx(dp_cost, abs=1e-9)
+        K = nx.Graph()
+        K.add_weighted_edges_from((i, j, dist[i][j]) for i in range(k) for j in range(i + 1, k))
+        ref = sum(dist[i][j] for i, j in nx.min_weight_matching(K))
+        assert dp_cost == pytest.approx(ref, abs=1e-9)
@@ -1,8 +1,184 @@
-# Conversor leve GeoJSON (OSM) -> CSV u,v,w (+ nodes opcional)
+# Conversor leve GeoJSON (OSM) -> CSV u,v,w (+ nodes opcional, + .pccg opcional)
 from __future__ import annotations
-import json, csv, math, argparse
+import json, csv, gc, math, argparse, os, re, codecs
+import multiprocessing as mp
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from itertools import chain, compress
 from pathlib import Path
-from typing import Dict, Tuple, List, Iterable
+from typing import Dict, Tuple, List, Iterable, Iterator, Optional
+try:  # opcional: só acelera comprimentos e bbox em lote
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:  # opcional: só para --profile (pacote pcc importável, p.ex. PYTHONPATH=src)
+    from pcc.profiling import SolveStats, NO_STATS
+except ImportError:  # pragma: no cover
+    SolveStats = None
+
+    class _NoStats:
+        def phase(self, name: str):
+            return nullcontext(self)
+
+        def count(self, name: str, n: float = 1) -> None:
+            pass
+
+        def set(self, name: str, value: float) -> None:
+            pass
+
+    NO_STATS = _NoStats()
+
+# Bytes lidos por vez do GeoJSON (o buffer guarda ~1 feature + 1 bloco).
+_READ_BYTES = 1 << 16
+# Um token que falha a até esta distância (caracteres) do fim do buffer pode
+# estar só truncado e faz ler mais; além dela, o JSON é inválido.
+_LOOKAHEAD = 1 << 20
+_WS = " \t\r\n"
+# Linhas (ou features, no filtro de bbox) por lote vetorizado com NumPy.
+_BATCH = 1024
+# Bytes do arquivo lidos e convertidos por cada processo no modo --workers.
+_CHUNK_BYTES = 1 << 22
+# Candidato a início de feature: "{" logo após "}," (confirmado pelo worker).
+_CUT = re.compile(rb"\}\s*,\s*\{")
+
+class _JSONStream:
+    """Buffer incremental sobre um arquivo binário UTF-8 para decodificar
+    valores JSON um a um com JSONDecoder.raw_decode (só a biblioteca padrão).
+    tell() conta caracteres desde o início (ou o último seek); offset() e
+    seek() usam bytes do arquivo."""
+
+    def __init__(self, f, chunk: int = _READ_BYTES):
+        self.f, self.chunk = f, chunk
+        self.dec = json.JSONDecoder()
+        self.seek(f.tell())
+
+    def seek(self, offset: int) -> None:
+        # offset deve cair no início de um caractere (p.ex. um token ASCII).
+        self.f.seek(offset)
+        self.buf, self.pos, self.eof = "", 0, False
+        self.base, self.chars = offset, 0   # bytes/caracteres antes de buf
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    def tell(self) -> int:
+        return self.chars + self.pos
+
+    def offset(self) -> int:
+        return self._byte(self.pos)
+
+    def _byte(self, pos: int) -> int:
+        return self.base + len(self.buf[:pos].encode("utf-8"))
+
+    def _more(self, need: int = 0) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(max(self.chunk, need))
+        if not data:
+            self.eof = True
+            self.utf8.decode(b"", final=True)   # UTF-8 truncado no fim do arquivo
+            return False
+        if self.pos > self.chunk:   # descarta o prefixo já consumido
+            done = self.buf[:self.pos]
+            self.base += len(done.encode("utf-8"))
+            self.chars += len(done)
+            self.buf, self.pos = self.buf[self.pos:], 0
+        self.buf += self.utf8.decode(data)
+        return True
+
+    def peek(self) -> str:
+        # Próximo caractere não branco (sem consumir); "" no fim do arquivo.
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"GeoJSON inválido: esperado '{ch}' perto do byte {self.offset()}.")
+        self.pos += 1
+
+    def value(self):
+        # Decodifica um valor completo, lendo mais texto (em blocos do tamanho
+        # do valor parcial) enquanto o erro estiver a até _LOOKAHEAD do fim do
+        # buffer; fora disso, ou no fim do arquivo, falha sem ler o resto.
+        self.peek()
+        while True:
+            try:
+                obj, end = self.dec.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as err:
+                if len(self.buf) - err.pos <= _LOOKAHEAD and self._more(len(self.buf) - self.pos):
+                    continue
+                raise ValueError(f"GeoJSON inválido perto do byte {self._byte(err.pos)}: {err.msg}.") from None
+            if end < len(self.buf) or self.eof or not self._more():
+                self.pos = end
+                return obj
+            # Número/literal no fim do buffer: pode continuar no próximo bloco.
+
+@contextmanager
+def _gc_paused():
+    # Os lotes mantêm milhares de listas vivas por um instante e o coletor
+    # cíclico as reexaminaria a cada geração (não há ciclos: só JSON).
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def iter_features(path: str, chunk: int = _READ_BYTES) -> Iterator[dict]:
+    """
+    Gera as features de um GeoJSON uma a uma, sem carregar o documento:
+    aceita FeatureCollection (chave "features" em qualquer posição), lista de
+    features ou uma Feature isolada. Memória ~ uma feature.
+    """
+    with open(path, "rb") as f:
+        kind = yield from _walk_document(_JSONStream(f, chunk), _iter_array)
+        if kind == "Feature":
+            # Feature isolada: o documento inteiro já era pequeno; relê como objeto.
+            f.seek(0)
+            yield json.load(f)
+
+def _walk_document(st: _JSONStream, array) -> Iterator:
+    # Percorre o topo do documento; array(st) trata cada lista de features
+    # (com st no "[") e gera o que o chamador consome. Devolve o "type" do topo.
+    first = st.peek()
+    if first == "[":
+        yield from array(st)
+        return None
+    if first != "{":
+        raise ValueError("GeoJSON inválido: esperado objeto ou lista no topo.")
+    st.expect("{")
+    kind = None
+    while st.peek() not in ("}", ""):
+        key = st.value()
+        st.expect(":")
+        if key == "features" and st.peek() == "[":
+            yield from array(st)
+        else:
+            val = st.value()
+            if key == "type":
+                kind = val
+        if st.peek() == ",":
+            st.pos += 1
+    return kind
+
+def _iter_array(st: _JSONStream) -> Iterator:
+    st.expect("[")
+    while True:
+        ch = st.peek()
+        if ch == "]":
+            st.pos += 1
+            return
+        if ch == ",":
+            st.pos += 1
+            continue
+        if ch == "":
+            raise ValueError("GeoJSON inválido: lista de features não terminada.")
+        yield st.value()
 
 def haversine_m(lat1, lon1, lat2, lon2) -> float:
     R = 6371000.0
@@ -19,48 +195,293 @@ def line_length_m(coords: List[Tuple[float, float]]) -> float:
         acc += haversine_m(lat1, lon1, lat2, lon2)
     return acc
 
-def snap_key(lat: float, lon: float, step_deg: float):
-    return (round(lat / step_deg), round(lon / step_deg))
-
-def relabel_edges(features: Iterable[dict], step_deg: float = 5e-5) -> Tuple[List[Tuple[str, str, float]], Dict[str, Tuple[float, float]]]:
-    idx_by_snap: Dict[Tuple[int, int], str] = {}
-    accum: Dict[Tuple[int, int], Tuple[float, float, int]] = {}
-    next_id = 1
-    def node_label(lat: float, lon: float) -> str:
-        nonlocal next_id
-        k = snap_key(lat, lon, step_deg)
-        if k not in idx_by_snap:
-            idx_by_snap[k] = f"N{next_id}"
-            accum[k] = (lat, lon, 1)
-            next_id += 1
-        else:
-            la, lo, c = accum[k]
-            accum[k] = (la + lat, lo + lon, c + 1)
-        return idx_by_snap[k]
-    edges: Dict[Tuple[str, str], float] = {}
+def _pack_points(lines: List, npts: int):
+    # Pontos [lon, lat] de várias linhas num array (npts, 2) float64, direto
+    # dos iteráveis (np.fromiter). None se algum ponto não for um par numérico
+    # (quem chama volta ao caminho escalar, que sabe ignorá-lo). As checagens
+    # são set(map(...)) para rodar em C.
+    try:
+        if set(map(len, chain.from_iterable(lines))) - {2}:
+            return None
+    except TypeError:
+        return None
+    if not set(map(type, chain.from_iterable(chain.from_iterable(lines)))) <= {int, float, bool}:
+        return None
+    flat = chain.from_iterable(chain.from_iterable(lines))
+    return np.fromiter(flat, dtype=np.float64, count=2 * npts).reshape(-1, 2)
 
-    def clean_coords(coords_raw):
-        # mantém apenas pares [lon, lat] numéricos
-        out = []
-        for c in coords_raw or []:
-            if isinstance(c, (list, tuple)) and len(c) == 2:
-                lon, lat = c
-                if isinstance(lon, (int, float)) and isinstance(lat, (int, float)):
-                    out.append((lon, lat))
-        return out
+def _packed_lengths(pts, sizes) -> List[float]:
+    # Comprimento de cada linha a partir dos pontos empacotados (graus).
+    pts = np.radians(pts)
+    lon, lat = pts[:, 0], pts[:, 1]
+    dphi = lat[1:] - lat[:-1]
+    dlmb = lon[1:] - lon[:-1]
+    a = np.sin(dphi / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlmb / 2) ** 2
+    seg = 2 * 6371000.0 * np.arcsin(np.sqrt(a))
+    # Segmento i liga o ponto i ao i+1; os que cruzam de uma linha para a
+    # seguinte são zerados e cada linha soma o seu trecho (reduceat).
+    ends = np.cumsum(sizes)
+    seg = np.append(seg, 0.0)
+    seg[ends - 1] = 0.0
+    out = np.zeros(len(sizes))
+    keep = sizes >= 2
+    if keep.any():
+        out[keep] = np.add.reduceat(seg, (ends - sizes)[keep])
+    return out.tolist()
 
-    def add_edge_from_coords(coords_raw):
-        coords = clean_coords(coords_raw)
-        if len(coords) < 2:
+def line_lengths_m(lines: List[List[Tuple[float, float]]]) -> List[float]:
+    """
+    Comprimentos (m) de várias polilinhas [(lon, lat), ...] de uma vez: com
+    NumPy, todos os pontos do lote vão para um array e os segmentos são
+    calculados numa única passada (sem NumPy: line_length_m em cada uma).
+    """
+    if np is None or not lines:
+        return [line_length_m(c) for c in lines]
+    sizes = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+    pts = _pack_points(lines, int(sizes.sum()))
+    if pts is None:
+        return [line_length_m(c) for c in lines]
+    return _packed_lengths(pts, sizes)
+
+# Metros por grau de latitude (esfera de raio 6371 km, como haversine_m).
+_M_PER_DEG = 6371000.0 * math.pi / 180.0
+
+class _SnapIndex:
+    """
+    Mescla extremos a até snap_m metros (haversine) num único nó.
+
+    Hash espacial em grade uniforme: faixas de latitude com altura snap_m e,
+    em cada faixa, células de longitude com largura snap_m medida no paralelo
+    mais próximo do polo da faixa vizinha (assim dois pontos a <= snap_m estão
+    sempre em células adjacentes). Cada ponto novo só é comparado com os das
+    3x3 células vizinhas e as mesclas (transitivas) vão para um union-find com
+    compressão de caminho e união por tamanho: tempo ~linear no nº de pontos.
+    Coordenadas idênticas viram um único ponto (cruzamentos repetidos).
+    """
+
+    def __init__(self, snap_m: float):
+        self.snap_m = snap_m
+        self.dlat = snap_m / _M_PER_DEG if snap_m > 0 else 0.0
+        self.lat: List[float] = []
+        self.lon: List[float] = []
+        self.hits: List[int] = []           # ocorrências de cada ponto (média)
+        self.parent: List[int] = []
+        self.size: List[int] = []
+        self.by_coord: Dict[Tuple[float, float], int] = {}
+        self.cells: Dict[int, List[int]] = {}
+        self.dlon: Dict[int, float] = {}
+        # merge(): (ids globais, células) de cada bloco e blocos donos de cada célula.
+        self.parts: List[Tuple[List[int], dict]] = []
+        self.owner: dict = {}
+
+    def _dlon(self, row: int) -> float:
+        w = self.dlon.get(row)
+        if w is None:
+            edge = min(90.0, (abs(row) + 2) * self.dlat)
+            w = self.dlat / max(math.cos(math.radians(edge)), 1e-9)
+            self.dlon[row] = w
+        return w
+
+    def _cell(self, lon: float, row: int) -> int:
+        # Linha e coluna num só int (barato de serializar para o modo
+        # --workers); colisões só acrescentam candidatos à comparação.
+        return (row << 32) + math.floor(lon / self._dlon(row))
+
+    def _around(self, lat: float, lon: float) -> list:
+        # Chaves das 3x3 células vizinhas (snap 0: a própria coordenada).
+        if self.dlat <= 0:
+            return [(lat, lon)]
+        row = math.floor(lat / self.dlat)
+        keys = []
+        for r in (row - 1, row, row + 1):
+            c = self._cell(lon, r)
+            keys += (c - 1, c, c + 1)
+        return keys
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def _union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a == b:
             return
-        lat1, lon1 = coords[0][1], coords[0][0]
-        lat2, lon2 = coords[-1][1], coords[-1][0]
-        u, v = node_label(lat1, lon1), node_label(lat2, lon2)
-        if u == v:
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def add(self, lat: float, lon: float) -> int:
+        """Id do ponto (lat, lon), mesclado aos pontos já vistos a <= snap_m."""
+        p = self.by_coord.get((lat, lon))
+        if p is not None:
+            self.hits[p] += 1
+            return p
+        p = self._new(lat, lon, 1)
+        self._link(p)
+        self._insert(p)
+        return p
+
+    def merge(self, lat: List[float], lon: List[float], hits: List[int], roots: List[int], size: List[int],
+              cells: dict, halo: set) -> List[int]:
+        """
+        Incorpora os pontos de outro índice (export() de um bloco, na ordem de
+        aparição) e devolve o id global de cada um. Pares dentro do bloco já
+        vêm unidos em roots; entre blocos só se comparam os pontos anteriores
+        das células da borda (halo do bloco ∩ células já ocupadas), o resto
+        entra em lote. O resultado (grupos, ordem dos ids e contagens) é o
+        mesmo de add() ponto a ponto na mesma ordem.
+        """
+        dup: Dict[int, int] = {}              # ponto local -> ponto anterior idêntico
+        near: List[Tuple[int, int]] = []
+        for key in halo & self.owner.keys():
+            for j in self.owner[key]:
+                gid_j, cells_j = self.parts[j]
+                for q in cells_j[key]:
+                    q = gid_j[q]
+                    la, lo = self.lat[q], self.lon[q]
+                    for k in self._around(la, lo):
+                        for i in cells.get(k, ()):
+                            if lat[i] == la and lon[i] == lo:
+                                dup[i] = q
+                            elif haversine_m(la, lo, lat[i], lon[i]) <= self.snap_m:
+                                near.append((i, q))
+        n0 = len(self.lat)
+        gid = list(range(n0, n0 + len(lat)))
+        new = iter
+        if dup:
+            keep = [i not in dup for i in range(len(lat))]
+            nxt = n0
+            for i, k in enumerate(keep):
+                gid[i] = nxt if k else dup[i]
+                nxt += k
+            new = lambda xs: compress(xs, keep)
+        self.lat.extend(new(lat)); self.lon.extend(new(lon)); self.hits.extend(new(hits))
+        self.parent.extend(new(map(gid.__getitem__, roots))); self.size.extend(new(size))
+        for i, q in dup.items():
+            self.hits[q] += hits[i]
+            self._union(q, gid[roots[i]])
+        for i, q in near:
+            self._union(gid[i], q)
+        b = len(self.parts)
+        shared = cells.keys() & self.owner.keys()
+        for key in shared:
+            self.owner[key] += (b,)
+        self.owner.update(dict.fromkeys(cells.keys() - shared, (b,)))
+        self.parts.append((gid, cells))
+        return gid
+
+    def export(self):
+        """(lat, lon, ocorrências, raiz local, tamanho, células, halo) para merge()."""
+        cells = self.cells if self.dlat > 0 else {c: [p] for c, p in self.by_coord.items()}
+        halo = {k for la, lo in zip(self.lat, self.lon) for k in self._around(la, lo)}
+        roots = [self.find(p) for p in range(len(self.lat))]
+        return self.lat, self.lon, self.hits, roots, self.size, cells, halo
+
+    def _new(self, lat: float, lon: float, hits: int) -> int:
+        p = len(self.lat)
+        self.by_coord[(lat, lon)] = p
+        self.lat.append(lat); self.lon.append(lon); self.hits.append(hits)
+        self.parent.append(p); self.size.append(1)
+        return p
+
+    def _link(self, p: int) -> None:
+        # Une p aos pontos já na grade a <= snap_m (3x3 células vizinhas).
+        if self.dlat <= 0:
             return
-        w = line_length_m(coords)
-        a, b = (u, v) if u < v else (v, u)
-        edges[(a, b)] = edges.get((a, b), 0.0) + w
+        lat, lon = self.lat[p], self.lon[p]
+        for key in self._around(lat, lon):
+            for q in self.cells.get(key, ()):
+                if haversine_m(lat, lon, self.lat[q], self.lon[q]) <= self.snap_m:
+                    self._union(p, q)
+
+    def _insert(self, p: int) -> None:
+        if self.dlat > 0:
+            self.cells.setdefault(self._cell(self.lon[p], math.floor(self.lat[p] / self.dlat)), []).append(p)
+
+    def labels(self) -> Tuple[List[str], Dict[str, Tuple[float, float]]]:
+        """
+        Rótulo N<k> de cada ponto (k na ordem de primeira aparição do grupo) e
+        posição média (ponderada pelas ocorrências) de cada nó.
+        """
+        names: Dict[int, str] = {}
+        acc: Dict[int, List[float]] = {}
+        out: List[str] = []
+        for p in range(len(self.lat)):
+            r = self.find(p)
+            if r not in names:
+                names[r] = f"N{len(names) + 1}"
+                acc[r] = [0.0, 0.0, 0]
+            a, h = acc[r], self.hits[p]
+            a[0] += self.lat[p] * h; a[1] += self.lon[p] * h; a[2] += h
+            out.append(names[r])
+        pos = {names[r]: (a[0] / a[2], a[1] / a[2]) for r, a in acc.items()}
+        return out, pos
+
+def relabel_edges(
+    features: Iterable[dict], step_deg: float = 5e-5, snap_m: Optional[float] = None, profile=None
+) -> Tuple[List[Tuple[str, str, float]], Dict[str, Tuple[float, float]]]:
+    """
+    Arestas (u, v, w) e posições dos nós. Extremos a até snap_m metros viram o
+    mesmo nó (step_deg: forma antiga, em graus, usada se snap_m não for dado).
+    profile (pcc.profiling.SolveStats) recebe as fases "snap" (leitura,
+    filtro e snap em fluxo) e "labels".
+    """
+    prof = profile if profile is not None else NO_STATS
+    index = _SnapIndex(step_deg * _M_PER_DEG if snap_m is None else snap_m)
+    raw: List[Tuple[int, int, float]] = []
+    with prof.phase("snap"):
+        dropped = _collect_edges(features, index, raw)
+    prof.set("points", len(index.lat))
+    prof.set("raw_edges", len(raw))
+    with prof.phase("labels"):
+        return _finish_edges(index, raw, dropped)
+
+def _clean_coords(coords_raw):
+    # mantém apenas pares [lon, lat] numéricos
+    out = []
+    for c in coords_raw or []:
+        if isinstance(c, (list, tuple)) and len(c) == 2:
+            lon, lat = c
+            if isinstance(lon, (int, float)) and isinstance(lat, (int, float)):
+                out.append((lon, lat))
+    return out
+
+def _collect_edges(features: Iterable[dict], index: _SnapIndex, raw: List[Tuple[int, int, float]]) -> int:
+    # Acrescenta (ponto u, ponto v, comprimento) de cada linha válida a raw;
+    # devolve o nº de features descartadas.
+    pending: List[list] = []
+
+    def add_edge_from_coords(coords_raw):
+        pending.append(coords_raw or [])
+        if len(pending) >= _BATCH:
+            flush()
+
+    def flush():
+        # Lote pendente de uma vez: se todos os pontos já são pares numéricos,
+        # vão direto para o array (comprimentos numa passada); senão, cada
+        # linha é limpa e medida isoladamente.
+        if not pending:
+            return
+        lines = pending
+        sizes = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines)) if np is not None else None
+        pts = _pack_points(lines, int(sizes.sum())) if sizes is not None else None
+        if pts is None:
+            lines = [_clean_coords(c) for c in lines]
+            lengths = line_lengths_m(lines)
+        else:
+            lengths = _packed_lengths(pts, sizes)
+        for coords, w in zip(lines, lengths):
+            if len(coords) < 2:
+                continue
+            # Rótulos só no fim: um ponto posterior pode unir dois grupos.
+            pu = index.add(coords[0][1], coords[0][0])
+            pv = index.add(coords[-1][1], coords[-1][0])
+            raw.append((pu, pv, w))
+        pending.clear()
 
     dropped = 0
     for f in features:
@@ -81,11 +502,20 @@ def relabel_edges(features: Iterable[dict], step_deg: float = 5e-5) -> Tuple[Lis
                 dropped += 1
         else:
             dropped += 1
+    flush()
+    return dropped
 
-    nodes_pos: Dict[str, Tuple[float, float]] = {}
-    for k, nid in idx_by_snap.items():
-        la, lo, c = accum[k]
-        nodes_pos[nid] = (la / c, lo / c)
+def _finish_edges(
+    index: _SnapIndex, raw: List[Tuple[int, int, float]], dropped: int
+) -> Tuple[List[Tuple[str, str, float]], Dict[str, Tuple[float, float]]]:
+    point_label, nodes_pos = index.labels()
+    edges: Dict[Tuple[str, str], float] = {}
+    for pu, pv, w in raw:
+        u, v = point_label[pu], point_label[pv]
+        if u == v:
+            continue
+        a, b = (u, v) if u < v else (v, u)
+        edges[(a, b)] = edges.get((a, b), 0.0) + w
 
     if dropped:
         print(f"Aviso: {dropped} features ignoradas por coordenadas inválidas.")
@@ -93,10 +523,228 @@ def relabel_edges(features: Iterable[dict], step_deg: float = 5e-5) -> Tuple[Lis
     edges_list = [(u, v, w) for (u, v), w in edges.items()]
     return edges_list, nodes_pos
 
+def _convert_features(feats: Iterable[dict], subs, bbox, snap_m: float):
+    # Filtro, limpeza, comprimentos e snap local de um bloco de features.
+    stats = {"kept": 0, "total": 0}
+    index = _SnapIndex(snap_m)
+    raw: List[Tuple[int, int, float]] = []
+    with _gc_paused():
+        dropped = _collect_edges(filter_feats(feats, subs, bbox, stats), index, raw)
+    return stats, dropped, index.export(), raw
+
+def _iter_span(st: _JSONStream, limit: Optional[int], stop: list) -> Iterator[dict]:
+    # Como _iter_array, mas a partir do meio da lista e só até a primeira
+    # feature que comece no caractere limit ou depois; stop recebe
+    # (byte seguinte, lista fechada).
+    while True:
+        ch = st.peek()
+        if ch == "]":
+            st.pos += 1
+            stop.append((st.offset(), True))
+            return
+        if ch == ",":
+            st.pos += 1
+            continue
+        if ch == "":
+            raise ValueError("GeoJSON inválido: lista de features não terminada.")
+        if limit is not None and st.tell() >= limit:
+            stop.append((st.offset(), False))
+            return
+        yield st.value()
+
+def _convert_span(task):
+    # Worker: decodifica as features que começam entre os bytes start e end
+    # (a última pode passar de end) e as converte com _convert_features.
+    path, start, end, subs, bbox, snap_m = task
+    with open(path, "rb") as f:
+        f.seek(start)
+        # start e end caem em "{" (ASCII): o trecho é UTF-8 válido.
+        limit = len(f.read(end - start).decode("utf-8")) if end is not None else None
+        f.seek(start)
+        stop: list = []
+        out = _convert_features(_iter_span(_JSONStream(f), limit, stop), subs, bbox, snap_m)
+    return stop[0] + out
+
+def _cut_points(f, start: int, chunk: int) -> Iterator[int]:
+    # Um candidato a início de feature a cada ~chunk bytes após start. Pode
+    # cair dentro de uma feature (objeto aninhado, texto): quem confirma é o
+    # worker do bloco anterior, que decodifica a partir de um limite real.
+    pos = start + chunk
+    while True:
+        f.seek(pos)
+        data = f.read(_READ_BYTES)
+        m = _CUT.search(data)
+        if m is not None:
+            cut = pos + m.end() - 1
+            yield cut
+            pos = cut + chunk
+        elif len(data) < _READ_BYTES:
+            return
+        else:
+            pos += len(data) - 64
+
+def _convert_array(st: _JSONStream, path: str, pool, workers: int, task: tuple, chunk: int) -> Iterator[tuple]:
+    # Lista de features em st (no "["): blocos de ~chunk bytes lidos e
+    # convertidos pelos workers; gera os resultados na ordem do arquivo e
+    # deixa st logo após o "]".
+    st.expect("[")
+    nxt = st.offset()          # início (confirmado) do próximo bloco
+    with open(path, "rb") as f:
+        cuts = _cut_points(f, nxt, chunk)
+        inflight: deque = deque()
+        a: Optional[int] = nxt
+        while True:
+            while a is not None and len(inflight) < 2 * workers:
+                b = next(cuts, None)
+                inflight.append((a, b, pool.apply_async(_convert_span, ((path, a, b) + task,))))
+                a = b
+            start, end, res = inflight.popleft()
+            if start != nxt:
+                # Corte especulativo no meio de uma feature: o bloco anterior
+                # parou em nxt; refaz deste limite até end (se ainda houver).
+                if end is not None and nxt >= end:
+                    continue
+                stop, closed, *out = _convert_span((path, nxt, end) + task)
+            else:
+                stop, closed, *out = res.get()
+            yield out
+            nxt = stop
+            if closed:
+                break
+    st.seek(nxt)
+
+def _convert_document(f, path: str, pool, workers: int, task: tuple, chunk: int) -> Iterator[tuple]:
+    # Resultados de _convert_features por bloco, na ordem do arquivo.
+    st = _JSONStream(f)
+    kind = yield from _walk_document(st, lambda st: _convert_array(st, path, pool, workers, task, chunk))
+    if kind == "Feature":
+        # Feature isolada: o documento inteiro é pequeno.
+        f.seek(0)
+        yield _convert_features([json.load(f)], *task)
+
+def relabel_edges_parallel(
+    path: str,
+    subs: List[str],
+    bbox: Optional[Tuple[float, float, float, float]],
+    snap_m: float,
+    workers: int,
+    stats: Optional[Dict[str, int]] = None,
+    chunk: int = _CHUNK_BYTES,
+    profile=None,
+) -> Tuple[List[Tuple[str, str, float]], Dict[str, Tuple[float, float]]]:
+    """
+    filter_feats + relabel_edges de um GeoJSON num pool de processos. Cada
+    worker lê e decodifica sozinho ~chunk bytes do arquivo (o pai só procura
+    candidatos a corte e percorre o topo do documento), calcula comprimentos
+    e une os pontos do bloco. O pai incorpora os blocos na ordem do arquivo
+    (_SnapIndex.merge), comparando só os pontos das células de borda com os
+    blocos anteriores. Rótulos N<k> e pesos saem idênticos aos do modo
+    serial. No máximo 2 blocos por processo ficam em trânsito.
+    profile: mesmas fases de relabel_edges ("snap" inclui o pool).
+    """
+    prof = profile if profile is not None else NO_STATS
+    if stats is None:
+        stats = {}
+    stats.setdefault("kept", 0)
+    stats.setdefault("total", 0)
+    index = _SnapIndex(snap_m)
+    raw: List[Tuple[int, int, float]] = []
+    dropped = 0
+    task = (subs, bbox, snap_m)
+    with prof.phase("snap"), mp.get_context().Pool(workers) as pool, open(path, "rb") as f:
+        for part, d, points, local in _convert_document(f, path, pool, workers, task, chunk):
+            stats["kept"] += part["kept"]
+            stats["total"] += part["total"]
+            dropped += d
+            gid = index.merge(*points)
+            raw.extend((gid[u], gid[v], w) for u, v, w in local)
+    prof.set("points", len(index.lat))
+    prof.set("raw_edges", len(raw))
+    with prof.phase("labels"):
+        return _finish_edges(index, raw, dropped)
+
 def _touches_bbox(coords: List[Tuple[float, float]], bbox: Tuple[float, float, float, float]) -> bool:
     minlon, minlat, maxlon, maxlat = bbox
     return any((minlon <= lon <= maxlon) and (minlat <= lat <= maxlat) for lon, lat in coords)
 
+def _coords_any_ok(geom: dict) -> bool:
+    t = geom.get("type")
+    if t == "LineString":
+        c = geom.get("coordinates", [])
+        return any(isinstance(x, (list, tuple)) and len(x) == 2 for x in c)
+    if t == "MultiLineString":
+        return any(any(isinstance(x, (list, tuple)) and len(x) == 2 for x in seg) for seg in geom.get("coordinates", []))
+    return False
+
+def _geom_touches_bbox(g: dict, bbox: Tuple[float, float, float, float]) -> bool:
+    if g.get("type") == "LineString":
+        return _touches_bbox([tuple(x) for x in g.get("coordinates", []) if isinstance(x,(list,tuple)) and len(x)==2], bbox)
+    return any(_touches_bbox([tuple(x) for x in seg if isinstance(x,(list,tuple)) and len(x)==2], bbox) for seg in g.get("coordinates", []))
+
+def _bbox_mask(geoms: List[dict], bbox: Tuple[float, float, float, float]) -> List[bool]:
+    # _geom_touches_bbox para um lote de geometrias: todos os pontos num array,
+    # teste vetorizado e "algum ponto dentro" por geometria (np.maximum.reduceat).
+    if np is None:
+        return [_geom_touches_bbox(g, bbox) for g in geoms]
+    segs: List = []
+    sizes: List[int] = []
+    for g in geoms:
+        parts = [g.get("coordinates", [])] if g.get("type") == "LineString" else g.get("coordinates", [])
+        segs.extend(parts)
+        sizes.append(sum(map(len, parts)))
+    a = _pack_points(segs, sum(sizes))
+    if a is None:
+        return [_geom_touches_bbox(g, bbox) for g in geoms]
+    minlon, minlat, maxlon, maxlat = bbox
+    inside = np.append((a[:, 0] >= minlon) & (a[:, 0] <= maxlon) & (a[:, 1] >= minlat) & (a[:, 1] <= maxlat), False)
+    n = np.asarray(sizes, dtype=np.int64)
+    out = np.zeros(len(geoms), dtype=bool)
+    keep = n > 0
+    if keep.any():
+        out[keep] = np.maximum.reduceat(inside, (np.cumsum(n) - n)[keep])
+    return out.tolist()
+
+def filter_feats(
+    feats: Iterable[dict],
+    subs: List[str],
+    bbox: Optional[Tuple[float, float, float, float]],
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[dict]:
+    """Gera as features com geometria utilizável que passam nos filtros de nome/bbox.
+    stats (opcional) acumula "kept"/"total" à medida que o gerador é consumido."""
+    if stats is None:
+        stats = {}
+    stats.setdefault("kept", 0)
+    stats.setdefault("total", 0)
+    batch: List[dict] = []
+
+    def flush() -> Iterator[dict]:
+        # Teste de bbox de um lote de features (ordem preservada).
+        mask = _bbox_mask([f.get("geometry", {}) or {} for f in batch], bbox)
+        kept = [f for f, ok in zip(batch, mask) if ok]
+        batch.clear()
+        stats["kept"] += len(kept)
+        yield from kept
+
+    for f in feats:
+        stats["total"] += 1
+        g = f.get("geometry", {}) or {}
+        if not _coords_any_ok(g):
+            continue
+        if subs:
+            nm = ((f.get("properties") or {}).get("name") or "").lower()
+            if not any(s in nm for s in subs):
+                continue
+        if not bbox:
+            stats["kept"] += 1
+            yield f
+            continue
+        batch.append(f)
+        if len(batch) >= _BATCH:
+            yield from flush()
+    if batch:
+        yield from flush()
+
 def main():
     ap = argparse.ArgumentParser(description="GeoJSON (LineString/MultiLineString) -> CSV u,v,w (+ nodes opcional)")
     ap.add_argument("input", nargs="?", default="data/osm_subgraph.geojson", help="GeoJSON de entrada")
@@ -105,10 +753,17 @@ def main():
     ap.add_argument("--nodes-out", type=str, default=None, help="CSV de nós (id,lat,lon); padrão: 'real_nodes.csv'")
     ap.add_argument("--include-name-substr", type=str, default=None, help="Filtra por substrings no 'name' (separadas por vírgula)")
     ap.add_argument("--bbox", type=str, default=None, help="Filtra por bbox lon/lat: minlon,minlat,maxlon,maxlat")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Processos para leitura/filtro/comprimentos/snap em trechos do arquivo (0 = todos os núcleos); saída idêntica à serial")
+    ap.add_argument("--pccg-out", type=str, default=None,
+                    help="Também grava o grafo binário .pccg (rótulos, lat/lon e CSR; lido via mmap pelo pcc)")
+    ap.add_argument("--profile", nargs="?", const="-", default=None, metavar="JSON",
+                    help="Tempo, pico de memória (tracemalloc) e contadores por fase; JSON no stdout ou no arquivo dado")
     args = ap.parse_args()
-
-    data = json.loads(Path(args.input).read_text(encoding="utf-8"))
-    feats = data.get("features", [])
+    if (args.profile or args.pccg_out) and SolveStats is None:
+        ap.error("--profile e --pccg-out usam o pacote pcc: rode com PYTHONPATH=src (ou instale o pacote).")
+    profile = SolveStats(memory=True) if args.profile else None
+    prof = profile if profile is not None else NO_STATS
 
     subs = [s.strip().lower() for s in (args.include_name_substr or "").split(",") if s.strip()]
     bbox = None
@@ -117,53 +772,33 @@ def main():
         if len(parts) == 4:
             bbox = (parts[0], parts[1], parts[2], parts[3])
 
-    def filter_feats():
-        filtered = []
-        kept, total = 0, 0
-        def coords_any_ok(geom):
-            t = geom.get("type")
-            if t == "LineString":
-                c = geom.get("coordinates", [])
-                return any(isinstance(x, (list, tuple)) and len(x) == 2 for x in c)
-            if t == "MultiLineString":
-                return any(any(isinstance(x, (list, tuple)) and len(x) == 2 for x in seg) for seg in geom.get("coordinates", []))
-            return False
-        for f in feats:
-            total += 1
-            g = f.get("geometry", {}) or {}
-            if not coords_any_ok(g):
-                continue
-            if subs:
-                nm = ((f.get("properties") or {}).get("name") or "").lower()
-                if not any(s in nm for s in subs):
-                    continue
-            if bbox:
-                def touches(g):
-                    if g.get("type") == "LineString":
-                        return _touches_bbox([tuple(x) for x in g.get("coordinates", []) if isinstance(x,(list,tuple)) and len(x)==2], bbox)
-                    else:
-                        return any(_touches_bbox([tuple(x) for x in seg if isinstance(x,(list,tuple)) and len(x)==2], bbox) for seg in g.get("coordinates", []))
-                if not touches(g):
-                    continue
-            filtered.append(f); kept += 1
-        return filtered, kept, total
-    feats, kept, total = filter_feats()
-    print(f"Features válidas: {kept}/{total}")
-
-    step_deg = max(args.snap_m / 111320.0, 1e-6)
-    edges_rows, nodes_pos = relabel_edges(feats, step_deg=step_deg)
+    # Pipeline de geradores: arquivo -> filtro -> relabel (uma feature por vez).
+    stats = {"kept": 0, "total": 0}
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    with _gc_paused():
+        if workers > 1:
+            edges_rows, nodes_pos = relabel_edges_parallel(
+                args.input, subs, bbox, max(args.snap_m, 0.0), workers, stats, profile=profile)
+        else:
+            feats = filter_feats(iter_features(args.input), subs, bbox, stats)
+            edges_rows, nodes_pos = relabel_edges(feats, snap_m=max(args.snap_m, 0.0), profile=profile)
+    print(f"Features válidas: {stats['kept']}/{stats['total']}")
+    prof.set("features_total", stats["total"])
+    prof.set("features_kept", stats["kept"])
+    prof.set("edges", len(edges_rows))
+    prof.set("nodes", len(nodes_pos))
 
     out_edges = Path(args.output)
     out_nodes = Path(args.nodes_out) if args.nodes_out else out_edges.with_name(out_edges.stem.replace("edges", "nodes") + ".csv")
 
     out_edges.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_edges, "w", newline="", encoding="utf-8") as f:
+    with prof.phase("write_csv"), open(out_edges, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f); w.writerow(["u", "v", "w"])
         for u, v, wgt in edges_rows:
             w.writerow([u, v, f"{wgt:.1f}"])
 
     out_nodes.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_nodes, "w", newline="", encoding="utf-8") as f:
+    with prof.phase("write_csv"), open(out_nodes, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f); w.writerow(["id", "lat", "lon"])
         def num(nid: str):
             body = nid[1:] if nid and nid[0] in ("N", "n") else nid
@@ -174,5 +809,29 @@ def main():
     print(f"Wrote {len(edges_rows)} edges to {out_edges}")
     print(f"Wrote {len(nodes_pos)} nodes to {out_nodes}")
 
+    if args.pccg_out:
+        with prof.phase("pccg"):
+            write_pccg_file(args.pccg_out, edges_rows, nodes_pos)
+        print(f"Wrote binary graph to {args.pccg_out}")
+
+    if profile is not None:
+        profile.close()
+        profile.write_json(args.profile)
+
+def write_pccg_file(path: str, edges_rows: List[Tuple[str, str, float]], nodes_pos: Dict[str, Tuple[float, float]]) -> None:
+    # Mesmo grafo que o pcc obtém lendo o CSV: rótulos na ordem de primeira
+    # aparição e pesos arredondados a 0.1 m como no arquivo texto.
+    from pcc.pccg import write_pccg
+    index: Dict[str, int] = {}
+    eu: List[int] = []
+    ev: List[int] = []
+    ew: List[float] = []
+    for u, v, wgt in edges_rows:
+        eu.append(index.setdefault(u, len(index)))
+        ev.append(index.setdefault(v, len(index)))
+        ew.append(float(f"{wgt:.1f}"))
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    write_pccg(path, list(index), eu, ev, ew, coords=nodes_pos)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file